@@ -4,281 +4,25 @@
 # In[1]:
 
 
-import tkinter as tk
-from tkinter import messagebox
-from enum import Enum
+import os
 from datetime import datetime
+from event import Location, Event, EventManagement
+from artwork import Artwork, ArtworkManagement
+from visitor import Visitor, GroupVisitor
+from ticket import VisitorInfoManagement
+from snapshot import save_snapshot, load_snapshot
+from loyalty import PurchaseHistory
+from capacity import SharedCapacityCounters
+import instrumentation
+
+SNAPSHOT_PATH = "museum.snapshot"  # museum state kept across restarts
+HISTORY_PATH = "museum.history"  # journal of every ticket sold and refunded, for loyalty discounts
+PROFILE_SECONDS = 10  # length of a profile captured from the Diagnostics menu
+
+# tkinter is imported by main(), so this module can be imported without a display
+tk = None
+messagebox = None
 
-class Location(Enum):
-    """Enumeration class for different locations within the museum."""
-    PERMANENT_GALLERIES = 1
-    EXHIBITION_HALLS = 2
-    OUTDOOR_SPACES = 3
-
-class Event:
-    """Base class for all museum events."""
-    def __init__(self, name, location, start_time, end_time):
-        """Initialize the Event object with name, location, start time, and end time."""
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        assert isinstance(location, Location), "Invalid location"
-        assert isinstance(start_time, datetime) and isinstance(end_time, datetime), "Invalid start or end time"
-        assert start_time < end_time, "Start time must be before end time"
-        
-        self.name = name.strip()
-        self.location = location
-        self.start_time = start_time
-        self.end_time = end_time
-
-    def display_event_info(self):
-        """Display information about the event."""
-        return f"Name: {self.name}\nLocation: {self.location.name}\nStart Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}\nEnd Time: {self.end_time.strftime('%Y-%m-%d %H:%M')}"
-
-class Exhibition(Event):
-    """Subclass of Event for exhibitions."""
-    def __init__(self, name, location, start_time, end_time):
-        """Initialize the Exhibition object."""
-        super().__init__(name, location, start_time, end_time)
-
-class Tour(Event):
-    """Subclass of Event for guided tours."""
-    def __init__(self, name, location, start_time, end_time, max_capacity):
-        """Initialize the Tour object with maximum capacity."""
-        super().__init__(name, location, start_time, end_time)
-        assert isinstance(max_capacity, int) and max_capacity > 0, "Max capacity must be a positive integer"
-        self.max_capacity = max_capacity
-
-class SpecialEvent(Event):
-    """Subclass of Event for special events."""
-    def __init__(self, name, location, start_time, end_time, ticket_price):
-        """Initialize the SpecialEvent object with ticket price."""
-        super().__init__(name, location, start_time, end_time)
-        assert isinstance(ticket_price, (int, float)) and ticket_price >= 0, "Ticket price must be a non-negative number"
-        self.ticket_price = ticket_price
-
-class Artwork:
-    """Class to represent artworks in the museum."""
-    def __init__(self, title, artist, date_of_creation, historical_significance, exhibition_location):
-        """Initialize the Artwork object with title, artist, date of creation, historical significance, and exhibition location."""
-        assert isinstance(title, str) and title.strip(), "Title must be a non-empty string"
-        assert isinstance(artist, str) and artist.strip(), "Artist must be a non-empty string"
-        assert isinstance(date_of_creation, str) and date_of_creation.strip(), "Date of creation must be a non-empty string"
-        assert isinstance(historical_significance, str) and historical_significance.strip(), "Historical significance must be a non-empty string"
-        assert isinstance(exhibition_location, Location), "Invalid exhibition location"
-        
-        self.title = title.strip()
-        self.artist = artist.strip()
-        self.date_of_creation = date_of_creation.strip()
-        self.historical_significance = historical_significance.strip()
-        self.exhibition_location = exhibition_location
-
-class ArtworkManagement:
-    """Class to manage artworks in the museum."""
-    def __init__(self):
-        """Initialize the ArtworkManagement object with an empty list of artworks."""
-        self.artworks = []
-
-    def add_artwork(self, artwork):
-        """Add an artwork to the list."""
-        assert isinstance(artwork, Artwork), "Invalid artwork"
-        self.artworks.append(artwork)
-
-    def remove_artwork(self, title):
-        """Remove an artwork from the list."""
-        assert isinstance(title, str) and title.strip(), "Title must be a non-empty string"
-        for artwork in self.artworks:
-            if artwork.title == title:
-                self.artworks.remove(artwork)
-                return True
-        return False
-
-    def display_artworks(self):
-        """Display all artworks."""
-        return [f"Title: {artwork.title}, Artist: {artwork.artist}, Date of Creation: {artwork.date_of_creation}, Historical Significance: {artwork.historical_significance}, Exhibition Location: {artwork.exhibition_location.name}" for artwork in self.artworks]
-
-class Visitor:
-    """Class to represent a visitor to the museum."""
-    def __init__(self, name, age, email, is_student=False, is_teacher=False):
-        """Initialize the Visitor object with name, age, email, and optionally student/teacher status."""
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        assert isinstance(age, int) and age > 0, "Age must be a positive integer"
-        assert isinstance(email, str) and '@' in email, "Invalid email address"
-        
-        self.name = name.strip()
-        self.age = age
-        self.email = email
-        self.is_student = is_student
-        self.is_teacher = is_teacher
-
-class GroupVisitor(Visitor):
-    """Subclass of Visitor for group visitors."""
-    def __init__(self, name, age, email, group_id, is_student=False, is_teacher=False):
-        """Initialize the GroupVisitor object with group ID."""
-        super().__init__(name, age, email,is_student,is_teacher)
-        assert isinstance(group_id, str) and group_id.strip(), "Group ID must be a non-empty string"
-        self.group_id = group_id.strip()
-
-class Ticket:
-    """Class to represent a ticket for an event."""
-    def __init__(self, visitor, event):
-        """Initialize the Ticket object with visitor and event."""
-        assert isinstance(visitor, Visitor), "Invalid visitor"
-        assert isinstance(event, Event), "Invalid event"
-        
-        self.visitor = visitor
-        self.event = event
-        self.price = self.calculate_ticket_price()
-
-    def calculate_ticket_price(self):
-        """Calculate ticket price based on visitor and event details."""
-        base_price = 63  # AED
-        if self.visitor.is_student or self.visitor.is_teacher:
-            return 0  # Free ticket for students and teachers
-        elif self.visitor.age < 18 or self.visitor.age >= 60:
-            return 0  # Free ticket for children and seniors
-        elif isinstance(self.visitor, GroupVisitor):
-            return (base_price / 2) * 1.05  # 50% discount for group visitors
-        elif isinstance(self.event, SpecialEvent):
-            return (self.event.ticket_price) * 1.05
-        else:
-            return base_price * 1.05  # Full price for adults with 5% VAT
-
-    def display(self):
-        
-        return f"Ticket Information:\nVisitor: {self.visitor.name}, Event: {self.event.name}\nPrice: {self.price} AED"
-    def display_receipt(self):
-        return f"Payment Receipt:\nVisitor: {self.visitor.name}\nEvent: {self.event.name}\nLocation: {self.event.location.name}\nPrice + 5% VAT: {self.price} AED"
-
-
-class VisitorInfoManagement:
-    def __init__(self):
-        """Initialize VisitorInfoManagement with an empty list to store visitors."""
-        self.visitors = []
-
-    def add_visitor(self, visitor):
-        """Add a visitor to the list of visitors.
-
-        Parameters:
-        - visitor: A Visitor object to be added.
-
-        Raises:
-        - AssertionError: If the provided visitor is not an instance of the Visitor class.
-        """
-        assert isinstance(visitor, Visitor), "Invalid visitor"
-        self.visitors.append(visitor)
-
-    def remove_visitor(self, email):
-        """Remove a visitor from the list of visitors based on their email address.
-
-        Parameters:
-        - email: A string representing the email address of the visitor to be removed.
-
-        Returns:
-        - True if the visitor is successfully removed, False otherwise.
-
-        Raises:
-        - AssertionError: If the provided email is not a non-empty string.
-        """
-        assert isinstance(email, str) and email.strip(), "Email must be a non-empty string"
-        for visitor in self.visitors:
-            if visitor.email == email:
-                self.visitors.remove(visitor)
-                return True
-        return False
-
-    def purchase_ticket(self, visitor, event):
-        """Create and return a ticket for a visitor to attend an event.
-
-        Parameters:
-        - visitor: A Visitor object representing the attendee.
-        - event: An Event object representing the event to attend.
-
-        Returns:
-        - A Ticket object for the visitor to attend the event.
-
-        Raises:
-        - AssertionError: If the provided visitor or event is not an instance of their respective classes.
-        """
-        assert isinstance(visitor, Visitor), "Invalid visitor"
-        assert isinstance(event, Event), "Invalid event"
-        
-        ticket = Ticket(visitor, event)
-        return ticket
-
-    def purchase_group_tickets(self, visitors, event):
-        """Calculate the total price of purchasing tickets for a group of visitors to attend an event.
-
-        Parameters:
-        - visitors: A list of Visitor objects representing the attendees.
-        - event: An Event object representing the event to attend.
-
-        Returns:
-        - The total price of purchasing tickets for the group.
-
-        Raises:
-        - AssertionError: If any of the provided visitors or event is not an instance of their respective classes.
-        """
-        total_price = 0
-        for visitor in visitors:
-            ticket = Ticket(visitor, event)
-            total_price += ticket.price
-        return total_price
-
-
-class EventManagement:
-    def __init__(self):
-        """Initialize EventManagement with an empty list to store events."""
-        self.events = []
-
-    def add_event(self, event):
-        """Add an event to the list of events.
-
-        Parameters:
-        - event: An Event object to be added.
-
-        Raises:
-        - AssertionError: If the provided event is not an instance of the Event class.
-        """
-        assert isinstance(event, Event), "Invalid event"
-        self.events.append(event)
-
-    def remove_event(self, name):
-        """Remove an event from the list of events based on its name.
-
-        Parameters:
-        - name: A string representing the name of the event to be removed.
-
-        Returns:
-        - True if the event is successfully removed, False otherwise.
-
-        Raises:
-        - AssertionError: If the provided name is not a non-empty string.
-        """
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        for event in self.events:
-            if event.name == name:
-                self.events.remove(event)
-                return True
-        return False
-
-    def get_event_by_name(self, name):
-        """Retrieve an event from the list of events based on its name.
-
-        Parameters:
-        - name: A string representing the name of the event to retrieve.
-
-        Returns:
-        - The Event object with the specified name if found, None otherwise.
-
-        Raises:
-        - AssertionError: If the provided name is not a non-empty string.
-        """
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        for event in self.events:
-            if event.name == name:
-                return event
-        return None
-
-    
 class MuseumGUI:
     def __init__(self, root):
         """
@@ -300,6 +44,86 @@ class MuseumGUI:
         self.create_event_management_gui()
         self.create_ticket_purchase_gui()
         self.create_visitor_info_gui()
+        self.create_sales_dashboard_gui()
+        self.create_schedule_gui()
+        self.create_diagnostics_menu()
+
+        # Restore the state saved when the museum was last closed, and save it again on close
+        self.load_state()
+        self.purchase_history = PurchaseHistory(HISTORY_PATH)
+        self.visitor_info_management.purchase_history = self.purchase_history
+        # tour places are counted in shared memory, so every museum process on the machine sells from the same capacity
+        self.capacity_counters = SharedCapacityCounters.attach_or_create()
+        self.visitor_info_management.capacity_counters = self.capacity_counters
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def load_state(self):
+        """Loads the artworks, events and visitors saved in the snapshot file, if there is one."""
+        if not os.path.exists(SNAPSHOT_PATH):
+            return
+        try:
+            self.event_management, self.artwork_management, self.visitor_info_management = load_snapshot(SNAPSHOT_PATH)
+        except (AssertionError, OSError) as e:
+            messagebox.showerror("Error", f"Could not load the saved museum state: {e}")
+            return
+        for artwork in self.artwork_management.snapshot():
+            self.artwork_text.insert(tk.END, f"Title: {artwork.title}\nArtist: {artwork.artist}\nDate of Creation: {artwork.date_of_creation}\nHistorical Significance: {artwork.historical_significance}\nExhibition Location: {artwork.exhibition_location.name}\n\n")
+        for event in self.event_management.snapshot():
+            self.event_listbox.insert(tk.END, f"{event.name} - {event.start_time.strftime('%Y-%m-%d %H:%M')}")
+        self.refresh_schedule()
+        self.refresh_visitor_info()
+
+    def close(self):
+        """Saves the museum state to the snapshot file and closes the window."""
+        try:
+            save_snapshot(SNAPSHOT_PATH, self.event_management, self.artwork_management, self.visitor_info_management)
+        except OSError as e:
+            if not messagebox.askyesno("Error", f"Could not save the museum state: {e}\nClose anyway?"):
+                return
+        self.purchase_history.close()
+        self.capacity_counters.close()
+        self.root.destroy()
+
+    # Diagnostics Menu
+    def create_diagnostics_menu(self):
+        """Creates the menu for recording handler and registry timings and capturing profiles."""
+        menubar = tk.Menu(self.root)
+        diagnostics_menu = tk.Menu(menubar, tearoff=0)
+        self.record_timings_var = tk.BooleanVar(value=instrumentation.is_enabled())
+        diagnostics_menu.add_checkbutton(label="Record Timings", variable=self.record_timings_var, command=self.toggle_timings)
+        diagnostics_menu.add_command(label="Show Timings", command=self.show_timings)
+        diagnostics_menu.add_command(label="Reset Timings", command=instrumentation.reset)
+        diagnostics_menu.add_separator()
+        diagnostics_menu.add_command(label=f"Profile Next {PROFILE_SECONDS} Seconds", command=self.capture_profile)
+        menubar.add_cascade(label="Diagnostics", menu=diagnostics_menu)
+        self.root.config(menu=menubar)
+
+    def toggle_timings(self):
+        """Switches timing of the GUI handlers and registry methods on or off."""
+        if self.record_timings_var.get():
+            instrumentation.instrument_core()
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def show_timings(self):
+        """Shows call counts and latency percentiles recorded so far."""
+        timings_window = tk.Toplevel(self.root)
+        timings_window.title("Timings")
+        timings_text = tk.Text(timings_window, width=120, height=30, font="TkFixedFont")
+        timings_text.grid(row=0, column=0, padx=5, pady=5)
+        timings_text.insert(tk.END, instrumentation.report())
+
+    def capture_profile(self):
+        """Profiles the GUI for PROFILE_SECONDS and writes the report to a file."""
+        capture = instrumentation.ProfileCapture()
+        capture.start()
+        self.root.after(PROFILE_SECONDS * 1000, lambda: self.finish_profile(capture))
+
+    def finish_profile(self, capture):
+        path = f"museum-profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
+        capture.stop(path)
+        messagebox.showinfo("Profile", f"Profile written to {path}")
 
     # Artwork Management GUI
     def create_artwork_management_gui(self):
@@ -350,6 +174,7 @@ class MuseumGUI:
         self.artwork_text = tk.Text(artwork_frame, width=50, height=10)
         self.artwork_text.grid(row=6, column=0, columnspan=2, padx=5, pady=5)
 
+    @instrumentation.timed
     def add_artwork(self):
         """Adds artwork based on user input."""
         # Retrieve input from entry fields
@@ -447,6 +272,7 @@ class MuseumGUI:
         add_button = tk.Button(event_window, text="Add", command=lambda: self.save_event(entry_name.get(), location_var.get(), entry_start_time.get(), entry_end_time.get()))
         add_button.grid(row=5, column=0, columnspan=2, padx=5, pady=5)
 
+    @instrumentation.timed
     def save_event(self, name, location, start_time, end_time):
         """Saves an event with provided details."""
         # Parse input, create event object, and add to management
@@ -456,10 +282,12 @@ class MuseumGUI:
             event = Event(name, Location[location], start_time, end_time)
             self.event_management.add_event(event)
             self.event_listbox.insert(tk.END, f"{event.name} - {event.start_time.strftime('%Y-%m-%d %H:%M')}")
+            self.refresh_schedule()
             messagebox.showinfo("Success", "Event added successfully.")
         except ValueError:
             messagebox.showerror("Error", "Invalid date format. Please use YYYY-MM-DD HH:MM.")
 
+    @instrumentation.timed
     def remove_event(self):
         """Removes a selected event."""
         # Get selected event and remove from management
@@ -471,6 +299,7 @@ class MuseumGUI:
         event_name = event_info.split(" - ")[0]
         if self.event_management.remove_event(event_name):
             self.event_listbox.delete(selected_index)
+            self.refresh_schedule()
             messagebox.showinfo("Success", "Event removed successfully.")
         else:
             messagebox.showerror("Error", "Event not found.")
@@ -499,11 +328,41 @@ class MuseumGUI:
 
         self.entry_event_name = tk.Entry(ticket_frame)
         self.entry_event_name.grid(row=1, column=1, padx=5, pady=5)
+        self.entry_event_name.bind("<KeyRelease>", self.update_event_suggestions)
+
+        # Create a listbox of event name suggestions that updates while typing
+        self.event_suggestions_listbox = tk.Listbox(ticket_frame, width=30, height=4)
+        self.event_suggestions_listbox.grid(row=2, column=1, padx=5, pady=5)
+        self.event_suggestions_listbox.bind("<<ListboxSelect>>", self.select_event_suggestion)
 
          # Create button for initiating ticket purchase process
         purchase_button = tk.Button(ticket_frame, text="Next", command=self.ticket_purchase_next_step)
-        purchase_button.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
+        purchase_button.grid(row=3, column=0, columnspan=2, padx=5, pady=5)
+
+    @instrumentation.timed
+    def update_event_suggestions(self, _event=None):
+        """Refreshes the event name suggestions for the text typed so far."""
+        self.event_suggestions_listbox.delete(0, tk.END)
+        for name in self.event_management.suggest_event_names(self.entry_event_name.get(), limit=4):
+            self.event_suggestions_listbox.insert(tk.END, name)
+
+    def select_event_suggestion(self, _event=None):
+        """Copies the selected suggestion into the event name field."""
+        selected_index = self.event_suggestions_listbox.curselection()
+        if not selected_index:
+            return
+        self.entry_event_name.delete(0, tk.END)
+        self.entry_event_name.insert(0, self.event_suggestions_listbox.get(selected_index))
+
+    def show_event_not_found(self, event_name):
+        """Reports an unknown event name, suggesting the closest known names."""
+        suggestions = self.event_management.suggest_event_names(event_name, limit=3)
+        if suggestions:
+            messagebox.showerror("Error", f"Event not found. Did you mean: {', '.join(suggestions)}?")
+        else:
+            messagebox.showerror("Error", "Event not found.")
 
+    @instrumentation.timed
     def ticket_purchase_next_step(self):
         """Initiates ticket purchase based on user input."""
         # Determine ticket type and event name from user input
@@ -524,7 +383,7 @@ class MuseumGUI:
         event = self.event_management.get_event_by_name(event_name)
 
         if event is None:
-            messagebox.showerror("Error", "Event not found.")
+            self.show_event_not_found(event_name)
             return
 
         ticket_window = tk.Toplevel()
@@ -561,6 +420,7 @@ class MuseumGUI:
         purchase_button = tk.Button(ticket_window, text="Purchase Ticket", command=lambda: self.purchase_individual_ticket(event, entry_visitor_name.get(), entry_visitor_age.get(), entry_visitor_email.get()))
         purchase_button.grid(row=4, column=0, columnspan=2, padx=5, pady=5)
 
+    @instrumentation.timed
     def purchase_individual_ticket(self, event, visitor_name, visitor_age, visitor_email):
         if visitor_name.strip() == "":
             messagebox.showerror("Error", "Visitor name cannot be empty.")
@@ -581,7 +441,12 @@ class MuseumGUI:
             visitor = Visitor(visitor_name, int(visitor_age), visitor_email)
     
 
-        ticket = self.visitor_info_management.purchase_ticket(visitor, event)
+        try:
+            ticket = self.visitor_info_management.purchase_ticket(visitor, event)
+        except AssertionError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.refresh_sales_dashboard()
         messagebox.showinfo("Ticket Information", f"Ticket Price: {ticket.price} AED")
         confirm_button = tk.Button(self.root, text="Confirm Individual Purchase", command=lambda: self.display_ticket_and_receipt(ticket))
         confirm_button.grid(row=2, column=0, padx=10, pady=10)
@@ -590,7 +455,7 @@ class MuseumGUI:
         event = self.event_management.get_event_by_name(event_name)
 
         if event is None:
-            messagebox.showerror("Error", "Event not found.")
+            self.show_event_not_found(event_name)
             return
 
         group_ticket_window = tk.Toplevel()
@@ -611,6 +476,7 @@ class MuseumGUI:
         add_members_button = tk.Button(group_ticket_window, text="Add Members", command=lambda: self.add_group_members(group_ticket_window, event, entry_group_id.get(), entry_num_members.get()))
         add_members_button.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
 
+    @instrumentation.timed
     def add_group_members(self, window, event, group_id, num_members):
         if group_id.strip() == "":
             messagebox.showerror("Error", "Group ID cannot be empty.")
@@ -661,6 +527,7 @@ class MuseumGUI:
         purchase_button = tk.Button(group_members_window, text="Purchase Tickets", command=lambda: self.purchase_group_tickets(event, group_id, group_members_entries))
         purchase_button.grid(row=4*num_members+1, column=0, columnspan=2, padx=5, pady=5)
 
+    @instrumentation.timed
     def purchase_group_tickets(self, event, group_id, group_members_entries):
         visitors = []
         for entry_name, entry_age, entry_email, visitor_type_var in group_members_entries:
@@ -682,9 +549,15 @@ class MuseumGUI:
 
             visitors.append(visitor)
 
-        total_price = self.visitor_info_management.purchase_group_tickets(visitors, event)
+        try:
+            tickets = self.visitor_info_management.issue_group_tickets(visitors, event)
+        except AssertionError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        total_price = sum(ticket.price for ticket in tickets)
+        self.refresh_sales_dashboard()
         messagebox.showinfo("Total Price", f"Total Price for the Group: {total_price} AED")
-        confirm_button = tk.Button(self.root, text="Confirm Group Purchase", command=lambda: self.display_group_tickets_and_receipt(visitors, event))
+        confirm_button = tk.Button(self.root, text="Confirm Group Purchase", command=lambda: self.display_group_tickets_and_receipt(tickets))
         confirm_button.grid(row=3, column=0, padx=10, pady=10)
    
     # Visitor Info Management GUI
@@ -703,11 +576,68 @@ class MuseumGUI:
         refresh_button.grid(row=1, column=0, padx=5, pady=5)
         
         
+    # Upcoming Schedule GUI
+    def create_schedule_gui(self):
+        """Creates GUI elements for the upcoming events schedule."""
+        # Create a frame for the schedule
+        schedule_frame = tk.LabelFrame(self.root, text="Upcoming Schedule")
+        schedule_frame.grid(row=2, column=2, rowspan=2, padx=10, pady=10)
+
+        # Create a dropdown menu for choosing the location
+        label_location = tk.Label(schedule_frame, text="Location:")
+        label_location.grid(row=0, column=0, padx=5, pady=5)
+
+        self.schedule_location_var = tk.StringVar(schedule_frame)
+        self.schedule_location_var.set("ALL")  # default value
+
+        location_options = ["ALL", "PERMANENT_GALLERIES", "EXHIBITION_HALLS", "OUTDOOR_SPACES"]
+        schedule_location_menu = tk.OptionMenu(schedule_frame, self.schedule_location_var, *location_options, command=lambda _: self.refresh_schedule())
+        schedule_location_menu.grid(row=0, column=1, padx=5, pady=5)
+
+        # Create a listbox to display the next events
+        self.schedule_listbox = tk.Listbox(schedule_frame, width=50, height=10)
+        self.schedule_listbox.grid(row=1, column=0, columnspan=2, padx=5, pady=5)
+
+        # Create a button for refreshing the schedule
+        refresh_button = tk.Button(schedule_frame, text="Refresh", command=self.refresh_schedule)
+        refresh_button.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
+
+    @instrumentation.timed
+    def refresh_schedule(self):
+        """Shows the next events from now at the chosen location."""
+        location = self.schedule_location_var.get()
+        location = None if location == "ALL" else Location[location]
+        self.schedule_listbox.delete(0, tk.END)
+        for event in self.event_management.next_events(location, n=10):
+            self.schedule_listbox.insert(tk.END, f"{event.start_time.strftime('%Y-%m-%d %H:%M')} - {event.name} ({event.location.name})")
+
+    # Sales Dashboard GUI
+    def create_sales_dashboard_gui(self):
+        """Creates GUI elements for the live revenue and attendance dashboard."""
+        # Create a frame for the sales dashboard
+        dashboard_frame = tk.LabelFrame(self.root, text="Sales Dashboard")
+        dashboard_frame.grid(row=0, column=2, rowspan=2, padx=10, pady=10)
+
+        # Create a text widget for displaying running totals
+        self.sales_dashboard_text = tk.Text(dashboard_frame, width=50, height=25)
+        self.sales_dashboard_text.grid(row=0, column=0, padx=5, pady=5)
+
+        # Create a button for refreshing the totals
+        refresh_button = tk.Button(dashboard_frame, text="Refresh", command=self.refresh_sales_dashboard)
+        refresh_button.grid(row=1, column=0, padx=5, pady=5)
+
+    @instrumentation.timed
+    def refresh_sales_dashboard(self):
+        """Shows the current revenue and attendance totals."""
+        self.sales_dashboard_text.delete(1.0, tk.END)
+        self.sales_dashboard_text.insert(tk.END, self.visitor_info_management.sales.summary())
+
     """Refreshes the displayed visitor information."""
+    @instrumentation.timed
     def refresh_visitor_info(self):
         # Clear existing visitor information and retrieve updated data
         self.visitor_info_text.delete(1.0, tk.END)  # Clear previous contents
-        visitors = self.visitor_info_management.visitors
+        visitors = self.visitor_info_management.snapshot()
         for visitor in visitors:
             self.add_visitor_info_to_display(visitor)
     """Adds visitor information to the display."""
@@ -723,13 +653,12 @@ class MuseumGUI:
         self.add_ticket_info_to_display(ticket)
 
     """Displays ticket information and payment receipt for a group."""
-    def display_group_tickets_and_receipt(self, visitors, event):
-        # Display ticket information and payment receipt for each visitor in the group
-        for visitor in visitors:
-            ticket = Ticket(visitor, event)
+    def display_group_tickets_and_receipt(self, tickets):
+        # Display ticket information and payment receipt for each ticket issued to the group
+        for ticket in tickets:
             messagebox.showinfo("Ticket Information", ticket.display())
             messagebox.showinfo("Payment Receipt", ticket.display_receipt())
-            self.add_visitor_info_to_display(visitor)
+            self.add_visitor_info_to_display(ticket.visitor)
             self.add_ticket_info_to_display(ticket)
 
     """Adds ticket information to the visitor information display."""
@@ -737,10 +666,18 @@ class MuseumGUI:
         self.visitor_info_text.insert(tk.END, f"\n{ticket.display()}\n\n")# Append ticket information to the text widget
 
 
+def main():
+    """Launch the museum GUI."""
+    global tk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox
+    root = tk.Tk()
+    MuseumGUI(root)
+    root.mainloop()
+
 
-root = tk.Tk()
-app = MuseumGUI(root)
-root.mainloop()
+if __name__ == "__main__":
+    main()
 
 
 # In[ ]:
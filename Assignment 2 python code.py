@@ -4,177 +4,16 @@
 # In[1]:
 
 
-import tkinter as tk
-from tkinter import messagebox
-from enum import Enum
 from datetime import datetime
+from event import Location, Event, EventManagement
+from artwork import Artwork, ArtworkManagement
+from visitor import Visitor, GroupVisitor
+from ticket import VisitorInfoManagement, Ticket
+
+# tkinter is imported by main(), so this module can be imported without a display
+tk = None
+messagebox = None
 
-class Location(Enum):
-    PERMANENT_GALLERIES = 1
-    EXHIBITION_HALLS = 2
-    OUTDOOR_SPACES = 3
-
-class Event:
-    def __init__(self, name, location, start_time, end_time):
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        assert isinstance(location, Location), "Invalid location"
-        assert isinstance(start_time, datetime) and isinstance(end_time, datetime), "Invalid start or end time"
-        assert start_time < end_time, "Start time must be before end time"
-        
-        self.name = name.strip()
-        self.location = location
-        self.start_time = start_time
-        self.end_time = end_time
-
-    def display_event_info(self):
-        return f"Name: {self.name}\nLocation: {self.location.name}\nStart Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}\nEnd Time: {self.end_time.strftime('%Y-%m-%d %H:%M')}"
-
-class Exhibition(Event):
-    def __init__(self, name, location, start_time, end_time):
-        super().__init__(name, location, start_time, end_time)
-
-class Tour(Event):
-    def __init__(self, name, location, start_time, end_time, max_capacity):
-        super().__init__(name, location, start_time, end_time)
-        assert isinstance(max_capacity, int) and max_capacity > 0, "Max capacity must be a positive integer"
-        self.max_capacity = max_capacity
-
-class SpecialEvent(Event):
-    def __init__(self, name, location, start_time, end_time, ticket_price):
-        super().__init__(name, location, start_time, end_time)
-        assert isinstance(ticket_price, (int, float)) and ticket_price >= 0, "Ticket price must be a non-negative number"
-        self.ticket_price = ticket_price
-
-class Artwork:
-    def __init__(self, title, artist, date_of_creation, historical_significance, exhibition_location):
-        assert isinstance(title, str) and title.strip(), "Title must be a non-empty string"
-        assert isinstance(artist, str) and artist.strip(), "Artist must be a non-empty string"
-        assert isinstance(date_of_creation, str) and date_of_creation.strip(), "Date of creation must be a non-empty string"
-        assert isinstance(historical_significance, str) and historical_significance.strip(), "Historical significance must be a non-empty string"
-        assert isinstance(exhibition_location, Location), "Invalid exhibition location"
-        
-        self.title = title.strip()
-        self.artist = artist.strip()
-        self.date_of_creation = date_of_creation.strip()
-        self.historical_significance = historical_significance.strip()
-        self.exhibition_location = exhibition_location
-
-class ArtworkManagement:
-    def __init__(self):
-        self.artworks = []
-
-    def add_artwork(self, artwork):
-        assert isinstance(artwork, Artwork), "Invalid artwork"
-        self.artworks.append(artwork)
-
-    def remove_artwork(self, title):
-        assert isinstance(title, str) and title.strip(), "Title must be a non-empty string"
-        for artwork in self.artworks:
-            if artwork.title == title:
-                self.artworks.remove(artwork)
-                return True
-        return False
-
-    def display_artworks(self):
-        return [f"Title: {artwork.title}, Artist: {artwork.artist}, Date of Creation: {artwork.date_of_creation}, Historical Significance: {artwork.historical_significance}, Exhibition Location: {artwork.exhibition_location.name}" for artwork in self.artworks]
-
-class Visitor:
-    def __init__(self, name, age, email, is_student=False, is_teacher=False):
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        assert isinstance(age, int) and age > 0, "Age must be a positive integer"
-        assert isinstance(email, str) and '@' in email, "Invalid email address"
-        
-        self.name = name.strip()
-        self.age = age
-        self.email = email
-        self.is_student = is_student
-        self.is_teacher = is_teacher
-
-class GroupVisitor(Visitor):
-    def __init__(self, name, age, email, group_id):
-        super().__init__(name, age, email)
-        assert isinstance(group_id, str) and group_id.strip(), "Group ID must be a non-empty string"
-        self.group_id = group_id.strip()
-
-class Ticket:
-    def __init__(self, visitor, event):
-        assert isinstance(visitor, Visitor), "Invalid visitor"
-        assert isinstance(event, Event), "Invalid event"
-        
-        self.visitor = visitor
-        self.event = event
-        self.price = self.calculate_ticket_price()
-
-    def calculate_ticket_price(self):
-        base_price = 63  # AED
-        if self.visitor.is_student or self.visitor.is_teacher or self.visitor.age < 18 or self.visitor.age >= 60:
-            return 0  # Free ticket for students, teachers, children, and seniors
-        elif isinstance(self.visitor, GroupVisitor):
-            return (base_price / 2) * 1.05  # 50% discount for group visitors
-        elif isinstance(self.event, SpecialEvent):
-            return (self.event.ticket_price) * 1.05
-        else:
-            return base_price * 1.05  # Full price for adults with 5% VAT
-
-    def display(self):
-        return f"Ticket Information:\nVisitor: {self.visitor.name}\nEvent: {self.event.name}\nLocation: {self.event.location.name}\nStart Time: {self.event.start_time.strftime('%Y-%m-%d %H:%M')}\nEnd Time: {self.event.end_time.strftime('%Y-%m-%d %H:%M')}\nTicket Price: {self.price} AED"
-
-    def display_receipt(self):
-        return f"Payment Receipt:\nVisitor: {self.visitor.name}\nEvent: {self.event.name}\nLocation: {self.event.location.name}\nPrice: {self.price} AED"
-
-class VisitorInfoManagement:
-    def __init__(self):
-        self.visitors = []
-
-    def add_visitor(self, visitor):
-        assert isinstance(visitor, Visitor), "Invalid visitor"
-        self.visitors.append(visitor)
-
-    def remove_visitor(self, email):
-        assert isinstance(email, str) and email.strip(), "Email must be a non-empty string"
-        for visitor in self.visitors:
-            if visitor.email == email:
-                self.visitors.remove(visitor)
-                return True
-        return False
-
-    def purchase_ticket(self, visitor, event):
-        assert isinstance(visitor, Visitor), "Invalid visitor"
-        assert isinstance(event, Event), "Invalid event"
-        
-        ticket = Ticket(visitor, event)
-        return ticket
-
-    def purchase_group_tickets(self, visitors, event):
-        total_price = 0
-        for visitor in visitors:
-            ticket = Ticket(visitor, event)
-            total_price += ticket.price
-        return total_price
-
-class EventManagement:
-    def __init__(self):
-        self.events = []
-
-    def add_event(self, event):
-        assert isinstance(event, Event), "Invalid event"
-        self.events.append(event)
-
-    def remove_event(self, name):
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        for event in self.events:
-            if event.name == name:
-                self.events.remove(event)
-                return True
-        return False
-
-    def get_event_by_name(self, name):
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        for event in self.events:
-            if event.name == name:
-                return event
-        return None
-    
 class ArtworkManagementApp:
     def __init__(self, root):
         self.root = root
@@ -509,10 +348,18 @@ class ArtworkManagementApp:
             messagebox.showinfo("Payment Receipt", ticket.display_receipt())
 
 
+def main():
+    """Launch the museum GUI."""
+    global tk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox
+    root = tk.Tk()
+    ArtworkManagementApp(root)
+    root.mainloop()
+
 
-root = tk.Tk()
-app = ArtworkManagementApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    main()
 
 
 # In[ ]:
@@ -4,12 +4,16 @@
 # In[1]:
 
 
-import tkinter as tk
-from tkinter import messagebox
-from event import EventManagement
-from artwork import ArtworkManagement
+from datetime import datetime
+from event import Location, Event, EventManagement
+from artwork import Artwork, ArtworkManagement
+from visitor import Visitor, GroupVisitor
 from ticket import VisitorInfoManagement, Ticket
 
+# tkinter is imported by main(), so this module can be imported without a display
+tk = None
+messagebox = None
+
 class ArtworkManagementApp:
     def __init__(self, root):
         self.root = root
@@ -343,32 +347,19 @@ class ArtworkManagementApp:
             messagebox.showinfo("Ticket Information", ticket.display())
             messagebox.showinfo("Payment Receipt", ticket.display_receipt())
 
-class EventManagement:
-    def __init__(self):
-        self.events = []
-
-    def add_event(self, event):
-        assert isinstance(event, Event), "Invalid event"
-        self.events.append(event)
-
-    def remove_event(self, name):
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        for event in self.events:
-            if event.name == name:
-                self.events.remove(event)
-                return True
-        return False
-
-    def get_event_by_name(self, name):
-        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
-        for event in self.events:
-            if event.name == name:
-                return event
-        return None
-
-root = tk.Tk()
-app = ArtworkManagementApp(root)
-root.mainloop()
+
+def main():
+    """Launch the museum GUI."""
+    global tk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox
+    root = tk.Tk()
+    ArtworkManagementApp(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
 
 
 # In[ ]:
@@ -4,39 +4,225 @@
 # In[ ]:
 
 
+from array import array
 from event import Location
+from rwlock import RWLock
+from search import ArtworkSearchIndex
+from value_codes import ValueDictionary, positions
+from eras import EraIndex, parse_creation_date
 
 class Artwork:
+    """Class to represent artworks in the museum."""
     def __init__(self, title, artist, date_of_creation, historical_significance, exhibition_location):
+        """Initialize the Artwork object with title, artist, date of creation, historical significance, and exhibition location."""
         assert isinstance(title, str) and title.strip(), "Title must be a non-empty string"
         assert isinstance(artist, str) and artist.strip(), "Artist must be a non-empty string"
         assert isinstance(date_of_creation, str) and date_of_creation.strip(), "Date of creation must be a non-empty string"
         assert isinstance(historical_significance, str) and historical_significance.strip(), "Historical significance must be a non-empty string"
         assert isinstance(exhibition_location, Location), "Invalid exhibition location"
-        
+
         self.title = title.strip()
         self.artist = artist.strip()
         self.date_of_creation = date_of_creation.strip()
         self.historical_significance = historical_significance.strip()
         self.exhibition_location = exhibition_location
 
-        
+
 class ArtworkManagement:
+    """Class to manage artworks in the museum."""
     def __init__(self):
+        """Initialize the ArtworkManagement object with an empty list of artworks."""
         self.artworks = []
+        self._lock = RWLock()
+        self._snapshot = None
+        self.search_index = ArtworkSearchIndex()
+        self._unindexed = []  # added in bulk, indexed on first search or removal
+        # artist, creation date and location repeat across many artworks: each distinct value is kept
+        # once, and the codes of every artwork's values are kept in columns parallel to self.artworks
+        self.artists = ValueDictionary()
+        self.dates = ValueDictionary()
+        self.locations = ValueDictionary()
+        self._artist_codes = array("I")
+        self._date_codes = array("I")
+        self._location_codes = array("I")
+        # each distinct date of creation is parsed once, into a year range indexed by its date code
+        self.date_ranges = []  # date code -> (first year, last year), or None if the text is not understood
+        self.era_index = EraIndex()
+        self._artworks_by_date = []  # date code -> artworks with that date of creation
+        self.catalogue = None  # optional ExhibitionCatalogue, told when an artwork is removed
+
+    def _add_date(self, code):
+        date_range = parse_creation_date(self.dates.values[code])
+        self.date_ranges.append(date_range)
+        self._artworks_by_date.append([])
+        if date_range is not None:
+            self.era_index.add(*date_range, code)
+
+    def _encode(self, artwork):
+        # also swaps the artwork's own copies for the shared ones, so the copies can be freed
+        code = self.artists.encode(artwork.artist)
+        artwork.artist = self.artists.values[code]
+        self._artist_codes.append(code)
+        code = self.dates.encode(artwork.date_of_creation)
+        artwork.date_of_creation = self.dates.values[code]
+        self._date_codes.append(code)
+        if code == len(self.date_ranges):
+            self._add_date(code)
+        self._artworks_by_date[code].append(artwork)
+        self._location_codes.append(self.locations.encode(artwork.exhibition_location))
 
     def add_artwork(self, artwork):
+        """Add an artwork to the list."""
         assert isinstance(artwork, Artwork), "Invalid artwork"
-        self.artworks.append(artwork)
+        with self._lock.write_locked():
+            self.artworks.append(artwork)
+            self._encode(artwork)
+            self.search_index.add(artwork)
+            self._snapshot = None
+
+    def add_artworks(self, artworks):
+        """Add several artworks at once, deferring their indexing until the next search."""
+        artworks = list(artworks)
+        assert all(isinstance(artwork, Artwork) for artwork in artworks), "Invalid artwork"
+        with self._lock.write_locked():
+            self.artworks.extend(artworks)
+            encode_artist, artists, artist_codes = self.artists.encode, self.artists.values, self._artist_codes
+            encode_date, dates, date_codes = self.dates.encode, self.dates.values, self._date_codes
+            by_date = self._artworks_by_date
+            for artwork in artworks:
+                code = encode_artist(artwork.artist)
+                artwork.artist = artists[code]
+                artist_codes.append(code)
+                code = encode_date(artwork.date_of_creation)
+                artwork.date_of_creation = dates[code]
+                date_codes.append(code)
+                if code == len(by_date):
+                    self._add_date(code)
+                by_date[code].append(artwork)
+            self._location_codes.extend(map(self.locations.encode, [artwork.exhibition_location for artwork in artworks]))
+            self._unindexed.extend(artworks)
+            self._snapshot = None
+
+    def _index_pending(self):
+        if self._unindexed:
+            with self._lock.write_locked():
+                pending, self._unindexed = self._unindexed, []
+                for artwork in pending:
+                    self.search_index.add(artwork)
 
     def remove_artwork(self, title):
+        """Remove an artwork from the list."""
         assert isinstance(title, str) and title.strip(), "Title must be a non-empty string"
-        for artwork in self.artworks:
-            if artwork.title == title:
-                self.artworks.remove(artwork)
-                return True
+        self._index_pending()
+        with self._lock.write_locked():
+            for index, artwork in enumerate(self.artworks):
+                if artwork.title == title:
+                    self._artworks_by_date[self._date_codes[index]].remove(artwork)
+                    del self.artworks[index]
+                    del self._artist_codes[index]
+                    del self._date_codes[index]
+                    del self._location_codes[index]
+                    self.search_index.remove(artwork)
+                    self._snapshot = None
+                    if self.catalogue is not None:
+                        self.catalogue.remove_artwork(artwork)
+                    return True
         return False
 
-    def display_artworks(self):
-        return [f"Title: {artwork.title}, Artist: {artwork.artist}, Date of Creation: {artwork.date_of_creation}, Historical Significance: {artwork.historical_significance}, Exhibition Location: {artwork.exhibition_location.name}" for artwork in self.artworks]
+    def pop_artworks(self, titles):
+        """Remove every artwork whose title is in titles, in a single pass.
+
+        Returns:
+        - The list of removed Artwork objects.
+        """
+        titles = set(titles)
+        self._index_pending()
+        with self._lock.write_locked():
+            removed = [artwork for artwork in self.artworks if artwork.title in titles]
+            if removed:
+                kept = [artwork.title not in titles for artwork in self.artworks]
+                removed_ids = set(map(id, removed))
+                for code in {code for code, keep in zip(self._date_codes, kept) if not keep}:
+                    self._artworks_by_date[code] = [artwork for artwork in self._artworks_by_date[code] if id(artwork) not in removed_ids]
+                self.artworks = [artwork for artwork, keep in zip(self.artworks, kept) if keep]
+                self._artist_codes = array("I", [code for code, keep in zip(self._artist_codes, kept) if keep])
+                self._date_codes = array("I", [code for code, keep in zip(self._date_codes, kept) if keep])
+                self._location_codes = array("I", [code for code, keep in zip(self._location_codes, kept) if keep])
+                for artwork in removed:
+                    self.search_index.remove(artwork)
+                    if self.catalogue is not None:
+                        self.catalogue.remove_artwork(artwork)
+                self._snapshot = None
+        return removed
+
+    def filter_artworks(self, artist=None, date_of_creation=None, location=None):
+        """Return the artworks matching every given field exactly; None leaves a field unfiltered.
 
+        Values are looked up once in the registry's value tables, and the
+        artworks are then selected by comparing integer codes, starting with
+        the field that has the most distinct values.
+        """
+        with self._lock.read_locked():
+            filters = []
+            for table, codes, value in ((self.artists, self._artist_codes, artist), (self.dates, self._date_codes, date_of_creation),
+                                        (self.locations, self._location_codes, location)):
+                if value is not None:
+                    code = table.code(value)
+                    if code is None:
+                        return []
+                    filters.append((len(table), codes, code))
+            if not filters:
+                return list(self.artworks)
+            filters.sort(key=lambda entry: entry[0], reverse=True)
+            _, codes, code = filters[0]
+            selected = positions(codes, code)
+            for _, codes, code in filters[1:]:
+                selected = [index for index in selected if codes[index] == code]
+            return [self.artworks[index] for index in selected]
+
+    def created_between(self, first_year, last_year, artist=None, location=None, within=False):
+        """Return the artworks created in a span of years, oldest first.
+
+        Parameters:
+        - first_year, last_year: Inclusive span of years; years BC are negative.
+        - artist, location: Optional exact artist and exhibition location to narrow the result.
+        - within: False (default) to include artworks whose date range overlaps the span,
+          True to only include those whose date range lies entirely inside it.
+
+        Artworks whose date of creation could not be parsed are never returned.
+        """
+        assert isinstance(first_year, int) and isinstance(last_year, int) and first_year <= last_year, "Invalid span of years"
+        with self._lock.read_locked():
+            find = self.era_index.within if within else self.era_index.overlapping
+            result = []
+            for code in sorted(find(first_year, last_year), key=self.date_ranges.__getitem__):
+                for artwork in self._artworks_by_date[code]:
+                    if (artist is None or artwork.artist == artist) and (location is None or artwork.exhibition_location is location):
+                        result.append(artwork)
+            return result
+
+    def search(self, query, limit=10):
+        """Full-text search over title, artist and historical significance.
+
+        Parameters:
+        - query: Free text; matching is case-insensitive and word based.
+        - limit: Maximum number of results.
+
+        Returns:
+        - A list of (Artwork, score) pairs ranked by BM25, best match first.
+        """
+        self._index_pending()
+        with self._lock.read_locked():
+            return self.search_index.search(query, limit)
+
+    def snapshot(self):
+        """Return a consistent, read-only view of the artworks."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock.read_locked():
+                snapshot = self._snapshot = tuple(self.artworks)
+        return snapshot
+
+    def display_artworks(self):
+        """Display all artworks."""
+        return [f"Title: {artwork.title}, Artist: {artwork.artist}, Date of Creation: {artwork.date_of_creation}, Historical Significance: {artwork.historical_significance}, Exhibition Location: {artwork.exhibition_location.name}" for artwork in self.snapshot()]
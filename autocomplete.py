@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+class _TrieNode:
+    __slots__ = ("children", "names")
+
+    def __init__(self):
+        self.children = {}
+        self.names = {}  # original spelling -> number of events with that name, set on terminal nodes
+
+
+class EventNameIndex:
+    """Case-insensitive trie over event names for prefix and typo-tolerant lookups."""
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, name):
+        """Add one occurrence of an event name."""
+        node = self._root
+        for char in name.casefold():
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.names[name] = node.names.get(name, 0) + 1
+
+    def remove(self, name):
+        """Remove one occurrence of an event name. Returns True if it was present, False otherwise."""
+        path = [self._root]
+        key = name.casefold()
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return False
+            path.append(node)
+        node = path[-1]
+        if name not in node.names:
+            return False
+        node.names[name] -= 1
+        if not node.names[name]:
+            del node.names[name]
+        # prune branches that no longer lead to any name
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.names or node.children:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+        return True
+
+    def complete(self, prefix, limit=10):
+        """Return up to limit names starting with prefix, in alphabetical order."""
+        node = self._root
+        for char in prefix.casefold():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return self._collect(node, limit)
+
+    def _collect(self, node, limit):
+        results = []
+        stack = [node]
+        while stack and len(results) < limit:
+            node = stack.pop()
+            results.extend(sorted(node.names))
+            stack.extend(node.children[char] for char in sorted(node.children, reverse=True))
+        return results[:limit]
+
+    def fuzzy(self, name, max_distance=2, limit=10, prefix=False):
+        """Return up to limit names within max_distance edits of name, closest first.
+
+        With prefix=True, name only has to be within max_distance edits of the
+        start of an event name, which suits text that is still being typed;
+        the distance is that of the closest start.
+
+        Walks the trie with one row of the Levenshtein table per node, only
+        filling the diagonal band that can stay within max_distance, and
+        abandons any branch whose row minimum already exceeds it. Edits are
+        allowed anywhere, the first letter included.
+        """
+        key = name.casefold()
+        if not key:
+            return []
+        size = len(key)
+        too_far = max_distance + 1
+        matches = []
+        # each entry: node, depth, its Levenshtein row, and the closest prefix distance on the path to it
+        stack = [(self._root, 0, [min(i, too_far) for i in range(size + 1)], too_far)]
+        while stack:
+            node, depth, row, closest = stack.pop()
+            if prefix:
+                closest = min(closest, row[size])
+                if closest <= max_distance:
+                    if min(row) >= closest:
+                        # no longer path gets any closer, so every name below matches at this distance
+                        matches.extend((closest, found) for found in self._collect(node, limit))
+                        continue
+                    matches.extend((closest, found) for found in node.names)
+            elif node.names and row[size] <= max_distance:
+                matches.extend((row[size], found) for found in node.names)
+            if min(row) > max_distance:
+                continue
+            low = max(1, depth + 1 - max_distance)
+            high = min(size, depth + 1 + max_distance)
+            for char, child in node.children.items():
+                next_row = [too_far] * (size + 1)
+                next_row[0] = min(depth + 1, too_far)
+                for i in range(low, high + 1):
+                    next_row[i] = min(next_row[i - 1] + 1, row[i] + 1, row[i - 1] + (key[i - 1] != char), too_far)
+                stack.append((child, depth + 1, next_row, closest))
+        best = {}
+        for distance, found in matches:
+            if distance < best.get(found, too_far):
+                best[found] = distance
+        return sorted(best, key=lambda found: (best[found], found))[:limit]
+
+    def suggest(self, text, limit=10, max_distance=2):
+        """Return prefix completions of text, topped up with close misspellings.
+
+        Short text allows fewer edits (none below three characters, one below
+        six) so that a couple of typed letters do not match everything.
+        """
+        results = self.complete(text, limit)
+        max_distance = min(max_distance, len(text) // 3)
+        if len(results) < limit and max_distance:
+            for found in self.fuzzy(text, max_distance, limit, prefix=True):
+                if found not in results:
+                    results.append(found)
+                    if len(results) == limit:
+                        break
+        return results
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Contention benchmark for the registry locks.
+
+Reader threads list visitors through snapshots while writer threads add and
+remove visitors and purchaser threads buy tickets. Run from the repository root:
+
+    python benchmarks/bench_contention.py --readers 4 --writers 2 --purchasers 2
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event import Event, Location
+from ticket import VisitorInfoManagement
+from visitor import Visitor
+
+
+def run(readers, writers, purchasers, seconds, preload):
+    management = VisitorInfoManagement()
+    for i in range(preload):
+        management.add_visitor(Visitor("Visitor", 30, f"visitor{i}@example.com"))
+    event = Event("Opening", Location.EXHIBITION_HALLS, datetime(2026, 1, 1, 10), datetime(2026, 1, 1, 18))
+    stop = threading.Event()
+    counts = {"read": 0, "write": 0, "purchase": 0}
+    purchase_latencies = []
+    counts_lock = threading.Lock()
+
+    def reader():
+        done = 0
+        while not stop.is_set():
+            total = 0
+            for visitor in management.snapshot():
+                total += visitor.age
+            done += 1
+        with counts_lock:
+            counts["read"] += done
+
+    def writer(worker):
+        done = 0
+        while not stop.is_set():
+            email = f"writer{worker}-{done}@example.com"
+            management.add_visitor(Visitor("Writer", 40, email))
+            management.remove_visitor(email)
+            done += 2
+        with counts_lock:
+            counts["write"] += done
+
+    def purchaser():
+        done = 0
+        latencies = []
+        visitor = Visitor("Buyer", 35, "buyer@example.com")
+        while not stop.is_set():
+            start = time.perf_counter()
+            management.purchase_ticket(visitor, event)
+            latencies.append(time.perf_counter() - start)
+            done += 1
+        with counts_lock:
+            counts["purchase"] += done
+            purchase_latencies.extend(latencies)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=purchaser) for _ in range(purchasers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"readers={readers} writers={writers} purchasers={purchasers} preload={preload} seconds={seconds}")
+    for kind, count in counts.items():
+        print(f"  {kind:<9} {count / seconds:>12.0f} ops/s")
+    if purchase_latencies:
+        purchase_latencies.sort()
+        p99 = purchase_latencies[int(len(purchase_latencies) * 0.99) - 1]
+        print(f"  purchase p99 latency {p99 * 1e6:.1f} us, max {purchase_latencies[-1] * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--purchasers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--preload", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.readers, args.writers, args.purchasers, args.seconds, args.preload)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Memory and filter benchmark for the dictionary-encoded registry fields.
+
+Builds artworks and visitors whose repeated fields (artist, creation date,
+group id) are separate string objects per record, as they are when typed in
+or parsed from a file, and measures with tracemalloc how much memory adding
+them to the registries frees once each distinct value is shared. Also times
+an equality filter by code against the same filter over the strings. Run
+from the repository root:
+
+    python benchmarks/bench_encoding.py --records 500000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artwork import Artwork, ArtworkManagement
+from event import Location
+from ticket import VisitorInfoManagement
+from visitor import GroupVisitor
+
+LOCATIONS = list(Location)
+
+
+def make_artworks(count):
+    # str() of a fresh f-string gives every record its own copy of the repeated values
+    return [Artwork(f"Artwork {i}", f"Artist number {i % 800} of the collection", f"c. {1400 + i % 600}",
+                    "Part of the permanent collection", LOCATIONS[i % 3]) for i in range(count)]
+
+
+def make_visitors(count):
+    return [GroupVisitor(f"Visitor {i}", 20 + i % 50, f"visitor{i}@school{i % 300}.example.org", f"School group {i // 40}")
+            for i in range(count)]
+
+
+def measure_memory(build, registry, method):
+    """Return the registry and the bytes held by the records alone and once they are in the registry."""
+    gc.collect()
+    tracemalloc.start()
+    records = build()
+    plain = tracemalloc.get_traced_memory()[0]
+    getattr(registry, method)(records)
+    records = None  # the registry now holds the only references
+    gc.collect()
+    registered = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return registry, plain, registered
+
+
+def timed(function, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - begin)
+    return best, result
+
+
+def run(count):
+    management, plain, registered = measure_memory(lambda: make_artworks(count), ArtworkManagement(), "add_artworks")
+    print(f"artworks: {plain / 2 ** 20:8.1f} MiB as records, {registered / 2 ** 20:8.1f} MiB in the registry "
+          f"({registered / plain - 1:+.0%}; {len(management.artists)} artists, {len(management.dates)} dates)")
+    artist = management.artists.values[7]
+    by_string, expected = timed(lambda: [artwork for artwork in management.artworks if artwork.artist == artist and artwork.exhibition_location is LOCATIONS[1]])
+    by_code, found = timed(lambda: management.filter_artworks(artist=artist, location=LOCATIONS[1]))
+    assert found == expected, "Filters disagree"
+    print(f"artist and location filter: {by_string * 1000:.1f} ms comparing strings, {by_code * 1000:.1f} ms comparing codes, {len(found)} matches")
+    management = expected = found = None
+
+    registry, plain, registered = measure_memory(lambda: make_visitors(count), VisitorInfoManagement(), "add_visitors")
+    print(f"visitors: {plain / 2 ** 20:8.1f} MiB as records, {registered / 2 ** 20:8.1f} MiB in the registry, known-visitor filter included "
+          f"({registered / plain - 1:+.0%}; {len(registry.group_ids)} groups)")
+    domain = "school5.example.org"
+    begin = time.perf_counter()
+    registry.visitors_with_domain(domain)  # the first domain query encodes every visitor's domain
+    print(f"first domain query, encoding {len(registry.visitors)} domains: {(time.perf_counter() - begin) * 1000:.1f} ms")
+    by_string, expected = timed(lambda: [visitor for visitor in registry.visitors if visitor.email.rpartition("@")[2].lower() == domain])
+    by_code, found = timed(lambda: registry.visitors_with_domain(domain))
+    assert found == expected, "Filters disagree"
+    print(f"email domain filter: {by_string * 1000:.1f} ms comparing strings, {by_code * 1000:.1f} ms comparing codes, {len(found)} matches")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=500000)
+    args = parser.parse_args()
+    run(args.records)
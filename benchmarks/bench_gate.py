@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Gate validation throughput benchmark.
+
+Issues signed codes through purchase_ticket, then scans every code twice
+(first entry and a duplicate) on one core. Run from the repository root:
+
+    python benchmarks/bench_gate.py --tickets 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event import Event, Location
+from ticket import VisitorInfoManagement
+from ticket_codes import GateValidator, TicketSigner
+from visitor import Visitor
+
+TARGET_SCANS_PER_SECOND = 10000
+
+
+def run(num_tickets):
+    key = b"benchmark-secret-key-0123456789"
+    start = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    event = Event("Opening Day", Location.EXHIBITION_HALLS, start, start + timedelta(hours=10))
+    management = VisitorInfoManagement(ticket_signer=TicketSigner(key))
+    visitor = Visitor("Visitor", 30, "visitor@example.com")
+
+    begin = time.perf_counter()
+    codes = [management.purchase_ticket(visitor, event).code for _ in range(num_tickets)]
+    issue_seconds = time.perf_counter() - begin
+
+    validator = GateValidator(key, event_ids=[event.event_id])
+    now = start + timedelta(hours=1)
+    begin = time.perf_counter()
+    admitted = sum(validator.scan(code, now) == "ok" for code in codes)
+    duplicates = sum(validator.scan(code, now) == "already used" for code in codes)
+    scan_seconds = time.perf_counter() - begin
+
+    rate = 2 * num_tickets / scan_seconds
+    print(f"issued {num_tickets} tickets at {num_tickets / issue_seconds:,.0f}/s (including purchase)")
+    print(f"scanned {2 * num_tickets} codes at {rate:,.0f}/s: {admitted} admitted, {duplicates} duplicates caught")
+    print(f"target {TARGET_SCANS_PER_SECOND:,}/s: {'met' if rate >= TARGET_SCANS_PER_SECOND else 'MISSED'}")
+    return rate >= TARGET_SCANS_PER_SECOND
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=50000)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.tickets) else 1)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Cold-start import time of the core modules, checked against a budget.
+
+Each target is imported in a fresh interpreter several times; the median
+is compared with the budget, and the run fails if importing it loaded
+tkinter. Run from the repository root:
+
+    python benchmarks/bench_import.py --budget-ms 50
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = [
+    "event, artwork, visitor, ticket",
+    "snapshot, wire, ticket_codes",
+    "app",
+]
+DEFAULT_BUDGET_MS = 50.0
+
+_PROBE = """
+import sys, time
+begin = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - begin
+print(elapsed * 1000, "tkinter" in sys.modules)
+"""
+
+
+def measure(target, repeat):
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(target=target)], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.split()
+        times.append(float(output[0]))
+        loads_tk = output[1] == "True"
+    return statistics.median(times), loads_tk
+
+
+def slowest_imports(target, count=5):
+    """Return the modules with the largest cumulative import time, from python -X importtime."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines()[1:]:
+        _, cumulative_us, name = line.split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    failed = False
+    for target in TARGETS:
+        median, loads_tk = measure(target, args.repeat)
+        over = median > args.budget_ms
+        failed |= over or loads_tk
+        status = "over budget" if over else "ok"
+        if loads_tk:
+            status += ", loads tkinter"
+        print(f"import {target:<34}{median:>8.1f} ms  {status}")
+        if over:
+            for cumulative_us, name in slowest_imports(target):
+                print(f"    {cumulative_us / 1000:>8.1f} ms  {name}")
+    print(f"budget {args.budget_ms:.0f} ms: {'MISSED' if failed else 'met'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
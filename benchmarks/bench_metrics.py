@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Metrics recording overhead benchmark.
+
+Times counter increments and histogram observations on one core, subtracts
+the cost of the empty loop, and checks the cost per recorded sample against
+the 1 microsecond budget. Also reports what attaching metrics adds to a
+ticket purchase. Run from the repository root:
+
+    python benchmarks/bench_metrics.py --samples 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event import Event, Location
+from metrics import Counter, Histogram, MuseumMetrics
+from ticket import VisitorInfoManagement
+from visitor import Visitor
+
+BUDGET_NS = 1000
+
+
+def per_call_ns(function, argument, samples):
+    clock = time.perf_counter_ns
+    begin = clock()
+    for _ in range(samples):
+        function(argument)
+    return (clock() - begin) / samples
+
+
+def run(samples):
+    counter = Counter("bench_total", "Benchmark counter.")
+    histogram = Histogram("bench_seconds", "Benchmark histogram.")
+    baseline = per_call_ns(lambda value: None, 1, samples)
+    results = {
+        "Counter.inc": per_call_ns(counter.inc, 1, samples) - baseline,
+        "Histogram.observe": per_call_ns(histogram.observe, 0.0003, samples) - baseline,
+    }
+    for name, ns in results.items():
+        print(f"{name:<20}{ns:>8.0f} ns per sample")
+
+    start = datetime(2026, 1, 1, 9)
+    event = Event("Opening Day", Location.EXHIBITION_HALLS, start, start + timedelta(hours=10))
+    visitor = Visitor("Visitor", 30, "visitor@example.com")
+    purchases = max(1000, samples // 20)
+    plain = per_call_ns(lambda management: management.purchase_ticket(visitor, event), VisitorInfoManagement(), purchases)
+    measured = per_call_ns(lambda management: management.purchase_ticket(visitor, event), VisitorInfoManagement(metrics=MuseumMetrics()), purchases)
+    print(f"purchase_ticket     {plain:>8.0f} ns without metrics, {measured:>8.0f} ns with ({measured - plain:+.0f} ns)")
+
+    worst = max(results.values())
+    print(f"budget {BUDGET_NS} ns per sample: {'met' if worst < BUDGET_NS else 'MISSED'}")
+    return worst < BUDGET_NS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1000000)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.samples) else 1)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Scaling benchmark for the core registries and ticket pricing.
+
+Runs headless at registry sizes from 10^3 to 10^6 records and measures
+throughput, per-call latency percentiles and the memory held by each
+registry. Results are written as JSON; with a baseline file, cases whose
+throughput fell by more than the tolerance are reported as regressions and
+the exit status is 1. Run from the repository root:
+
+    python benchmarks/bench_scaling.py --sizes 1000 10000 100000 1000000
+    python benchmarks/bench_scaling.py --save-baseline    # after a known-good run
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artwork import Artwork, ArtworkManagement
+from event import Event, EventManagement, Location, SpecialEvent
+from ticket import Ticket, VisitorInfoManagement
+from visitor import GroupVisitor, Visitor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(HERE, "scaling_results.json")
+DEFAULT_BASELINE = os.path.join(HERE, "scaling_baseline.json")
+LOCATIONS = list(Location)
+START = datetime(2026, 1, 1, 9)
+
+
+def make_visitor(i):
+    kind = i % 10
+    if kind == 0:
+        return GroupVisitor(f"Visitor {i}", 20 + i % 50, f"visitor{i}@example.com", f"G{i // 20}")
+    return Visitor(f"Visitor {i}", 10 + i % 70, f"visitor{i}@example.com", is_student=kind == 1, is_teacher=kind == 2)
+
+
+def make_event(i):
+    start = START + timedelta(hours=i)
+    if i % 4 == 0:
+        return SpecialEvent(f"Event {i}", LOCATIONS[i % 3], start, start + timedelta(hours=2), 120)
+    return Event(f"Event {i}", LOCATIONS[i % 3], start, start + timedelta(hours=2))
+
+
+def make_artwork(i):
+    return Artwork(f"Artwork {i}", f"Artist {i % 500}", str(1400 + i % 600), "Part of the permanent collection", LOCATIONS[i % 3])
+
+
+def traced(build):
+    """Build a fixture under tracemalloc. Returns the fixture, the bytes it holds and the peak while building."""
+    gc.collect()
+    tracemalloc.start()
+    fixture = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return fixture, current, peak
+
+
+def measure(call, arguments, budget):
+    """Time call(argument) for each argument until they run out or budget seconds have passed."""
+    latencies = []
+    clock = time.perf_counter_ns
+    deadline = time.perf_counter() + budget
+    for argument in arguments:
+        begin = clock()
+        call(argument)
+        latencies.append(clock() - begin)
+        if time.perf_counter() > deadline and len(latencies) >= 5:
+            break
+    return latencies
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(operation, size, latencies, memory_bytes, peak_bytes):
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "operation": operation,
+        "size": size,
+        "calls": len(ordered),
+        "throughput_per_s": len(ordered) / (total / 1e9) if total else float("inf"),
+        "p50_us": percentile(ordered, 0.50) / 1000,
+        "p95_us": percentile(ordered, 0.95) / 1000,
+        "p99_us": percentile(ordered, 0.99) / 1000,
+        "max_us": ordered[-1] / 1000,
+        "memory_bytes": memory_bytes,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run_size(size, max_calls, budget, rng):
+    results = []
+    # mutating operations touch at most a tenth of the registry so its size stays close to size
+    mutations = max(5, min(max_calls, size // 10))
+
+    def build_visitors():
+        management = VisitorInfoManagement()
+        management.add_visitors(make_visitor(i) for i in range(size))
+        return management
+    management, memory, peak = traced(build_visitors)
+    added = measure(management.add_visitor, (make_visitor(size + i) for i in range(mutations)), budget)
+    results.append(summarize("add_visitor", size, added, memory, peak))
+    emails = [f"visitor{i}@example.com" for i in rng.sample(range(size), mutations)]
+    results.append(summarize("remove_visitor", size, measure(management.remove_visitor, emails, budget), memory, peak))
+    event = Event("Group Visit", Location.EXHIBITION_HALLS, START, START + timedelta(hours=8))
+    groups = [[GroupVisitor(f"Member {g}-{m}", 30, f"member{g}-{m}@example.com", f"B{g}") for m in range(10)] for g in range(mutations)]
+    purchased = measure(lambda group: management.purchase_group_tickets(group, event), groups, budget)
+    results.append(summarize("purchase_group_tickets", size, purchased, memory, peak))
+    management = groups = None  # release each fixture before building the next
+
+    def build_events():
+        events = EventManagement()
+        events.add_events(make_event(i) for i in range(size))
+        return events
+    events, memory, peak = traced(build_events)
+    names = [f"Event {rng.randrange(size)}" for _ in range(max_calls)]
+    results.append(summarize("get_event_by_name", size, measure(events.get_event_by_name, names, budget), memory, peak))
+    events = None
+
+    def build_artworks():
+        artworks = ArtworkManagement()
+        artworks.add_artworks(make_artwork(i) for i in range(size))
+        artworks.search("collection")  # index now rather than inside the first timed removal
+        return artworks
+    artworks, memory, peak = traced(build_artworks)
+    decades = [1400 + 10 * rng.randrange(60) for _ in range(max_calls)]
+    eras = measure(lambda decade: artworks.created_between(decade, decade + 9, location=Location.EXHIBITION_HALLS), decades, budget)
+    results.append(summarize("created_between", size, eras, memory, peak))
+    titles = [f"Artwork {i}" for i in rng.sample(range(size), mutations)]
+    results.append(summarize("remove_artwork", size, measure(artworks.remove_artwork, titles, budget), memory, peak))
+    artworks = None
+
+    def build_tickets():
+        events = [make_event(i) for i in range(8)]
+        return [Ticket(make_visitor(i), events[i % len(events)]) for i in range(size)]
+    tickets, memory, peak = traced(build_tickets)
+    priced = measure(Ticket.calculate_ticket_price, (tickets[i] for i in range(0, size, max(1, size // max_calls))), budget)
+    results.append(summarize("calculate_ticket_price", size, priced, memory, peak))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the cases whose throughput dropped by more than tolerance against the baseline."""
+    previous = {(case["operation"], case["size"]): case for case in baseline["results"]}
+    regressions = []
+    for case in results:
+        before = previous.get((case["operation"], case["size"]))
+        if before is not None and case["throughput_per_s"] < before["throughput_per_s"] * (1 - tolerance):
+            regressions.append((case, before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--calls", type=int, default=1000, help="maximum timed calls per case")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds of timed calls per case")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="also store the results as the new baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    print(f"{'operation':<24}{'size':>9}{'calls':>7}{'ops/s':>13}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'MiB':>8}")
+    for size in args.sizes:
+        for case in run_size(size, args.calls, args.budget, rng):
+            results.append(case)
+            print(f"{case['operation']:<24}{case['size']:>9}{case['calls']:>7}{case['throughput_per_s']:>13,.0f}"
+                  f"{case['p50_us']:>10.1f}{case['p95_us']:>10.1f}{case['p99_us']:>10.1f}{case['memory_bytes'] / 2 ** 20:>8.1f}")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against; rerun with --save-baseline to store one")
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    for case, before in regressions:
+        print(f"REGRESSION {case['operation']} at {case['size']}: {case['throughput_per_s']:,.0f} ops/s, baseline {before['throughput_per_s']:,.0f} ops/s")
+    if not regressions:
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
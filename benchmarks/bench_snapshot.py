@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Snapshot save/load benchmark.
+
+Fills the three registries with the given total number of records (mostly
+visitors, as on a busy day), saves a snapshot and loads it back. Run from
+the repository root:
+
+    python benchmarks/bench_snapshot.py --records 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artwork import Artwork, ArtworkManagement
+from event import Event, EventManagement, Location, Tour
+from snapshot import load_snapshot, save_snapshot
+from ticket import VisitorInfoManagement
+from visitor import GroupVisitor, Visitor
+
+TARGET_LOAD_SECONDS = 1.0
+ARTISTS = ["Vermeer", "Hokusai", "Kahlo", "Monet", "Al-Wasiti", "O'Keeffe", "Basquiat", "Rembrandt"]
+
+
+def build(num_records):
+    num_events = max(1, num_records // 50)
+    num_artworks = max(1, num_records // 5)
+    num_visitors = max(1, num_records - num_events - num_artworks)
+    locations = list(Location)
+    events = EventManagement()
+    start = datetime(2026, 1, 1, 9)
+    events.add_events(
+        Tour(f"Tour {i}", locations[i % 3], start + timedelta(hours=i), start + timedelta(hours=i + 1), 25) if i % 2 else
+        Event(f"Event {i}", locations[i % 3], start + timedelta(hours=i), start + timedelta(hours=i + 2))
+        for i in range(num_events))
+    artworks = ArtworkManagement()
+    artworks.add_artworks(Artwork(f"Study {i}", ARTISTS[i % len(ARTISTS)], str(1500 + i % 500), "Part of the permanent collection", locations[i % 3])
+                          for i in range(num_artworks))
+    visitors = VisitorInfoManagement()
+    visitors.add_visitors(GroupVisitor(f"Visitor {i}", 20 + i % 60, f"visitor{i}@example.com", f"G{i // 20}") if i % 10 == 0 else
+                          Visitor(f"Visitor {i}", 20 + i % 60, f"visitor{i}@example.com", is_student=i % 7 == 0)
+                          for i in range(num_visitors))
+    return events, artworks, visitors
+
+
+def run(num_records):
+    events, artworks, visitors = build(num_records)
+    expected = [len(events.snapshot()), len(artworks.snapshot()), len(visitors.snapshot())]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "museum.snapshot")
+        begin = time.perf_counter()
+        size = save_snapshot(path, events, artworks, visitors)
+        save_seconds = time.perf_counter() - begin
+        del events, artworks, visitors
+        load_times = []
+        for _ in range(3):
+            loaded = None
+            begin = time.perf_counter()
+            loaded = load_snapshot(path)
+            load_times.append(time.perf_counter() - begin)
+        load_seconds = min(load_times)
+    counts = [len(loaded[0].snapshot()), len(loaded[1].snapshot()), len(loaded[2].snapshot())]
+    assert counts == expected, "Snapshot lost records"
+    print(f"{sum(counts)} records ({counts[0]} events, {counts[1]} artworks, {counts[2]} visitors), {size / 2 ** 20:.1f} MiB")
+    print(f"save {save_seconds:.2f} s, load best of 3 {load_seconds:.2f} s (first {load_times[0]:.2f} s)")
+    print(f"load target {TARGET_LOAD_SECONDS:.1f} s: {'met' if load_seconds <= TARGET_LOAD_SECONDS else 'MISSED'}")
+    return load_seconds <= TARGET_LOAD_SECONDS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000000)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.records) else 1)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Wire format benchmark: binary record batches against pickle and JSON.
+
+Encodes and decodes a batch of tickets for a few hundred events. Pickle
+carries each ticket's visitor and event along; the JSON variant references
+them by id like the binary format does. Run from the repository root:
+
+    python benchmarks/bench_wire.py --tickets 100000
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event import Exhibition, Location
+from ticket import Ticket
+from visitor import Visitor
+import wire
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def to_json(tickets):
+    return json.dumps([{"ticket_id": ticket.ticket_id, "visitor": ticket.visitor.email, "event": wire.event_key(ticket.event),
+                        "price": ticket.price, "entry_slot": ticket.entry_slot, "code": ticket.code,
+                        "refunded": ticket.refunded} for ticket in tickets]).encode("utf-8")
+
+
+def from_json(data, visitors, events):
+    tickets = []
+    for record in json.loads(data):
+        ticket = Ticket(visitors[record["visitor"]], events[record["event"]])
+        ticket.price = record["price"]
+        ticket.ticket_id = record["ticket_id"]
+        ticket.entry_slot = record["entry_slot"]
+        ticket.code = record["code"]
+        ticket.refunded = record["refunded"]
+        tickets.append(ticket)
+    return tickets
+
+
+def run(num_tickets, num_events):
+    start = datetime(2026, 1, 1, 10)
+    events = [Exhibition(f"Exhibition {i}", Location.EXHIBITION_HALLS, start + timedelta(days=i), start + timedelta(days=i, hours=8))
+              for i in range(num_events)]
+    visitors = [Visitor(f"Visitor {i}", 20 + i % 50, f"visitor{i}@example.com") for i in range(num_tickets // 4 + 1)]
+    tickets = []
+    for i in range(num_tickets):
+        ticket = Ticket(visitors[i % len(visitors)], events[i % num_events])
+        ticket.ticket_id = i + 1
+        tickets.append(ticket)
+    by_email = {visitor.email: visitor for visitor in visitors}
+    by_key = {wire.event_key(event): event for event in events}
+
+    results = []
+    data, encode = timed(wire.encode_tickets, tickets)
+    batch, view = timed(wire.RecordBatch, data)
+    _, scan = timed(lambda: sum(row[3] for row in batch.rows()))
+    _, decode = timed(wire.decode_tickets, data, by_email, by_key)
+    results.append(("binary", len(data), encode, decode))
+    data, encode = timed(pickle.dumps, tickets, pickle.HIGHEST_PROTOCOL)
+    _, decode = timed(pickle.loads, data)
+    results.append(("pickle", len(data), encode, decode))
+    data, encode = timed(to_json, tickets)
+    _, decode = timed(from_json, data, by_email, by_key)
+    results.append(("json", len(data), encode, decode))
+
+    print(f"{num_tickets} tickets over {num_events} events")
+    print(f"{'format':<8}{'bytes/ticket':>14}{'encode ms':>12}{'decode ms':>12}")
+    for name, size, encode, decode in results:
+        print(f"{name:<8}{size / num_tickets:>14.1f}{encode * 1000:>12.1f}{decode * 1000:>12.1f}")
+    print(f"binary view open {view * 1e6:.0f} us, price column scan without objects {scan * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=100000)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+    run(args.tickets, args.events)
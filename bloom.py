@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import hashlib
+import math
+import struct
+import threading
+
+_HEADER = struct.Struct("<QQIQ")  # capacity, bit count, hash count, item count
+
+
+def _hashes(key):
+    # the two base hashes of double hashing, shared by every stage of a scalable filter
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter: no false negatives, a bounded false-positive rate.
+
+    Adds are made under a lock, as a lost bit would be a false negative.
+    """
+    def __init__(self, capacity, error_rate=0.01):
+        """Initialize a filter sized for capacity items at the given false-positive rate."""
+        assert isinstance(capacity, int) and capacity > 0, "Capacity must be a positive integer"
+        assert 0 < error_rate < 1, "Error rate must be between 0 and 1"
+        self.capacity = capacity
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, hashes):
+        # double hashing: position i is h1 + i * h2
+        h1, h2 = hashes
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """Add a key. Returns False if it was (probably) present already, in which case nothing changes."""
+        return self._add_hashes(_hashes(key))
+
+    def _add_hashes(self, hashes):
+        positions = self._positions(hashes)
+        bits = self._bits
+        with self._lock:
+            if all(bits[position >> 3] & (1 << (position & 7)) for position in positions):
+                return False
+            for position in positions:
+                bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+            return True
+
+    def _has_hashes(self, hashes):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(hashes))
+
+    def __contains__(self, key):
+        return self._has_hashes(_hashes(key))
+
+    def to_bytes(self):
+        return _HEADER.pack(self.capacity, self.num_bits, self.num_hashes, self.count) + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.num_bits, bloom.num_hashes, bloom.count = _HEADER.unpack_from(data)
+        bloom._bits = bytearray(data[_HEADER.size:_HEADER.size + (bloom.num_bits + 7) // 8])
+        bloom._lock = threading.Lock()
+        return bloom
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows by adding tighter stages as items arrive.
+
+    Each new stage is twice as large and has half the false-positive rate of
+    the previous one, so the overall rate stays below error_rate however
+    many items are added. Keys that are already present are not added
+    again, so repeated adds do not use up stage capacity.
+    """
+    def __init__(self, initial_capacity=1024, error_rate=0.01):
+        """Initialize the filter with a first stage of initial_capacity items."""
+        assert isinstance(initial_capacity, int) and initial_capacity > 0, "Capacity must be a positive integer"
+        assert 0 < error_rate < 1, "Error rate must be between 0 and 1"
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self._stages = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(stage.count for stage in self._stages)
+
+    def add(self, key):
+        """Add a key. Returns False if it was (probably) present already, in which case nothing changes."""
+        hashes = _hashes(key)
+        with self._lock:
+            if any(stage._has_hashes(hashes) for stage in self._stages):
+                return False
+            if not self._stages or self._stages[-1].count >= self._stages[-1].capacity:
+                size = len(self._stages)
+                self._stages.append(BloomFilter(self.initial_capacity * 2 ** size, self.error_rate * 0.5 ** (size + 1)))
+            return self._stages[-1]._add_hashes(hashes)
+
+    def __contains__(self, key):
+        hashes = _hashes(key)
+        return any(stage._has_hashes(hashes) for stage in reversed(self._stages))
+
+    def to_bytes(self):
+        """Serialize the filter so it can be stored with a registry snapshot."""
+        with self._lock:
+            stages = list(self._stages)
+        parts = [struct.pack("<QdI", self.initial_capacity, self.error_rate, len(stages))]
+        for stage in stages:
+            data = stage.to_bytes()
+            parts.append(struct.pack("<Q", len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        initial_capacity, error_rate, num_stages = struct.unpack_from("<QdI", data)
+        bloom = cls(initial_capacity, error_rate)
+        offset = struct.calcsize("<QdI")
+        for _ in range(num_stages):
+            (size,) = struct.unpack_from("<Q", data, offset)
+            offset += 8
+            bloom._stages.append(BloomFilter.from_bytes(data[offset:offset + size]))
+            offset += size
+        return bloom
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from event import Event, Tour
+
+UNLIMITED = -1
+_FIELDS = 3  # key hash, sold, capacity
+
+
+def _key_hash(event_key):
+    # 0 marks an empty slot, so keep hashes strictly positive
+    digest = hashlib.blake2b(event_key.encode("utf-8"), digest_size=8).digest()
+    return (int.from_bytes(digest, "big") >> 1) or 1
+
+
+def _event_key(event):
+    # event_id is name@start, so add the location to tell same-name events at different locations apart
+    return f"{event.event_id}@{event.location.name}"
+
+
+class SharedCapacityCounters:
+    """Per-event sold and capacity counters kept in shared memory.
+
+    Every process on the machine that opens the same name sees the same
+    counters. Updates are made under a byte-range lock on a lock file, one
+    byte per slot, so sales of different events do not contend. Byte-range
+    locks belong to the whole process, so threads of one process also take
+    a per-slot thread lock around them.
+    """
+    def __init__(self, name="museum_capacity", slots=4096, create=False):
+        """Open (or create) the shared counter table.
+
+        Parameters:
+        - name: Name of the shared memory block, shared by all processes.
+        - slots: Maximum number of events the table can hold.
+        - create: True to create the block, False to attach to an existing one.
+        """
+        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
+        assert isinstance(slots, int) and slots > 0, "Slots must be a positive integer"
+        self.name = name
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=slots * _FIELDS * 8)
+            self._shm.buf[:] = bytes(len(self._shm.buf))
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.slots = len(self._shm.buf) // (_FIELDS * 8)
+        self._table = self._shm.buf.cast("q")
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._slot_cache = {}
+        self._tracked = True  # whether the resource tracker unlinks the table at exit
+        self._thread_locks = {}  # slot -> threading.Lock, created on first use
+
+    @classmethod
+    def attach_or_create(cls, name="museum_capacity", slots=4096):
+        """Attach to the named table, creating it if no process has yet.
+
+        The table outlives this process, so processes started later (another
+        GUI, a batch run) keep counting against the same places; unlink()
+        removes it.
+        """
+        try:
+            counters = cls(name, slots, create=True)
+        except FileExistsError:
+            counters = cls(name, slots)
+        # the resource tracker would otherwise unlink the table when this process exits
+        resource_tracker.unregister(counters._shm._name, "shared_memory")
+        counters._tracked = False
+        return counters
+
+    def _lock(self, slot):
+        thread_lock = self._thread_locks.get(slot)
+        if thread_lock is None:
+            thread_lock = self._thread_locks.setdefault(slot, threading.Lock())
+        thread_lock.acquire()
+        try:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, slot)
+        except BaseException:
+            thread_lock.release()
+            raise
+
+    def _unlock(self, slot):
+        try:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, slot)
+        finally:
+            self._thread_locks[slot].release()
+
+    def _find(self, event_key, insert=False):
+        slot = self._slot_cache.get(event_key)
+        if slot is not None:
+            return slot
+        key = _key_hash(event_key)
+        table_lock = self.slots  # one byte past the slot locks guards inserts
+        if insert:
+            self._lock(table_lock)
+        try:
+            index = key % self.slots
+            for _ in range(self.slots):
+                stored = self._table[index * _FIELDS]
+                if stored == key:
+                    self._slot_cache[event_key] = index
+                    return index
+                if stored == 0:
+                    if not insert:
+                        return None
+                    self._table[index * _FIELDS + 2] = UNLIMITED
+                    self._table[index * _FIELDS] = key
+                    self._slot_cache[event_key] = index
+                    return index
+                index = (index + 1) % self.slots
+        finally:
+            if insert:
+                self._unlock(table_lock)
+        assert not insert, "Capacity table is full"
+        return None
+
+    def _slot(self, event):
+        assert isinstance(event, Event), "Invalid event"
+        slot = self._find(_event_key(event))
+        assert slot is not None, "Event is not registered"
+        return slot
+
+    def register(self, event, capacity=None):
+        """Register an event. Capacity defaults to Tour.max_capacity, otherwise unlimited."""
+        assert isinstance(event, Event), "Invalid event"
+        if capacity is None:
+            capacity = event.max_capacity if isinstance(event, Tour) else UNLIMITED
+        assert isinstance(capacity, int) and (capacity > 0 or capacity == UNLIMITED), "Capacity must be a positive integer"
+        slot = self._find(_event_key(event), insert=True)
+        self._lock(slot)
+        try:
+            self._table[slot * _FIELDS + 2] = capacity
+        finally:
+            self._unlock(slot)
+        return slot
+
+    def is_registered(self, event):
+        return self._find(_event_key(event)) is not None
+
+    def try_sell(self, event, count=1):
+        """Atomically sell count places. Returns True on success, False if that would exceed capacity."""
+        assert isinstance(count, int) and count > 0, "Count must be a positive integer"
+        slot = self._slot(event)
+        self._lock(slot)
+        try:
+            sold = self._table[slot * _FIELDS + 1]
+            capacity = self._table[slot * _FIELDS + 2]
+            if capacity != UNLIMITED and sold + count > capacity:
+                return False
+            self._table[slot * _FIELDS + 1] = sold + count
+            return True
+        finally:
+            self._unlock(slot)
+
+    def refund(self, event, count=1):
+        """Atomically give back count places."""
+        assert isinstance(count, int) and count > 0, "Count must be a positive integer"
+        slot = self._slot(event)
+        self._lock(slot)
+        try:
+            sold = self._table[slot * _FIELDS + 1]
+            assert sold >= count, "Cannot refund more places than were sold"
+            self._table[slot * _FIELDS + 1] = sold - count
+        finally:
+            self._unlock(slot)
+
+    def sold(self, event):
+        return self._table[self._slot(event) * _FIELDS + 1]
+
+    def capacity(self, event):
+        return self._table[self._slot(event) * _FIELDS + 2]
+
+    def remaining(self, event):
+        """Return the places left, or None for an unlimited event."""
+        slot = self._slot(event)
+        capacity = self._table[slot * _FIELDS + 2]
+        if capacity == UNLIMITED:
+            return None
+        return capacity - self._table[slot * _FIELDS + 1]
+
+    def close(self):
+        """Detach this process from the shared table."""
+        self._table.release()
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self):
+        """Destroy the shared table and its lock file. Call once, from the process that created it."""
+        if not self._tracked:
+            # SharedMemory.unlink tells the tracker to forget the table, so it must know of it
+            resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+        try:
+            os.remove(self._lock_path)
+        except FileNotFoundError:
+            pass
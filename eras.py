@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import bisect
+import re
+
+CIRCA_YEARS = 10  # "c. 1650" is taken to mean 1640-1660
+
+_CIRCA = re.compile(r"^(?:c\.|ca\.|c |circa |about |around )\s*")
+_ERA = re.compile(r"\s*\b(b\.?c\.?e?\.?|a\.?d\.?|c\.?e\.?)$")
+_CENTURY = re.compile(r"^(?:(early|mid|late)[\s-]+)?(\d{1,2})(?:st|nd|rd|th)(?:\s*(?:-|to)\s*(\d{1,2})(?:st|nd|rd|th))?\s+centur(?:y|ies)$")
+_DECADE = re.compile(r"^(\d{2,3})0s$")
+_RANGE = re.compile(r"^(\d{1,4})\s*(?:-|to|/)\s*(\d{1,4})$")
+_YEAR = re.compile(r"^\d{1,4}$")
+_THIRDS = {None: (0, 99), "early": (0, 32), "mid": (33, 66), "late": (67, 99)}
+
+
+def parse_creation_date(text):
+    """Parse a free-text creation date into the range of years it covers.
+
+    Understands single years ("1650"), ranges ("1650-1655", "1650-55"),
+    decades and centuries written as years ("1890s", "1600s"), ordinal
+    centuries with an optional early/mid/late ("12th century",
+    "late 17th-18th century"), a leading "c."/"circa" and a trailing BC/BCE
+    or AD/CE. Years BC are negative.
+
+    Returns:
+    - A (first year, last year) tuple, or None if the text is not understood.
+    """
+    text = text.strip().lower().replace("–", "-").replace("—", "-").rstrip("?").strip()
+    circa = _CIRCA.match(text)
+    if circa:
+        text = text[circa.end():]
+    sign = 1
+    if text.startswith(("ad ", "a.d. ")):
+        text = text.split(" ", 1)[1].strip()
+    era = _ERA.search(text)
+    if era:
+        if era.group(1).startswith("b"):
+            sign = -1
+        text = text[:era.start()].strip()
+
+    match = _CENTURY.match(text)
+    if match:
+        third, first, last = match.group(1), int(match.group(2)), int(match.group(3) or match.group(2))
+        if first == 0 or last == 0:
+            return None
+        if sign < 0:
+            # counting runs backwards: the 5th century BC is 500-401 BC
+            first, last = max(first, last), min(first, last)
+            start, end = -100 * first, -100 * (last - 1) - 1
+        else:
+            start, end = 100 * (first - 1), 100 * last - 1
+        if third is not None:
+            low, high = _THIRDS[third]
+            start, end = start + low, start + high if first == last else end
+        return _widen(start, end, circa)
+    match = _DECADE.match(text)
+    if match:
+        year = int(match.group(1)) * 10
+        span = 99 if year % 100 == 0 else 9
+        return _widen(*_signed(year, year + span, sign), circa)
+    match = _RANGE.match(text)
+    if match:
+        first, last = match.group(1), match.group(2)
+        if len(last) < len(first):
+            last = first[:len(first) - len(last)] + last  # 1650-55
+        return _widen(*_signed(int(first), int(last), sign), circa)
+    if _YEAR.match(text):
+        year = int(text)
+        return _widen(*_signed(year, year, sign), circa)
+    return None
+
+
+def _signed(first, last, sign):
+    if sign < 0:
+        first, last = -first, -last
+    return min(first, last), max(first, last)
+
+
+def _widen(start, end, circa):
+    if circa:
+        return start - CIRCA_YEARS, end + CIRCA_YEARS
+    return start, end
+
+
+class EraIndex:
+    """Index of keyed inclusive integer ranges, such as years of creation, for overlap and containment queries.
+
+    Ranges are kept in start order in one list per span class (spans below
+    2, 4, 8, ... units). Within a class every range that can overlap a
+    window starts at most one class span before it, so a query is a bisect
+    per class plus a scan of the ranges near the window, O(log n + k).
+    """
+    def __init__(self):
+        self._classes = {}  # span bit length -> sorted list of (start, end, key)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._classes.values())
+
+    def add(self, start, end, key):
+        assert start <= end, "A range cannot end before it starts"
+        bisect.insort(self._classes.setdefault((end - start).bit_length(), []), (start, end, key))
+
+    def remove(self, start, end, key):
+        """Remove a range. Returns True if it was present, False otherwise."""
+        entries = self._classes.get((end - start).bit_length(), [])
+        index = bisect.bisect_left(entries, (start, end, key))
+        if index < len(entries) and entries[index] == (start, end, key):
+            del entries[index]
+            return True
+        return False
+
+    def overlapping(self, first, last):
+        """Yield the keys of the ranges sharing at least one year with first..last."""
+        for bits, entries in self._classes.items():
+            lowest = first - ((1 << bits) - 1)  # the longest range in the class, ending at first
+            for index in range(bisect.bisect_left(entries, (lowest,)), bisect.bisect_right(entries, (last, float("inf")))):
+                start, end, key = entries[index]
+                if end >= first:
+                    yield key
+
+    def within(self, first, last):
+        """Yield the keys of the ranges lying entirely inside first..last."""
+        for entries in self._classes.values():
+            for index in range(bisect.bisect_left(entries, (first,)), bisect.bisect_right(entries, (last, float("inf")))):
+                start, end, key = entries[index]
+                if end <= last:
+                    yield key
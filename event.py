@@ -4,48 +4,305 @@
 # In[1]:
 
 
+import bisect
+import heapq
+import itertools
 from enum import Enum
 from datetime import datetime
+from rwlock import RWLock
+from autocomplete import EventNameIndex
+from timed_entry import TimedEntrySchedule
 
 class Location(Enum):
+    """Enumeration class for different locations within the museum."""
     PERMANENT_GALLERIES = 1
     EXHIBITION_HALLS = 2
     OUTDOOR_SPACES = 3
 
 class Event:
+    """Base class for all museum events."""
     def __init__(self, name, location, start_time, end_time):
+        """Initialize the Event object with name, location, start time, and end time."""
         assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
         assert isinstance(location, Location), "Invalid location"
         assert isinstance(start_time, datetime) and isinstance(end_time, datetime), "Invalid start or end time"
         assert start_time < end_time, "Start time must be before end time"
-        
+
         self.name = name.strip()
         self.location = location
         self.start_time = start_time
         self.end_time = end_time
 
+    @property
+    def event_id(self):
+        """Stable identifier of the event, shared by every process."""
+        return f"{self.name}@{self.start_time.strftime('%Y-%m-%d %H:%M')}"
+
     def display_event_info(self):
+        """Display information about the event."""
         return f"Name: {self.name}\nLocation: {self.location.name}\nStart Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}\nEnd Time: {self.end_time.strftime('%Y-%m-%d %H:%M')}"
 
 class Exhibition(Event):
+    """Subclass of Event for exhibitions."""
     def __init__(self, name, location, start_time, end_time):
+        """Initialize the Exhibition object."""
         super().__init__(name, location, start_time, end_time)
+        self.timed_entry = None
+
+    def enable_timed_entry(self, slot_minutes, slot_capacity):
+        """Switch the exhibition to timed entry, with slot_capacity visitors admitted per slot."""
+        self.timed_entry = TimedEntrySchedule(self.start_time, self.end_time, slot_minutes, slot_capacity)
 
 class Tour(Event):
+    """Subclass of Event for guided tours."""
     def __init__(self, name, location, start_time, end_time, max_capacity):
+        """Initialize the Tour object with maximum capacity."""
         super().__init__(name, location, start_time, end_time)
         assert isinstance(max_capacity, int) and max_capacity > 0, "Max capacity must be a positive integer"
         self.max_capacity = max_capacity
 
 class SpecialEvent(Event):
+    """Subclass of Event for special events."""
     def __init__(self, name, location, start_time, end_time, ticket_price):
+        """Initialize the SpecialEvent object with ticket price."""
         super().__init__(name, location, start_time, end_time)
         assert isinstance(ticket_price, (int, float)) and ticket_price >= 0, "Ticket price must be a non-negative number"
         self.ticket_price = ticket_price
 
 
-# In[ ]:
+class EventManagement:
+    def __init__(self):
+        """Initialize EventManagement with an empty list to store events."""
+        self.events = []
+        self._lock = RWLock()
+        self._snapshot = None
+        self.name_index = EventNameIndex()
+        self.series = []
+        # per-location lists of (start time, sequence, event), kept sorted by start time
+        self._schedule = {location: [] for location in Location}
+        self._schedule_keys = {}  # id(event) -> its key in the schedule
+        self._sequence = itertools.count()
+        self.catalogue = None  # optional ExhibitionCatalogue, told when an event is removed
+
+    def add_event(self, event):
+        """Add an event to the list of events.
+
+        Parameters:
+        - event: An Event object to be added.
+
+        Raises:
+        - AssertionError: If the provided event is not an instance of the Event class.
+        """
+        assert isinstance(event, Event), "Invalid event"
+        with self._lock.write_locked():
+            self._insert(event)
+            self._snapshot = None
+
+    def add_events(self, events):
+        """Add several events under a single lock acquisition, e.g. when loading a snapshot."""
+        events = list(events)
+        assert all(isinstance(event, Event) for event in events), "Invalid event"
+        with self._lock.write_locked():
+            for event in events:
+                self._insert(event, sort=False)
+            for schedule in self._schedule.values():
+                schedule.sort()  # one merge of the appended keys instead of an insort each
+            self._snapshot = None
+
+    def _insert(self, event, sort=True):
+        self.events.append(event)
+        self.name_index.add(event.name)
+        key = (event.start_time, next(self._sequence), event)
+        if sort:
+            bisect.insort(self._schedule[event.location], key)
+        else:
+            self._schedule[event.location].append(key)
+        self._schedule_keys[id(event)] = key
+
+    def remove_event(self, name):
+        """Remove an event from the list of events based on its name.
+
+        Parameters:
+        - name: A string representing the name of the event to be removed.
+
+        Returns:
+        - True if the event is successfully removed, False otherwise.
+
+        Raises:
+        - AssertionError: If the provided name is not a non-empty string.
+        """
+        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
+        with self._lock.write_locked():
+            for event in self.events:
+                if event.name == name:
+                    self.events.remove(event)
+                    self.name_index.remove(event.name)
+                    schedule = self._schedule[event.location]
+                    key = self._schedule_keys.pop(id(event))
+                    del schedule[bisect.bisect_left(schedule, key[:2])]
+                    self._snapshot = None
+                    if self.catalogue is not None:
+                        self.catalogue.remove_exhibition(event)
+                    return True
+        return False
+
+    def pop_events(self, names):
+        """Remove every event whose name is in names, in a single pass.
+
+        Returns:
+        - The list of removed Event objects.
+        """
+        names = set(names)
+        with self._lock.write_locked():
+            removed = [event for event in self.events if event.name in names]
+            if removed:
+                self.events = [event for event in self.events if event.name not in names]
+                for event in removed:
+                    self.name_index.remove(event.name)
+                    self._schedule_keys.pop(id(event))
+                for location, schedule in self._schedule.items():
+                    self._schedule[location] = [key for key in schedule if key[2].name not in names]
+                self._snapshot = None
+                if self.catalogue is not None:
+                    for event in removed:
+                        self.catalogue.remove_exhibition(event)
+        return removed
+
+    def get_event_by_name(self, name):
+        """Retrieve an event from the list of events based on its name.
+
+        A recurring series name resolves to its next occurrence from now.
+
+        Parameters:
+        - name: A string representing the name of the event to retrieve.
+
+        Returns:
+        - The Event object with the specified name if found, None otherwise.
+
+        Raises:
+        - AssertionError: If the provided name is not a non-empty string.
+        """
+        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
+        with self._lock.read_locked():
+            for event in self.events:
+                if event.name == name:
+                    return event
+            for series in self.series:
+                if series.name == name:
+                    occurrence = series.next_occurrence(datetime.now())
+                    if occurrence is not None:
+                        return occurrence
+        return None
+
+    def add_series(self, series):
+        """Add a recurring event series; its occurrences are only built when queried.
+
+        Parameters:
+        - series: An EventSeries object to be added.
+
+        Raises:
+        - AssertionError: If the provided series is not an instance of the EventSeries class.
+        """
+        from recurrence import EventSeries  # recurrence builds on this module
+        assert isinstance(series, EventSeries), "Invalid event series"
+        with self._lock.write_locked():
+            self.series.append(series)
+            self.name_index.add(series.name)
+
+    def remove_series(self, name):
+        """Remove a recurring event series based on its name. Returns True if removed, False otherwise."""
+        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
+        with self._lock.write_locked():
+            for series in self.series:
+                if series.name == name:
+                    self.series.remove(series)
+                    self.name_index.remove(series.name)
+                    return True
+        return False
+
+    def get_occurrence(self, name, start_time):
+        """Retrieve the event called name that starts at start_time, including series occurrences.
+
+        Returns:
+        - The Event object if found, None otherwise.
+        """
+        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
+        with self._lock.read_locked():
+            for event in self.events:
+                if event.name == name and event.start_time == start_time:
+                    return event
+            for series in self.series:
+                if series.name == name:
+                    occurrence = series.occurrence_at(start_time)
+                    if occurrence is not None:
+                        return occurrence
+        return None
+
+    def events_between(self, window_start, window_end):
+        """Return all events overlapping [window_start, window_end), earliest first.
+
+        Recurring series contribute only the occurrences inside the window.
+        """
+        assert window_start < window_end, "Start time must be before end time"
+        with self._lock.read_locked():
+            found = [event for event in self.events if event.start_time < window_end and event.end_time > window_start]
+            for series in self.series:
+                found.extend(series.occurrences(window_start, window_end))
+        found.sort(key=lambda event: event.start_time)
+        return found
+
+    def next_events(self, location=None, after=None, n=10):
+        """Return the next n events starting at or after a given time, earliest first.
+
+        Parameters:
+        - location: A Location to restrict the schedule to, or None for every location.
+        - after: A datetime; defaults to now.
+        - n: Maximum number of events to return.
+
+        Returns:
+        - A list of at most n Event objects, including occurrences of recurring series.
+        """
+        assert location is None or isinstance(location, Location), "Invalid location"
+        assert isinstance(n, int) and n > 0, "Number of events must be a positive integer"
+        if after is None:
+            after = datetime.now()
+        locations = list(Location) if location is None else [location]
+        with self._lock.read_locked():
+            # each schedule is already sorted, so only n entries per location are touched
+            sources = []
+            for place in locations:
+                schedule = self._schedule[place]
+                start = bisect.bisect_left(schedule, (after,))
+                sources.append((key[0], key[2]) for key in itertools.islice(schedule, start, start + n))
+            for series in self.series:
+                if series.location in locations:
+                    occurrences = series.occurrences(after, datetime.max)
+                    sources.append((event.start_time, event) for event in occurrences if event.start_time >= after)
+            merged = heapq.merge(*sources, key=lambda item: item[0])
+            return [event for _, event in itertools.islice(merged, n)]
+
+    def suggest_event_names(self, text, limit=10):
+        """Suggest event names for partially typed or misspelled text.
 
+        Parameters:
+        - text: What has been typed so far.
+        - limit: Maximum number of suggestions.
 
+        Returns:
+        - A list of event names: prefix matches first, then names within two edits.
+        """
+        if not text.strip():
+            return []
+        with self._lock.read_locked():
+            return self.name_index.suggest(text.strip(), limit)
 
+    def snapshot(self):
+        """Return a consistent, read-only view of the events.
 
+        The tuple is reused until the next change, so repeated listings do not copy.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock.read_locked():
+                snapshot = self._snapshot = tuple(self.events)
+        return snapshot
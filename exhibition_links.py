@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import itertools
+from datetime import datetime, timedelta
+from event import Exhibition, Location
+from artwork import Artwork
+from eras import EraIndex
+from rwlock import RWLock
+
+_EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
+
+
+def _minutes(moment):
+    return (moment - _EPOCH) // _MINUTE
+
+
+class ExhibitionCatalogue:
+    """Many-to-many assignment of artworks to exhibitions, indexed both ways.
+
+    Exhibitions and artworks are tracked by identity, as the registries hold
+    them. Each exhibition's opening period is kept in an interval index (the
+    one used for artwork eras, over minutes instead of years), so what is on
+    display at a moment is found without scanning every exhibition.
+    Attach the catalogue to EventManagement and ArtworkManagement (their
+    catalogue attribute) and it is told when an exhibition or artwork is
+    removed; snapshots then save it with them.
+    """
+    def __init__(self):
+        self._artworks = {}  # id(exhibition) -> {id(artwork): artwork}, in assignment order
+        self._exhibitions = {}  # id(artwork) -> {id(exhibition): exhibition}
+        self._by_key = {}  # index key -> exhibition
+        self._keys = {}  # id(exhibition) -> (index key, indexed period)
+        self._periods = EraIndex()
+        self._sequence = itertools.count()
+        self._lock = RWLock()
+
+    def _period(self, exhibition):
+        start = _minutes(exhibition.start_time)
+        # an exhibition is open up to, not including, its end time
+        return start, max(start, -(-(exhibition.end_time - _EPOCH) // _MINUTE) - 1)
+
+    def assign(self, exhibition, artworks):
+        """Put one artwork, or several, on show in an exhibition. Assigning a pair twice has no effect."""
+        assert isinstance(exhibition, Exhibition), "Invalid exhibition"
+        if isinstance(artworks, Artwork):
+            artworks = [artworks]
+        artworks = list(artworks)
+        assert all(isinstance(artwork, Artwork) for artwork in artworks), "Invalid artwork"
+        with self._lock.write_locked():
+            shown = self._artworks.get(id(exhibition))
+            if shown is None:
+                shown = self._artworks[id(exhibition)] = {}
+                key, period = next(self._sequence), self._period(exhibition)
+                self._keys[id(exhibition)] = key, period
+                self._by_key[key] = exhibition
+                self._periods.add(*period, key)
+            for artwork in artworks:
+                shown[id(artwork)] = artwork
+                self._exhibitions.setdefault(id(artwork), {})[id(exhibition)] = exhibition
+
+    def unassign(self, exhibition, artwork):
+        """Take an artwork out of an exhibition. Returns True if it was assigned, False otherwise."""
+        with self._lock.write_locked():
+            shown = self._artworks.get(id(exhibition), {})
+            if shown.pop(id(artwork), None) is None:
+                return False
+            exhibitions = self._exhibitions[id(artwork)]
+            del exhibitions[id(exhibition)]
+            if not exhibitions:
+                del self._exhibitions[id(artwork)]
+            if not shown:
+                self._drop(exhibition)
+            return True
+
+    def _drop(self, exhibition):
+        del self._artworks[id(exhibition)]
+        key, period = self._keys.pop(id(exhibition))
+        del self._by_key[key]
+        self._periods.remove(*period, key)
+
+    def remove_exhibition(self, exhibition):
+        """Drop every assignment of an exhibition, e.g. when it is removed from EventManagement."""
+        with self._lock.write_locked():
+            shown = self._artworks.get(id(exhibition))
+            if shown is None:
+                return
+            for artwork_id in shown:
+                exhibitions = self._exhibitions[artwork_id]
+                del exhibitions[id(exhibition)]
+                if not exhibitions:
+                    del self._exhibitions[artwork_id]
+            self._drop(exhibition)
+
+    def remove_artwork(self, artwork):
+        """Drop every assignment of an artwork, e.g. when it is removed from ArtworkManagement."""
+        with self._lock.write_locked():
+            for exhibition in self._exhibitions.pop(id(artwork), {}).values():
+                shown = self._artworks[id(exhibition)]
+                del shown[id(artwork)]
+                if not shown:
+                    self._drop(exhibition)
+
+    def pairs(self):
+        """Return every (exhibition, artwork) assignment."""
+        with self._lock.read_locked():
+            return [(self._by_key[self._keys[exhibition_id][0]], artwork)
+                    for exhibition_id, shown in self._artworks.items() for artwork in shown.values()]
+
+    def artworks_in(self, exhibition):
+        """Return the artworks on show in an exhibition, in the order they were assigned."""
+        with self._lock.read_locked():
+            return list(self._artworks.get(id(exhibition), {}).values())
+
+    def exhibitions_showing(self, artwork):
+        """Return the exhibitions an artwork has been assigned to, earliest first."""
+        with self._lock.read_locked():
+            exhibitions = list(self._exhibitions.get(id(artwork), {}).values())
+        return sorted(exhibitions, key=lambda exhibition: exhibition.start_time)
+
+    def exhibitions_open(self, moment, location=None):
+        """Return the exhibitions with assigned artworks that are open at a moment, optionally at one location."""
+        assert isinstance(moment, datetime), "Invalid time"
+        assert location is None or isinstance(location, Location), "Invalid location"
+        minute = _minutes(moment)
+        with self._lock.read_locked():
+            exhibitions = [self._by_key[key] for key in self._periods.overlapping(minute, minute)]
+        exhibitions = [exhibition for exhibition in exhibitions
+                       if exhibition.start_time <= moment < exhibition.end_time and (location is None or exhibition.location is location)]
+        return sorted(exhibitions, key=lambda exhibition: exhibition.start_time)
+
+    def on_display(self, moment, location=None):
+        """Return the artworks on show in any exhibition open at a moment, each once."""
+        artworks = {}
+        for exhibition in self.exhibitions_open(moment, location):
+            with self._lock.read_locked():
+                artworks.update(self._artworks.get(id(exhibition), {}))
+        return list(artworks.values())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+_SUB_BUCKETS = 4  # buckets per power of two, so a percentile is off by at most 19%
+
+
+def _bucket(ns):
+    bits = ns.bit_length()
+    if bits <= 2:
+        return ns
+    return (bits - 2) * _SUB_BUCKETS + ((ns >> (bits - 3)) & (_SUB_BUCKETS - 1))
+
+
+def _bucket_upper(index):
+    # inverse of _bucket: the largest duration that falls in the bucket
+    if index < _SUB_BUCKETS:
+        return index
+    bits = index // _SUB_BUCKETS + 2
+    sub = index % _SUB_BUCKETS
+    return ((_SUB_BUCKETS + sub + 1) << (bits - 3)) - 1
+
+
+class Histogram:
+    """Call count and log-bucketed latency histogram of one instrumented function."""
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._buckets = [0] * _bucket(1 << 64)
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self.count = 0
+            self.total_ns = 0
+            self.max_ns = 0
+            self._buckets = [0] * len(self._buckets)
+
+    def record(self, ns):
+        with self._lock:
+            self.count += 1
+            self.total_ns += ns
+            if ns > self.max_ns:
+                self.max_ns = ns
+            self._buckets[_bucket(ns)] += 1
+
+    def percentile(self, fraction):
+        """Return an upper bound, in nanoseconds, of the given percentile (0 < fraction <= 1)."""
+        with self._lock:
+            rank = fraction * self.count
+            seen = 0
+            for index, count in enumerate(self._buckets):
+                seen += count
+                if count and seen >= rank:
+                    return min(_bucket_upper(index), self.max_ns)
+        return 0
+
+    def summary(self):
+        mean = self.total_ns / self.count if self.count else 0
+        return {"name": self.name, "count": self.count, "total_ms": self.total_ns / 1e6, "mean_us": mean / 1000,
+                "p50_us": self.percentile(0.5) / 1000, "p95_us": self.percentile(0.95) / 1000,
+                "p99_us": self.percentile(0.99) / 1000, "max_us": self.max_ns / 1000}
+
+
+_enabled = False
+_histograms = {}
+_histograms_lock = threading.Lock()
+_targets = []  # (class, method name, original function)
+_core_registered = False
+
+
+def _histogram(name):
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram(name))
+    return histogram
+
+
+def _wrap(function, name):
+    histogram = _histogram(name)
+    clock = time.perf_counter_ns
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        begin = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.record(clock() - begin)
+    wrapper.__instrumented__ = function
+    return wrapper
+
+
+def instrument(cls, *method_names):
+    """Register methods of a class to be timed while instrumentation is enabled.
+
+    The methods are replaced by timing wrappers on enable() and restored on
+    disable(), so they cost nothing extra while instrumentation is off.
+    """
+    for method_name in method_names:
+        function = cls.__dict__[method_name]
+        assert callable(function), f"{cls.__name__}.{method_name} is not a method"
+        function = getattr(function, "__instrumented__", function)
+        _targets.append((cls, method_name, function))
+        if _enabled:
+            setattr(cls, method_name, _wrap(function, f"{cls.__name__}.{method_name}"))
+
+
+def timed(function):
+    """Decorator timing a function under its qualified name while instrumentation is enabled.
+
+    For callbacks such as Tk button commands, which are bound once when the
+    widget is created and so are not reached by instrument(). When
+    instrumentation is off the only cost is one flag check.
+    """
+    histogram = _histogram(function.__qualname__)
+    clock = time.perf_counter_ns
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+        begin = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.record(clock() - begin)
+    return wrapper
+
+
+def enable():
+    """Start timing every registered method."""
+    global _enabled
+    if _enabled:
+        return
+    for cls, method_name, function in _targets:
+        setattr(cls, method_name, _wrap(function, f"{cls.__name__}.{method_name}"))
+    _enabled = True
+
+
+def disable():
+    """Stop timing and put the original methods back."""
+    global _enabled
+    if not _enabled:
+        return
+    for cls, method_name, function in _targets:
+        setattr(cls, method_name, function)
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Clear every count and histogram."""
+    with _histograms_lock:
+        for histogram in _histograms.values():
+            histogram.clear()
+
+
+def stats():
+    """Return a summary dict per timed function that has been called, busiest first."""
+    summaries = [histogram.summary() for histogram in list(_histograms.values()) if histogram.count]
+    return sorted(summaries, key=lambda summary: summary["total_ms"], reverse=True)
+
+
+def report():
+    """Return the stats as a text table."""
+    lines = [f"{'function':<48}{'calls':>9}{'total ms':>11}{'mean us':>10}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'max us':>10}"]
+    for summary in stats():
+        lines.append(f"{summary['name']:<48}{summary['count']:>9}{summary['total_ms']:>11.1f}{summary['mean_us']:>10.1f}"
+                     f"{summary['p50_us']:>10.1f}{summary['p95_us']:>10.1f}{summary['p99_us']:>10.1f}{summary['max_us']:>10.1f}")
+    return "\n".join(lines)
+
+
+def instrument_core():
+    """Register the management-class methods on the purchase path and the domain constructors."""
+    from event import Event, EventManagement
+    from artwork import Artwork, ArtworkManagement
+    from visitor import Visitor
+    from ticket import Ticket, VisitorInfoManagement
+    global _core_registered
+    if _core_registered:
+        return
+    _core_registered = True
+    instrument(Visitor, "__init__")
+    instrument(Event, "__init__")
+    instrument(Artwork, "__init__")
+    instrument(Ticket, "__init__", "calculate_ticket_price", "display", "display_receipt")
+    instrument(EventManagement, "add_event", "remove_event", "get_event_by_name", "next_events", "suggest_event_names", "snapshot")
+    instrument(ArtworkManagement, "add_artwork", "remove_artwork", "search", "snapshot")
+    instrument(VisitorInfoManagement, "add_visitor", "remove_visitor", "get_visitor_by_email", "snapshot", "purchase_ticket",
+               "purchase_group_tickets", "issue_group_tickets", "refund_ticket", "_reserve_places", "_record_sale")
+
+
+class ProfileCapture:
+    """On-demand profile of a time window.
+
+    mode "cprofile" traces every call made by the thread that calls start();
+    mode "sampling" looks at the stack of that thread every interval seconds
+    from a background thread, which costs far less and needs no cooperation
+    from the profiled code.
+    """
+    def __init__(self, mode="cprofile", interval=0.005):
+        assert mode in ("cprofile", "sampling"), "Mode must be 'cprofile' or 'sampling'"
+        self.mode = mode
+        self.interval = interval
+        self._profile = None
+        self._sampler = None
+        self._stop = threading.Event()
+        self._samples = Counter()  # (file, first line, function) -> samples with it on top of the stack
+        self._inclusive = Counter()  # same key -> samples with it anywhere on the stack
+        self._sample_count = 0
+
+    def start(self, thread_id=None):
+        """Start profiling the calling thread, or in sampling mode the thread with the given id."""
+        if self.mode == "cprofile":
+            assert thread_id is None, "cProfile can only profile the calling thread"
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._stop.clear()
+            if thread_id is None:
+                thread_id = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, args=(thread_id,), daemon=True)
+            self._sampler.start()
+
+    def _sample(self, thread_id):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            self._sample_count += 1
+            code = frame.f_code
+            self._samples[(code.co_filename, code.co_firstlineno, code.co_name)] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                if key not in seen:
+                    seen.add(key)
+                    self._inclusive[key] += 1
+                frame = frame.f_back
+
+    def stop(self, path=None, limit=30):
+        """Stop profiling and return the text report, also writing it to path when given.
+
+        In cprofile mode the raw stats are written to path + ".prof" as well,
+        for tools such as snakeviz.
+        """
+        if self.mode == "cprofile":
+            self._profile.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(limit)
+            text = stream.getvalue()
+            if path is not None:
+                stats.dump_stats(path + ".prof")
+        else:
+            self._stop.set()
+            self._sampler.join()
+            total = max(self._sample_count, 1)
+            lines = [f"{self._sample_count} samples every {self.interval * 1000:.1f} ms", "", "on stack    top  function"]
+            for key, count in self._inclusive.most_common(limit):
+                lines.append(f"{count / total:>8.1%} {self._samples[key] / total:>6.1%}  {key[2]} ({key[0]}:{key[1]})")
+            text = "\n".join(lines)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+
+def profile_for(seconds, function, mode="cprofile", path=None):
+    """Call function repeatedly for a window of seconds under the profiler and return the report."""
+    capture = ProfileCapture(mode)
+    capture.start()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        function()
+    return capture.stop(path)
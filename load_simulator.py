@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Opening-day load simulator.
+
+Synthesizes a visitor population, spreads its arrivals over the day along
+an arrival curve and replays them against VisitorInfoManagement's
+purchase_ticket and purchase_group_tickets, then reports throughput, tail
+latency and when each event sold out. The same seed gives the same
+population and arrival times. Run from the repository root:
+
+    python load_simulator.py --parties 20000 --capacity 5000 --curve opening_rush --seed 7
+"""
+
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from event import Event, SpecialEvent, Location
+from visitor import Visitor, GroupVisitor
+from ticket import VisitorInfoManagement
+from capacity import SharedCapacityCounters, UNLIMITED
+
+SOLD_OUT = "Event is sold out"
+
+# Relative arrival rate over the opening hours, as a function of the fraction of the day gone
+ARRIVAL_CURVES = {
+    "flat": lambda fraction: 1.0,
+    # queue at the doors that drains over the first hour, then steady walk-ins
+    "opening_rush": lambda fraction: 1.0 + 12.0 * math.exp(-fraction * 16),
+    # builds to a peak around lunchtime
+    "midday_peak": lambda fraction: 0.2 + math.exp(-((fraction - 0.45) / 0.18) ** 2),
+    # on-sale moment: nearly everyone arrives in the first minutes
+    "flash_sale": lambda fraction: 0.05 + 50.0 * math.exp(-fraction * 60),
+}
+
+
+class VisitorPopulation:
+    """Seedable generator of arriving parties: single visitors and visiting groups."""
+    def __init__(self, seed=None, student_share=0.08, teacher_share=0.02, child_share=0.12, senior_share=0.12,
+                 group_share=0.15, group_sizes=(5, 30), school_group_share=0.5):
+        """Initialize the population mix.
+
+        Parameters:
+        - seed: Seed of the population's random generator.
+        - student_share, teacher_share, child_share, senior_share: Shares of single visitors in
+          each category; the rest are full-price adults.
+        - group_share: Share of parties that are groups.
+        - group_sizes: Smallest and largest group size.
+        - school_group_share: Share of groups that are school trips (children with teachers).
+        """
+        singles = student_share + teacher_share + child_share + senior_share
+        assert 0 <= singles <= 1, "Visitor category shares must add up to at most 1"
+        assert 0 <= group_share <= 1, "Group share must be between 0 and 1"
+        assert 0 < group_sizes[0] <= group_sizes[1], "Invalid group sizes"
+        self.rng = random.Random(seed)
+        self.shares = (student_share, teacher_share, child_share, senior_share)
+        self.group_share = group_share
+        self.group_sizes = group_sizes
+        self.school_group_share = school_group_share
+        self._visitor_ids = itertools.count()
+        self._group_ids = itertools.count()
+
+    def _visitor(self, age, group_id=None, is_student=False, is_teacher=False):
+        number = next(self._visitor_ids)
+        if group_id is None:
+            return Visitor(f"Visitor {number}", age, f"visitor{number}@loadsim.example", is_student, is_teacher)
+        return GroupVisitor(f"Visitor {number}", age, f"visitor{number}@loadsim.example", group_id, is_student, is_teacher)
+
+    def single(self):
+        rng = self.rng
+        draw = rng.random()
+        student, teacher, child, senior = self.shares
+        if draw < student:
+            return self._visitor(rng.randint(18, 26), is_student=True)
+        draw -= student
+        if draw < teacher:
+            return self._visitor(rng.randint(24, 64), is_teacher=True)
+        draw -= teacher
+        if draw < child:
+            return self._visitor(rng.randint(4, 17))
+        draw -= child
+        if draw < senior:
+            return self._visitor(rng.randint(60, 88))
+        return self._visitor(rng.randint(18, 59))
+
+    def group(self):
+        rng = self.rng
+        size = rng.randint(*self.group_sizes)
+        group_id = f"LG{next(self._group_ids)}"
+        if rng.random() < self.school_group_share:
+            teachers = max(1, size // 10)
+            return ([self._visitor(rng.randint(25, 60), group_id, is_teacher=True) for _ in range(teachers)]
+                    + [self._visitor(rng.randint(8, 16), group_id) for _ in range(size - teachers)])
+        return [self._visitor(rng.randint(18, 80), group_id) for _ in range(size)]
+
+    def party(self):
+        """Return the next arriving party as a list of visitors; more than one visitor means a group purchase."""
+        if self.rng.random() < self.group_share:
+            return self.group()
+        return [self.single()]
+
+
+def arrival_minutes(count, duration_minutes, curve, rng):
+    """Return count arrival times, in minutes after opening, distributed along the curve and sorted."""
+    assert curve in ARRIVAL_CURVES, f"Unknown arrival curve {curve}"
+    rate = ARRIVAL_CURVES[curve]
+    weights = [rate((minute + 0.5) / duration_minutes) for minute in range(duration_minutes)]
+    minutes = rng.choices(range(duration_minutes), weights, k=count)
+    return sorted(minute + rng.random() for minute in minutes)
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoadSimulator:
+    """Replays synthetic demand against the purchase API of one VisitorInfoManagement.
+
+    Capacity is enforced through SharedCapacityCounters, so sell-outs behave
+    as they would at the ticket desks. Arrivals are replayed either as fast as
+    possible or paced against the wall clock, by one or several worker threads;
+    with one worker the whole run is repeatable for a given seed.
+    """
+    def __init__(self, events, capacity, seed=None, population=None, management=None):
+        """Initialize the simulator.
+
+        Parameters:
+        - events: Events the parties buy tickets for, each party picking one at random.
+        - capacity: Places per event, or a dict from event to places; None leaves Tour capacities as they are.
+        - seed: Seed for the arrival times and the event choice, and for the population if none is given.
+        - population: Optional VisitorPopulation.
+        - management: Optional VisitorInfoManagement to drive, e.g. one with metrics attached. It is given
+          its own capacity counters if it has none.
+        """
+        assert events and all(isinstance(event, Event) for event in events), "Invalid event"
+        self.events = list(events)
+        self.rng = random.Random(seed)
+        self.population = population if population is not None else VisitorPopulation(seed)
+        self.management = management if management is not None else VisitorInfoManagement()
+        self._counters = None
+        if self.management.capacity_counters is None:
+            self._counters = SharedCapacityCounters(name=f"museum_loadsim_{os.getpid()}_{id(self)}", create=True)
+            self.management.capacity_counters = self._counters
+        for event in self.events:
+            places = capacity.get(event) if isinstance(capacity, dict) else capacity
+            self.management.capacity_counters.register(event, places)
+
+    def close(self):
+        """Release the capacity counters created by the simulator."""
+        if self._counters is not None:
+            self.management.capacity_counters = None
+            self._counters.close()
+            self._counters.unlink()
+            self._counters = None
+
+    def run(self, parties, duration_minutes=480, curve="opening_rush", workers=1, speed=0.0):
+        """Replay a day of arrivals and return the report as a dict.
+
+        Parameters:
+        - parties: Number of arriving parties.
+        - duration_minutes: Length of the simulated opening hours.
+        - curve: Name of an arrival curve in ARRIVAL_CURVES.
+        - workers: Number of threads making purchases concurrently.
+        - speed: Simulated minutes per wall-clock second; 0 replays as fast as possible.
+        """
+        assert isinstance(workers, int) and workers > 0, "Workers must be a positive integer"
+        schedule = [(minute, self.rng.choice(self.events), self.population.party())
+                    for minute in arrival_minutes(parties, duration_minutes, curve, self.rng)]
+        counters = self.management.capacity_counters
+        sold_out = {}  # event -> (simulated minute, wall seconds) of the sale that took the last place
+        turned_away = {}  # event -> simulated minute of the first party refused
+        state_lock = threading.Lock()
+        results = []
+        next_index = itertools.count()
+        begin = time.perf_counter()
+
+        def worker():
+            single_latencies, group_latencies = [], []
+            tickets = rejected_parties = rejected_visitors = 0
+            clock = time.perf_counter
+            purchase_ticket, purchase_group_tickets = self.management.purchase_ticket, self.management.purchase_group_tickets
+            for index in next_index:
+                if index >= len(schedule):
+                    break
+                minute, event, party = schedule[index]
+                if speed:
+                    delay = begin + minute * 60 / speed - clock()
+                    if delay > 0:
+                        time.sleep(delay)
+                start = clock()
+                try:
+                    if len(party) == 1:
+                        purchase_ticket(party[0], event)
+                    else:
+                        purchase_group_tickets(party, event)
+                except AssertionError as error:
+                    if str(error) != SOLD_OUT:
+                        raise
+                    rejected_parties += 1
+                    rejected_visitors += len(party)
+                    with state_lock:
+                        turned_away.setdefault(event, minute)
+                    continue
+                end = clock()
+                (single_latencies if len(party) == 1 else group_latencies).append(end - start)
+                tickets += len(party)
+                if counters.remaining(event) == 0:
+                    with state_lock:
+                        sold_out.setdefault(event, (minute, end - begin))
+            with state_lock:
+                results.append((single_latencies, group_latencies, tickets, rejected_parties, rejected_visitors))
+
+        threads = [threading.Thread(target=worker, name=f"loadsim-{i}") for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - begin
+
+        single = sorted(latency for result in results for latency in result[0])
+        group = sorted(latency for result in results for latency in result[1])
+        tickets = sum(result[2] for result in results)
+        report = {
+            "parties": parties,
+            "curve": curve,
+            "workers": workers,
+            "elapsed_s": elapsed,
+            "tickets_sold": tickets,
+            "parties_turned_away": sum(result[3] for result in results),
+            "visitors_turned_away": sum(result[4] for result in results),
+            "tickets_per_s": tickets / elapsed if elapsed else 0.0,
+            "purchases_per_s": (len(single) + len(group)) / elapsed if elapsed else 0.0,
+            "latency_us": {},
+            "events": [],
+        }
+        for name, latencies in (("purchase_ticket", single), ("purchase_group_tickets", group)):
+            report["latency_us"][name] = {"calls": len(latencies), "p50": _percentile(latencies, 0.5) * 1e6,
+                                          "p95": _percentile(latencies, 0.95) * 1e6, "p99": _percentile(latencies, 0.99) * 1e6,
+                                          "max": (latencies[-1] if latencies else 0.0) * 1e6}
+        for event in self.events:
+            capacity = counters.capacity(event)
+            minute, wall = sold_out.get(event, (None, None))
+            report["events"].append({"event": event.event_id, "capacity": None if capacity == UNLIMITED else capacity,
+                                     "sold": counters.sold(event), "sold_out_minute": minute, "sold_out_wall_s": wall,
+                                     "first_turned_away_minute": turned_away.get(event)})
+        return report
+
+
+def format_report(report):
+    """Return the report as text."""
+    lines = [f"{report['parties']} parties on the {report['curve']} curve, {report['workers']} worker(s), {report['elapsed_s']:.2f} s",
+             f"{report['tickets_sold']} tickets sold, {report['tickets_per_s']:,.0f} tickets/s, {report['purchases_per_s']:,.0f} purchases/s",
+             f"{report['parties_turned_away']} parties ({report['visitors_turned_away']} visitors) turned away",
+             "",
+             f"{'operation':<24}{'calls':>8}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'max us':>10}"]
+    for name, latency in report["latency_us"].items():
+        lines.append(f"{name:<24}{latency['calls']:>8}{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}{latency['max']:>10.1f}")
+    lines.append("")
+    for event in report["events"]:
+        if event["sold_out_minute"] is not None:
+            minute = event["sold_out_minute"]
+            status = f"sold out {int(minute) // 60:02d}:{int(minute) % 60:02d} after opening ({event['sold_out_wall_s']:.2f} s into the run)"
+        elif event["first_turned_away_minute"] is not None:
+            minute = event["first_turned_away_minute"]
+            status = f"first group turned away {int(minute) // 60:02d}:{int(minute) % 60:02d} after opening"
+        else:
+            status = "did not sell out"
+        capacity = "unlimited" if event["capacity"] is None else event["capacity"]
+        lines.append(f"{event['event']}: {event['sold']}/{capacity} sold, {status}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rehearse opening-day demand against the ticket purchase API.")
+    parser.add_argument("--parties", type=int, default=20000, help="arriving parties (single visitors or groups)")
+    parser.add_argument("--events", type=int, default=1, help="number of special events on sale")
+    parser.add_argument("--capacity", type=int, default=5000, help="places per event")
+    parser.add_argument("--price", type=float, default=150.0, help="special event ticket price in AED")
+    parser.add_argument("--curve", choices=sorted(ARRIVAL_CURVES), default="opening_rush")
+    parser.add_argument("--minutes", type=int, default=480, help="simulated opening hours, in minutes")
+    parser.add_argument("--group-share", type=float, default=0.15)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=0.0, help="simulated minutes per second; 0 runs as fast as possible")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--metrics-port", type=int, help="also export live metrics on this local port during the run")
+    args = parser.parse_args()
+
+    opening = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    events = [SpecialEvent(f"Opening Day {i + 1}" if args.events > 1 else "Opening Day", Location.EXHIBITION_HALLS,
+                           opening, opening + timedelta(minutes=args.minutes), args.price) for i in range(args.events)]
+    management = None
+    if args.metrics_port is not None:
+        from metrics import MuseumMetrics, start_http_server
+        metrics = MuseumMetrics()
+        management = VisitorInfoManagement(metrics=metrics)
+        server = start_http_server(metrics.registry, args.metrics_port)
+        print(f"metrics at http://127.0.0.1:{server.server_address[1]}/metrics")
+    simulator = LoadSimulator(events, args.capacity, args.seed, VisitorPopulation(args.seed, group_share=args.group_share), management)
+    try:
+        print(format_report(simulator.run(args.parties, args.minutes, args.curve, args.workers, args.speed)))
+    finally:
+        simulator.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
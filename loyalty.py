@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import json
+import os
+import threading
+from datetime import datetime
+from visitor import normalize_email
+
+# (visits already made in the year, discount on paid tickets), highest tier first
+LOYALTY_TIERS = ((10, 0.15), (5, 0.10), (3, 0.05))
+
+
+class PurchaseHistory:
+    """Append-only record of every ticket sold and refunded, per visitor.
+
+    Visitors are identified by normalized email, so a returning visitor
+    entered again as a new Visitor object still has one history. Running
+    visit counts and spend are kept per email and year (of the event), so
+    they and the loyalty discount are O(1) to read at checkout. A visit is
+    an event the email holds at least one paid ticket for: free tickets and
+    the other tickets of a group bought on one email do not add visits, and
+    refunding the last paid ticket for an event takes its visit back.
+
+    With a journal path, every entry is also appended to that file and
+    flushed, and the file is replayed when the history is created, so it
+    survives restarts.
+    """
+    def __init__(self, journal_path=None, tiers=LOYALTY_TIERS):
+        """Initialize the history.
+
+        Parameters:
+        - journal_path: Optional file the entries are appended to and replayed from.
+        - tiers: (visits already made in the year, discount) pairs, highest tier first.
+        """
+        assert all(visits > 0 and 0 <= discount < 1 for visits, discount in tiers), "Invalid loyalty tiers"
+        self.tiers = tuple(tiers)
+        self._entries = {}  # email -> list of (event start, event name, price, +1 sale or -1 refund)
+        self._totals = {}  # (email, year) -> [visits, spend]
+        self._paid = {}  # (email, event start, event name) -> paid tickets held for the event
+        self._lock = threading.Lock()
+        self._journal = None
+        if journal_path is not None:
+            if os.path.exists(journal_path):
+                with open(journal_path, encoding="utf-8") as file:
+                    for line in file:
+                        if line.strip():
+                            email, start, name, price, sign = json.loads(line)
+                            self._append(email, datetime.fromisoformat(start), name, price, sign)
+            self._journal = open(journal_path, "a", encoding="utf-8")
+
+    def _append(self, email, start, name, price, sign):
+        key = (email, start, name)
+        if sign < 0 and price > 0 and key not in self._paid:
+            return False  # a refund of a sale that was never recorded, e.g. from before the history was attached
+        entries = self._entries.get(email)
+        if entries is None:
+            entries = self._entries[email] = []
+        entries.append((start, name, price, sign))
+        if price <= 0:
+            return True
+        held = self._paid.get(key, 0) + sign
+        if held:
+            self._paid[key] = held
+        else:
+            del self._paid[key]
+        totals = self._totals.get((email, start.year))
+        if totals is None:
+            totals = self._totals[(email, start.year)] = [0, 0.0]
+        # the first paid ticket for an event is a visit, and refunding the last one takes it back
+        if held == 1 and sign > 0:
+            totals[0] += 1
+        elif held == 0:
+            totals[0] -= 1
+        totals[1] += sign * price
+        return True
+
+    def _record(self, ticket, sign):
+        email = normalize_email(ticket.visitor.email)
+        event = ticket.event
+        with self._lock:
+            if self._append(email, event.start_time, event.name, ticket.price, sign) and self._journal is not None:
+                self._journal.write(json.dumps([email, event.start_time.isoformat(), event.name, ticket.price, sign]) + "\n")
+                self._journal.flush()
+
+    def record_sale(self, ticket):
+        self._record(ticket, 1)
+
+    def record_refund(self, ticket):
+        self._record(ticket, -1)
+
+    def close(self):
+        if self._journal is not None:
+            with self._lock:
+                self._journal.close()
+                self._journal = None
+
+    def visits(self, email, year):
+        """Return the number of events in a year an email holds paid tickets for."""
+        totals = self._totals.get((normalize_email(email), year))
+        return 0 if totals is None else totals[0]
+
+    def spend(self, email, year):
+        """Return what an email has spent, net of refunds, on events in a year."""
+        totals = self._totals.get((normalize_email(email), year))
+        return 0.0 if totals is None else totals[1]
+
+    def entries(self, email):
+        """Return the history of an email as (event start, event name, price, +1 sale or -1 refund) tuples, in recording order."""
+        with self._lock:
+            return list(self._entries.get(normalize_email(email), ()))
+
+    def discount(self, email, year, event=None):
+        """Return the loyalty discount, as a fraction, earned by the visits an email already has in a year.
+
+        Parameters:
+        - email: The visitor's email address.
+        - year: The year of the event being bought for.
+        - event: Optional Event being bought for; a visit to it does not count towards its own discount.
+        """
+        email = normalize_email(email)
+        totals = self._totals.get((email, year))
+        if totals is None:
+            return 0.0
+        made = totals[0]
+        if event is not None and (email, event.start_time, event.name) in self._paid:
+            made -= 1
+        for visits, discount in self.tiers:
+            if made >= visits:
+                return discount
+        return 0.0
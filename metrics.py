@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds; purchases normally take tens of microseconds, a sold-out rush can take milliseconds
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _ThreadCells:
+    """One list of numbers per thread, summed on read.
+
+    A thread only ever writes its own cell, so recording needs no lock; the
+    lock is only taken when a thread records for the first time and when
+    the cells are read.
+    """
+    def __init__(self, width):
+        self.width = width
+        self._local = threading.local()
+        self._cells = []
+        self._lock = threading.Lock()
+
+    def cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0] * self.width
+            with self._lock:
+                self._cells.append(cell)
+            return cell
+
+    def totals(self):
+        with self._lock:
+            cells = list(self._cells)
+        return [sum(cell[i] for cell in cells) for i in range(self.width)]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name, labels, value):
+    if labels:
+        name += "{" + ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items()) + "}"
+    if isinstance(value, float):
+        if math.isinf(value):
+            value = "+Inf" if value > 0 else "-Inf"
+        elif math.isnan(value):
+            value = "NaN"
+        else:
+            value = repr(value)
+    return f"{name} {value}"
+
+
+class Counter:
+    """Monotonic total, such as tickets sold; rates are taken by the monitoring system."""
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        assert isinstance(name, str) and name.endswith("_total"), "Counter names must end in _total"
+        self.name = name
+        self.help = help_text
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount=1):
+        assert amount >= 0, "Counters can only go up"
+        self._cells.cell()[0] += amount
+
+    def value(self):
+        return self._cells.totals()[0]
+
+    def samples(self):
+        return [(self.name, None, self.value())]
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        assert list(buckets) == sorted(buckets) and len(set(buckets)) == len(buckets), "Buckets must be increasing"
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # per thread: a count per bucket, one for values above the last bucket, then the sum
+        self._cells = _ThreadCells(len(self.buckets) + 2)
+
+    def observe(self, value):
+        cell = self._cells.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self):
+        totals = self._cells.totals()
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), totals):
+            cumulative += count
+            samples.append((self.name + "_bucket", {"le": "+Inf" if bound == math.inf else repr(bound)}, cumulative))
+        samples.append((self.name + "_sum", None, float(totals[-1])))
+        samples.append((self.name + "_count", None, cumulative))
+        return samples
+
+
+class Gauge:
+    """Value read when metrics are collected, so keeping it current costs nothing.
+
+    function returns either a number or an iterable of (labels dict, number) pairs.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, help_text, function):
+        self.name = name
+        self.help = help_text
+        self.function = function
+
+    def samples(self):
+        value = self.function()
+        if isinstance(value, (int, float)):
+            return [(self.name, None, value)]
+        return [(self.name, labels, number) for labels, number in value]
+
+
+class MetricsRegistry:
+    """Set of metrics exported together."""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric and return it."""
+        with self._lock:
+            assert metric.name not in self._metrics, f"Metric {metric.name} is already registered"
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def expose(self):
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(_format_sample(name, labels, value) for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def start_http_server(registry, port=9464, address="127.0.0.1"):
+    """Serve registry.expose() at /metrics from a background thread.
+
+    Returns:
+    - The server; call shutdown() on it to stop serving.
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.expose().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would flood the console
+
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class MuseumMetrics:
+    """The museum's standard metrics, on their own registry or a shared one."""
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        register = self.registry.register
+        self.tickets_sold = register(Counter("museum_tickets_sold_total", "Tickets sold."))
+        self.tickets_refunded = register(Counter("museum_tickets_refunded_total", "Tickets refunded."))
+        self.revenue = register(Counter("museum_ticket_revenue_aed_total", "Ticket revenue in AED, before refunds."))
+        self.purchase_latency = register(Histogram("museum_purchase_latency_seconds", "Time to complete a ticket or group purchase."))
+
+    def record_sale(self, ticket):
+        self.tickets_sold.inc()
+        self.revenue.inc(ticket.price)
+
+    def record_refund(self, ticket):
+        self.tickets_refunded.inc()
+
+    def watch(self, event_management=None, artwork_management=None, visitor_management=None):
+        """Export registry sizes and, with the event registry, capacity utilisation per event."""
+        register = self.registry.register
+        if visitor_management is not None:
+            register(Gauge("museum_visitors", "Visitors in the registry.", lambda: len(visitor_management.snapshot())))
+        if artwork_management is not None:
+            register(Gauge("museum_artworks", "Artworks in the registry.", lambda: len(artwork_management.snapshot())))
+        if event_management is not None:
+            register(Gauge("museum_events", "Events in the registry.", lambda: len(event_management.snapshot())))
+            register(Gauge("museum_event_capacity_utilisation", "Share of an event's places that are sold, for events with a capacity.",
+                           lambda: _capacity_utilisation(event_management, visitor_management)))
+
+
+def _capacity_utilisation(event_management, visitor_management):
+    counters = visitor_management.capacity_counters if visitor_management is not None else None
+    sold_by_event = visitor_management.sales.by_event() if visitor_management is not None else {}
+    for event in event_management.snapshot():
+        if counters is not None and counters.is_registered(event):
+            capacity, sold = counters.capacity(event), counters.sold(event)
+        else:
+            sold = sold_by_event.get(event.event_id, (0.0, 0))[1]
+            if getattr(event, "timed_entry", None) is not None:
+                capacity = len(event.timed_entry.slots) * event.timed_entry.slot_capacity
+            else:
+                capacity = getattr(event, "max_capacity", None)
+        if capacity is not None and capacity > 0:
+            yield {"event": event.event_id}, sold / capacity
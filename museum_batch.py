@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+"""Headless batch runner for the museum registries.
+
+Reads operations from JSON Lines batch files, one object per line with an
+"op" field, and applies them to the registries saved in a snapshot file (the
+same file the GUI loads on startup). Runs of consecutive operations of the
+same kind are applied as one transaction: every record is checked before
+anything changes, and a transaction that fails leaves the registries as they
+were. Progress is streamed to stderr. Never imports tkinter.
+
+Ticket sales are recorded in the purchase-history journal the GUI keeps for
+loyalty discounts, and earlier sales there earn those discounts here too;
+tour places are taken from the capacity table the GUI sells from. The
+snapshot is saved after the last batch even when a transaction was rejected,
+keeping everything applied before it, as those sales are already in the
+journal. With --dry-run nothing is saved or journaled, e.g. to try out a
+sales plan and export its reports. Example:
+
+    {"op": "add_event", "type": "tour", "name": "Gallery Tour", "location": "EXHIBITION_HALLS",
+     "start": "2026-05-01 10:00", "end": "2026-05-01 11:00", "max_capacity": 25}
+    {"op": "add_visitor", "name": "Sara", "age": 34, "email": "sara@example.com"}
+    {"op": "purchase_ticket", "email": "sara@example.com", "event": "Gallery Tour"}
+    {"op": "export_report", "report": "revenue", "path": "revenue.txt"}
+
+Run from the repository root:
+
+    python museum_batch.py season.jsonl members.jsonl --state museum.snapshot --history museum.history
+    python museum_batch.py sales_plan.jsonl --dry-run
+    generate_ops | python museum_batch.py - --dry-run
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from event import Event, Exhibition, Tour, SpecialEvent, Location, EventManagement
+from artwork import Artwork, ArtworkManagement
+from visitor import Visitor, GroupVisitor
+from ticket import VisitorInfoManagement
+from snapshot import save_snapshot, load_snapshot
+from capacity import SharedCapacityCounters
+from loyalty import PurchaseHistory
+
+DEFAULT_STATE = "museum.snapshot"
+DEFAULT_HISTORY = "museum.history"  # the GUI's purchase-history journal
+TIME_FORMAT = "%Y-%m-%d %H:%M"  # as typed into the GUI
+EVENT_TYPES = {"event": Event, "exhibition": Exhibition, "tour": Tour, "special": SpecialEvent}
+REPORTS = ("revenue", "events", "artworks", "visitors", "tickets")
+OPERATIONS = ("add_artwork", "remove_artwork", "add_event", "remove_event", "add_visitor", "remove_visitor",
+              "purchase_ticket", "purchase_group_tickets", "export_report")
+
+
+def read_operations(lines):
+    """Yield (line number, operation dict) from JSON Lines, skipping blank lines and # comments."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            operation = json.loads(line)
+        except ValueError as error:
+            raise AssertionError(f"line {number}: invalid JSON ({error})")
+        assert isinstance(operation, dict) and operation.get("op") in OPERATIONS, f"line {number}: unknown operation"
+        yield number, operation
+
+
+def _time(value):
+    return datetime.strptime(value, TIME_FORMAT)
+
+
+def make_artwork(operation):
+    return Artwork(operation["title"], operation["artist"], operation["date_of_creation"],
+                   operation["historical_significance"], Location[operation["location"]])
+
+
+def make_event(operation):
+    event_class = EVENT_TYPES[operation.get("type", "event")]
+    args = (operation["name"], Location[operation["location"]], _time(operation["start"]), _time(operation["end"]))
+    if event_class is Tour:
+        event = Tour(*args, operation["max_capacity"])
+    elif event_class is SpecialEvent:
+        event = SpecialEvent(*args, operation["ticket_price"])
+    else:
+        event = event_class(*args)
+    if "slot_minutes" in operation:
+        assert event_class is Exhibition, "Only exhibitions have timed entry"
+        event.enable_timed_entry(operation["slot_minutes"], operation["slot_capacity"])
+    return event
+
+
+def make_visitor(operation):
+    args = (operation["name"], operation["age"], operation["email"])
+    flags = (operation.get("is_student", False), operation.get("is_teacher", False))
+    if operation.get("group_id") is not None:
+        return GroupVisitor(*args, operation["group_id"], *flags)
+    return Visitor(*args, *flags)
+
+
+class BatchRunner:
+    """Applies operations to a set of registries in transactions."""
+    def __init__(self, event_management, artwork_management, visitor_management, batch_size=1000, progress=None):
+        """Initialize the runner.
+
+        Parameters:
+        - event_management, artwork_management, visitor_management: Registries to change. Attach
+          capacity counters to visitor_management for tour capacities to be shared with other
+          processes, and a purchase history for sales to be recorded.
+        - batch_size: Largest number of operations in one transaction.
+        - progress: Optional text stream that receives a line per transaction.
+        """
+        assert isinstance(batch_size, int) and batch_size > 0, "Batch size must be a positive integer"
+        self.event_management = event_management
+        self.artwork_management = artwork_management
+        self.visitor_management = visitor_management
+        self.batch_size = batch_size
+        self.progress = progress
+        self.tickets = []  # sold during this run, for the tickets report
+        self.applied = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, operations, keep_going=False):
+        """Apply (line number, operation) pairs, grouping consecutive operations of one kind.
+
+        Returns:
+        - True if every transaction was applied.
+        """
+        begin = time.perf_counter()
+        pending = []
+        try:
+            for number, operation in operations:
+                if pending and (operation["op"] != pending[0][1]["op"] or len(pending) >= self.batch_size):
+                    if not self._commit(pending, begin) and not keep_going:
+                        return False
+                    pending = []
+                pending.append((number, operation))
+        except AssertionError:
+            # an unreadable line ends the batch; what was read before it still applies
+            if pending:
+                self._commit(pending, begin)
+            raise
+        if pending:
+            return self._commit(pending, begin) and not self.errors
+        return not self.errors
+
+    def _commit(self, transaction, begin):
+        kind = transaction[0][1]["op"]
+        first, last = transaction[0][0], transaction[-1][0]
+        try:
+            detail = getattr(self, "_" + kind)(transaction)
+        except AssertionError as error:
+            self.failed += len(transaction)
+            self.errors.append(str(error))
+            self._report(f"lines {first}-{last} {kind} x{len(transaction)}: REJECTED, {error}", begin)
+            return False
+        self.applied += len(transaction)
+        self._report(f"lines {first}-{last} {kind} x{len(transaction)}: {detail}", begin)
+        return True
+
+    def _report(self, text, begin):
+        if self.progress is not None:
+            self.progress.write(f"[{time.perf_counter() - begin:7.2f} s, {self.applied} applied] {text}\n")
+            self.progress.flush()
+
+    @staticmethod
+    def _build(transaction, factory):
+        records = []
+        for number, operation in transaction:
+            try:
+                records.append(factory(operation))
+            except (AssertionError, KeyError, TypeError, ValueError) as error:
+                raise AssertionError(f"line {number}: {type(error).__name__} {error}")
+        return records
+
+    def _add_artwork(self, transaction):
+        self.artwork_management.add_artworks(self._build(transaction, make_artwork))
+        return "added"
+
+    def _add_event(self, transaction):
+        self.event_management.add_events(self._build(transaction, make_event))
+        return "added"
+
+    def _add_visitor(self, transaction):
+        self.visitor_management.add_visitors(self._build(transaction, make_visitor))
+        return "added"
+
+    @staticmethod
+    def _keys(transaction, field):
+        return BatchRunner._build(transaction, lambda operation: operation[field])
+
+    def _remove_artwork(self, transaction):
+        titles = self._keys(transaction, "title")
+        removed = self.artwork_management.pop_artworks(titles)
+        return f"{len(removed)} removed, {len(set(titles) - {artwork.title for artwork in removed})} not found"
+
+    def _remove_event(self, transaction):
+        names = self._keys(transaction, "name")
+        removed = self.event_management.pop_events(names)
+        return f"{len(removed)} removed, {len(set(names) - {event.name for event in removed})} not found"
+
+    def _remove_visitor(self, transaction):
+        emails = self._keys(transaction, "email")
+        removed = self.visitor_management.pop_visitors(emails)
+        return f"{len(removed)} removed, {len(set(emails) - {visitor.email for visitor in removed})} not found"
+
+    def _purchases(self, transaction, group):
+        # Resolve every party and event first, then sell; a sell-out midway refunds what the transaction sold
+        visitors_by_email = {visitor.email: visitor for visitor in self.visitor_management.snapshot()}
+        events_by_name, events_by_id = {}, {}
+        for event in self.event_management.snapshot():
+            events_by_name.setdefault(event.name, event)
+            events_by_id[event.event_id] = event
+        new_visitors = []
+
+        def resolve(operation):
+            if "start" in operation:
+                event = events_by_id.get(f"{operation['event']}@{_time(operation['start']).strftime(TIME_FORMAT)}")
+            else:
+                event = events_by_name.get(operation["event"])
+            assert event is not None, f"Unknown event {operation['event']}"
+            party = []
+            for email in (operation.get("emails", []) if group else [operation["email"]] if "email" in operation else []):
+                assert email in visitors_by_email, f"Unknown visitor {email}"
+                party.append(visitors_by_email[email])
+            for record in (operation.get("visitors", []) if group else [operation["visitor"]] if "visitor" in operation else []):
+                visitor = make_visitor(record)
+                new_visitors.append(visitor)
+                party.append(visitor)
+            assert party, "No visitors to buy for"
+            return party, event
+
+        purchases = self._build(transaction, resolve)
+        sold = []
+        try:
+            for (number, _), (party, event) in zip(transaction, purchases):
+                try:
+                    if group:
+                        sold.extend(self.visitor_management.issue_group_tickets(party, event))
+                    else:
+                        sold.append(self.visitor_management.purchase_ticket(party[0], event))
+                except AssertionError as error:
+                    raise AssertionError(f"line {number}: {error}")
+        except AssertionError:
+            for ticket in sold:
+                self.visitor_management.refund_ticket(ticket)
+            raise
+        # visitors given inline are recorded, as the GUI records every buyer
+        if new_visitors:
+            self.visitor_management.add_visitors(new_visitors)
+        self.tickets.extend(sold)
+        return f"{len(sold)} tickets, {sum(ticket.price for ticket in sold):.2f} AED"
+
+    def _purchase_ticket(self, transaction):
+        return self._purchases(transaction, group=False)
+
+    def _purchase_group_tickets(self, transaction):
+        return self._purchases(transaction, group=True)
+
+    def _export_report(self, transaction):
+        for number, operation in transaction:
+            report = operation.get("report")
+            assert report in REPORTS, f"line {number}: unknown report {report}"
+            text = self.report(report)
+            path = operation.get("path")
+            if path is None:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            else:
+                with open(path, "w", newline="") as file:
+                    file.write(text)
+        return "exported"
+
+    def report(self, report):
+        """Return one of the REPORTS as text: revenue is a summary, the others are CSV."""
+        if report == "revenue":
+            return self.visitor_management.sales.summary() + "\n"
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if report == "events":
+            writer.writerow(["name", "type", "location", "start", "end", "event_id"])
+            for event in self.event_management.snapshot():
+                writer.writerow([event.name, type(event).__name__, event.location.name, event.start_time.strftime(TIME_FORMAT),
+                                 event.end_time.strftime(TIME_FORMAT), event.event_id])
+        elif report == "artworks":
+            writer.writerow(["title", "artist", "date_of_creation", "historical_significance", "location"])
+            for artwork in self.artwork_management.snapshot():
+                writer.writerow([artwork.title, artwork.artist, artwork.date_of_creation, artwork.historical_significance,
+                                 artwork.exhibition_location.name])
+        elif report == "visitors":
+            writer.writerow(["name", "age", "email", "group_id", "is_student", "is_teacher"])
+            for visitor in self.visitor_management.snapshot():
+                writer.writerow([visitor.name, visitor.age, visitor.email, getattr(visitor, "group_id", ""),
+                                 int(bool(visitor.is_student)), int(bool(visitor.is_teacher))])
+        else:
+            writer.writerow(["email", "event_id", "price", "category", "entry", "code"])
+            for ticket in self.tickets:
+                window = ticket.entry_window()
+                writer.writerow([ticket.visitor.email, ticket.event.event_id, f"{ticket.price:.2f}", ticket.pricing_category(),
+                                 "" if window is None else window[0].strftime(TIME_FORMAT), ticket.code or ""])
+        return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply batch files of operations to the museum registries.",
+                                     epilog="Unless --dry-run is given, the snapshot is saved even if a transaction is rejected, "
+                                            "with every transaction applied before it.")
+    parser.add_argument("batches", nargs="+", help="JSON Lines batch files; - reads standard input")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="snapshot file to load and save")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="purchase-history journal that ticket sales are recorded in")
+    parser.add_argument("--batch-size", type=int, default=1000, help="most operations per transaction")
+    parser.add_argument("--keep-going", action="store_true", help="continue after a rejected transaction")
+    parser.add_argument("--dry-run", action="store_true", help="do not save the registries or record ticket sales")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args()
+
+    if os.path.exists(args.state):
+        event_management, artwork_management, visitor_management = load_snapshot(args.state)
+    else:
+        event_management, artwork_management, visitor_management = EventManagement(), ArtworkManagement(), VisitorInfoManagement()
+    if args.dry_run:
+        # tour places are counted for this run only, and earlier sales still earn
+        # their loyalty discounts, but this run's are not journaled
+        counters = None
+        history = PurchaseHistory(args.history if os.path.exists(args.history) else None)
+        history.close()
+    else:
+        # the sales are real, so they take places from the table the GUI sells from
+        counters = SharedCapacityCounters.attach_or_create()
+        history = PurchaseHistory(args.history)
+    visitor_management.capacity_counters = counters
+    visitor_management.purchase_history = history
+    runner = BatchRunner(event_management, artwork_management, visitor_management, args.batch_size,
+                         None if args.quiet else sys.stderr)
+    ok = True
+    try:
+        for batch in args.batches:
+            file = sys.stdin if batch == "-" else open(batch)
+            try:
+                ok = runner.run(read_operations(file), args.keep_going) and ok
+            except AssertionError as error:
+                runner.errors.append(f"{batch}: {error}")
+                ok = False
+            finally:
+                if file is not sys.stdin:
+                    file.close()
+            if not ok and not args.keep_going:
+                break
+    finally:
+        visitor_management.capacity_counters = None
+        visitor_management.purchase_history = None
+        history.close()
+        if counters is not None:
+            counters.close()
+    if not args.dry_run:
+        size = save_snapshot(args.state, event_management, artwork_management, visitor_management)
+        print(f"saved {args.state} ({size:,} bytes)", file=sys.stderr)
+    print(f"{runner.applied} operations applied, {runner.failed} rejected", file=sys.stderr)
+    for error in runner.errors:
+        print(f"error: {error}", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+from event import Location
+
+
+class OccupancyEngine:
+    """Expected number of ticket holders per Location in fixed time slots.
+
+    Each ticket adds +1 to the slot its event starts in and -1 to the slot
+    after it ends, in a per-location difference array. A prefix sum then
+    yields the whole occupancy curve, so a season costs O(tickets + slots)
+    rather than one scan of the tickets per slot. Sales and refunds update
+    it from the lock-free purchase path, so updates are made under a lock.
+    """
+    def __init__(self, start, end, slot_minutes=15):
+        """Initialize empty histograms covering start to end.
+
+        Parameters:
+        - start: datetime of the first slot.
+        - end: datetime after which tickets are not counted.
+        - slot_minutes: Length of one slot in minutes.
+        """
+        assert isinstance(start, datetime) and isinstance(end, datetime), "Invalid start or end time"
+        assert start < end, "Start time must be before end time"
+        assert isinstance(slot_minutes, int) and slot_minutes > 0, "Slot length must be a positive integer"
+        self.start = start
+        self.slot = timedelta(minutes=slot_minutes)
+        self.num_slots = -(-(end - start) // self.slot)
+        self._diff = np.zeros((len(Location), self.num_slots + 1), dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _slot_range(self, start_time, end_time):
+        # a visitor occupies every slot the event overlaps
+        first = (start_time - self.start) // self.slot
+        last = -(-(end_time - self.start) // self.slot)
+        return max(first, 0), min(last, self.num_slots)
+
+    def add_interval(self, location, start_time, end_time, count=1):
+        """Count count visitors at location between start_time and end_time."""
+        assert isinstance(location, Location), "Invalid location"
+        first, last = self._slot_range(start_time, end_time)
+        if first < last:
+            row = self._diff[location.value - 1]
+            with self._lock:
+                row[first] += count
+                row[last] -= count
+
+    def add_ticket(self, ticket, count=1):
+        """Count the holder of a ticket for the whole of its event."""
+        event = ticket.event
+        self.add_interval(event.location, event.start_time, event.end_time, count)
+
+    def remove_ticket(self, ticket):
+        """Stop counting the holder of a refunded ticket."""
+        self.add_ticket(ticket, -1)
+
+    def add_tickets(self, tickets):
+        """Count many tickets at once with vectorized updates."""
+        tickets = list(tickets)
+        if not tickets:
+            return
+        rows = np.fromiter((ticket.event.location.value - 1 for ticket in tickets), dtype=np.int64, count=len(tickets))
+        starts = np.fromiter(((ticket.event.start_time - self.start) // self.slot for ticket in tickets), dtype=np.int64, count=len(tickets))
+        ends = np.fromiter((-(-(ticket.event.end_time - self.start) // self.slot) for ticket in tickets), dtype=np.int64, count=len(tickets))
+        starts = np.clip(starts, 0, self.num_slots)
+        ends = np.clip(ends, 0, self.num_slots)
+        keep = starts < ends
+        with self._lock:
+            np.add.at(self._diff, (rows[keep], starts[keep]), 1)
+            np.add.at(self._diff, (rows[keep], ends[keep]), -1)
+
+    def histogram(self, location):
+        """Return an array with the expected number of visitors at location in each slot."""
+        assert isinstance(location, Location), "Invalid location"
+        with self._lock:
+            return np.cumsum(self._diff[location.value - 1, :-1])
+
+    def histograms(self):
+        """Return {Location: histogram array} for every location."""
+        with self._lock:
+            counts = np.cumsum(self._diff[:, :-1], axis=1)
+        return {location: counts[location.value - 1] for location in Location}
+
+    def slot_start(self, index):
+        """Return the datetime at which slot index begins."""
+        return self.start + index * self.slot
+
+    def peak(self, location):
+        """Return (slot start, visitors) for the busiest slot at location."""
+        counts = self.histogram(location)
+        index = int(np.argmax(counts))
+        return self.slot_start(index), int(counts[index])
+
+    def slots_over(self, location, limit):
+        """Return (slot start, visitors) for every slot at location above limit, e.g. a fire-safety cap."""
+        counts = self.histogram(location)
+        return [(self.slot_start(int(index)), int(counts[index])) for index in np.flatnonzero(counts > limit)]
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from event import Event, Location
+
+
+class RecurrenceRule:
+    """Daily recurrence at fixed times of day, optionally limited to some weekdays."""
+    def __init__(self, start_date, times, duration, until=None, weekdays=None, skip_dates=()):
+        """Initialize the rule.
+
+        Parameters:
+        - start_date: First date of the series.
+        - times: Times of day at which an occurrence starts, e.g. [time(10), time(12), time(15)].
+        - duration: timedelta length of each occurrence.
+        - until: Optional last date of the series (inclusive).
+        - weekdays: Optional set of weekdays (Monday is 0) on which the series runs.
+        - skip_dates: Dates with no occurrences, e.g. public holidays.
+        """
+        assert isinstance(start_date, date), "Invalid start date"
+        assert times and all(isinstance(t, time) for t in times), "Times must be a non-empty list of times of day"
+        assert isinstance(duration, timedelta) and duration > timedelta(0), "Duration must be a positive timedelta"
+        assert until is None or until >= start_date, "Until must not be before the start date"
+        assert weekdays is None or (set(weekdays) and set(weekdays) <= set(range(7))), "Weekdays must be a non-empty set of days 0-6"
+        self.start_date = start_date
+        self.times = sorted(times)
+        self.duration = duration
+        self.until = until
+        self.weekdays = set(weekdays) if weekdays is not None else None
+        self.skip_dates = set(skip_dates)
+
+    def runs_on(self, day):
+        if day < self.start_date or (self.until is not None and day > self.until):
+            return False
+        if self.weekdays is not None and day.weekday() not in self.weekdays:
+            return False
+        return day not in self.skip_dates
+
+    def starts_between(self, window_start, window_end):
+        """Yield the start times of occurrences overlapping [window_start, window_end), in order.
+
+        Only the days inside the window are visited, however long the series.
+        """
+        day = max(self.start_date, (window_start - self.duration).date())
+        last_day = window_end.date()
+        if self.until is not None:
+            last_day = min(last_day, self.until)
+        while day <= last_day:
+            if self.runs_on(day):
+                for t in self.times:
+                    start = datetime.combine(day, t)
+                    if start >= window_end:
+                        return
+                    if start + self.duration > window_start:
+                        yield start
+            day += timedelta(days=1)
+
+
+class EventSeries:
+    """A recurring event stored once, with occurrences produced on demand.
+
+    An occurrence is only built when a query touches it. The most recently
+    used ones are cached, so repeated lookups return the same object. An
+    occurrence evicted from the cache is still returned for as long as
+    anything else (a ticket, a catalogue, a schedule) refers to it, so
+    structures keyed by identity keep matching; one with its own timed-entry
+    slots is kept for good, so that state survives eviction.
+    """
+    def __init__(self, name, location, rule, event_class=Event, cache_size=256, **event_kwargs):
+        """Initialize the series.
+
+        Parameters:
+        - name: Name shared by every occurrence.
+        - location: Location of every occurrence.
+        - rule: A RecurrenceRule.
+        - event_class: Event subclass to create, e.g. Tour.
+        - cache_size: Number of recently used occurrences kept built.
+        - event_kwargs: Extra arguments for event_class, e.g. max_capacity=25.
+        """
+        assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
+        assert isinstance(location, Location), "Invalid location"
+        assert isinstance(rule, RecurrenceRule), "Invalid recurrence rule"
+        assert issubclass(event_class, Event), "Invalid event class"
+        assert isinstance(cache_size, int) and cache_size > 0, "Cache size must be a positive integer"
+        self.name = name.strip()
+        self.location = location
+        self.rule = rule
+        self.event_class = event_class
+        self.event_kwargs = event_kwargs
+        self.cache_size = cache_size
+        self._materialized = OrderedDict()  # start time -> Event, least recently used first
+        self._kept = {}  # start time -> evicted Event with timed-entry state
+        self._evicted = weakref.WeakValueDictionary()  # start time -> evicted Event still referenced elsewhere
+        self._lock = threading.Lock()
+
+    def _occurrence(self, start):
+        with self._lock:
+            event = self._kept.get(start)
+            if event is not None:
+                return event
+            event = self._materialized.get(start)
+            if event is not None:
+                self._materialized.move_to_end(start)
+                return event
+            event = self._evicted.pop(start, None)
+            if event is None:
+                event = self.event_class(self.name, self.location, start, start + self.rule.duration, **self.event_kwargs)
+            self._materialized[start] = event
+            if len(self._materialized) > self.cache_size:
+                oldest, evicted = self._materialized.popitem(last=False)
+                if getattr(evicted, "timed_entry", None) is not None:
+                    self._kept[oldest] = evicted
+                else:
+                    self._evicted[oldest] = evicted
+            return event
+
+    def occurrences(self, window_start, window_end):
+        """Generate the occurrences overlapping [window_start, window_end), earliest first."""
+        for start in self.rule.starts_between(window_start, window_end):
+            yield self._occurrence(start)
+
+    def occurrence_at(self, start_time):
+        """Return the occurrence starting at start_time, or None if the series has none then."""
+        if not self.rule.runs_on(start_time.date()) or start_time.time() not in self.rule.times:
+            return None
+        return self._occurrence(start_time)
+
+    def next_occurrence(self, after):
+        """Return the first occurrence starting at or after a moment, or None if the series has ended."""
+        for start in self.rule.starts_between(after, datetime.max):
+            if start >= after:
+                return self._occurrence(start)
+        return None
+
+    def materialized_count(self):
+        """Return how many occurrences are currently built."""
+        return len(self._materialized) + len(self._kept) + len(self._evicted)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import threading
+
+# Pricing categories in the order Ticket.calculate_ticket_price applies them
+PRICING_CATEGORIES = ("student", "teacher", "child", "senior", "group", "special_event", "full_adult")
+
+
+class SalesAggregates:
+    """Running revenue and attendance totals, updated in O(1) per sale or refund.
+
+    Totals are kept per event id, per Location, per event day and per
+    pricing category, so a dashboard never has to re-price past tickets.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_event = {}
+        self._by_location = {}
+        self._by_day = {}
+        self._by_category = {}
+        self.revenue = 0.0
+        self.attendance = 0
+
+    def _apply(self, ticket, sign):
+        keys = (
+            (self._by_event, ticket.event.event_id),
+            (self._by_location, ticket.event.location),
+            (self._by_day, ticket.event.start_time.date()),
+            (self._by_category, ticket.pricing_category()),
+        )
+        amount = sign * ticket.price
+        with self._lock:
+            for totals, key in keys:
+                entry = totals.get(key)
+                if entry is None:
+                    entry = totals[key] = [0.0, 0]
+                entry[0] += amount
+                entry[1] += sign
+            self.revenue += amount
+            self.attendance += sign
+
+    def record_sale(self, ticket):
+        """Add a sold ticket to the totals."""
+        self._apply(ticket, 1)
+
+    def record_refund(self, ticket):
+        """Take a refunded ticket back out of the totals."""
+        self._apply(ticket, -1)
+
+    def _query(self, totals):
+        with self._lock:
+            return {key: (revenue, attendance) for key, (revenue, attendance) in totals.items()}
+
+    def by_event(self):
+        """Return {event id: (revenue, attendance)}."""
+        return self._query(self._by_event)
+
+    def by_location(self):
+        """Return {Location: (revenue, attendance)}."""
+        return self._query(self._by_location)
+
+    def by_day(self):
+        """Return {date: (revenue, attendance)}, keyed by the day the event starts."""
+        return self._query(self._by_day)
+
+    def by_category(self):
+        """Return {pricing category: (revenue, attendance)}."""
+        return self._query(self._by_category)
+
+    def summary(self):
+        """Return a multi-line text report of all totals."""
+        lines = [f"Total: {self.revenue:.2f} AED, {self.attendance} tickets"]
+        sections = (
+            ("By event", self.by_event(), str),
+            ("By location", self.by_location(), lambda location: location.name),
+            ("By day", self.by_day(), lambda day: day.isoformat()),
+            ("By category", self.by_category(), str),
+        )
+        for title, totals, label in sections:
+            lines.append(f"\n{title}:")
+            for key in sorted(totals, key=label):
+                revenue, attendance = totals[key]
+                lines.append(f"  {label(key)}: {revenue:.2f} AED, {attendance} tickets")
+        return "\n".join(lines)
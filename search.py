@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+
+np = None  # numpy, imported by the first search so that importing the registries stays fast
+_numpy_loaded = False
+
+
+def _load_numpy():
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        try:
+            import numpy as np
+        except ImportError:  # ranking falls back to pure Python
+            np = None
+        _numpy_loaded = True
+    return np
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into case-folded word tokens."""
+    return _TOKEN.findall(text.casefold())
+
+
+class ArtworkSearchIndex:
+    """Inverted index over artwork title, artist and historical significance, ranked with BM25.
+
+    Postings are append-only arrays of document ids and term frequencies.
+    Removing an artwork only marks its document dead; dead entries are
+    dropped from the postings once they outnumber the live ones.
+    """
+    def __init__(self, k1=1.2, b=0.75):
+        """Initialize an empty index with the BM25 tuning parameters k1 and b."""
+        self.k1 = k1
+        self.b = b
+        self._postings = {}  # term -> (array of doc ids, array of term frequencies)
+        self._document_frequency = Counter()  # term -> number of live documents containing it
+        self._doc_terms = {}  # live doc id -> Counter of terms, needed to unindex
+        self._doc_lengths = array("I")  # doc id -> number of tokens
+        self._alive = bytearray()  # doc id -> 1 while the artwork is indexed
+        self._doc_ids = {}  # id(artwork) -> doc id
+        self._artworks = {}  # live doc id -> artwork
+        self._total_length = 0
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._artworks)
+
+    def add(self, artwork):
+        """Index an artwork, replacing its entry if it is already indexed."""
+        if id(artwork) in self._doc_ids:
+            self.remove(artwork)
+        terms = Counter(tokenize(f"{artwork.title} {artwork.artist} {artwork.historical_significance}"))
+        doc = len(self._alive)
+        length = sum(terms.values())
+        self._doc_ids[id(artwork)] = doc
+        self._artworks[doc] = artwork
+        self._doc_terms[doc] = terms
+        self._doc_lengths.append(length)
+        self._alive.append(1)
+        self._total_length += length
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].append(doc)
+            postings[1].append(frequency)
+            self._document_frequency[term] += 1
+
+    def remove(self, artwork):
+        """Drop an artwork from the index. Returns True if it was indexed, False otherwise."""
+        doc = self._doc_ids.pop(id(artwork), None)
+        if doc is None:
+            return False
+        del self._artworks[doc]
+        self._alive[doc] = 0
+        self._total_length -= self._doc_lengths[doc]
+        for term in self._doc_terms.pop(doc):
+            self._document_frequency[term] -= 1
+            if not self._document_frequency[term]:
+                del self._document_frequency[term]
+                del self._postings[term]
+        self._dead += 1
+        if self._dead > len(self._artworks):
+            self._compact()
+        return True
+
+    def _compact(self):
+        alive = self._alive
+        for term, (docs, frequencies) in self._postings.items():
+            kept = [i for i, doc in enumerate(docs) if alive[doc]]
+            if len(kept) < len(docs):
+                self._postings[term] = (array("I", [docs[i] for i in kept]), array("I", [frequencies[i] for i in kept]))
+        self._dead = 0
+
+    def search(self, query, limit=10):
+        """Return up to limit (artwork, score) pairs best matching the query, highest score first."""
+        assert isinstance(query, str), "Query must be a string"
+        assert isinstance(limit, int) and limit > 0, "Limit must be a positive integer"
+        count = len(self._artworks)
+        if count == 0:
+            return []
+        average_length = self._total_length / count
+        terms = []
+        for term in set(tokenize(query)):
+            if term in self._postings:
+                df = self._document_frequency[term]
+                terms.append((self._postings[term], math.log(1 + (count - df + 0.5) / (df + 0.5))))
+        if not terms:
+            return []
+        if _load_numpy() is None:
+            best = self._rank_python(terms, average_length, limit)
+        else:
+            best = self._rank_numpy(terms, average_length, limit)
+        return [(self._artworks[doc], score) for doc, score in best]
+
+    def _rank_python(self, terms, average_length, limit):
+        k1 = self.k1
+        base = k1 * (1 - self.b)
+        length_factor = k1 * self.b / average_length
+        lengths = self._doc_lengths
+        alive = self._alive
+        scores = {}
+        for (docs, frequencies), idf in terms:
+            for doc, frequency in zip(docs, frequencies):
+                if alive[doc]:
+                    score = idf * frequency * (k1 + 1) / (frequency + base + length_factor * lengths[doc])
+                    scores[doc] = scores.get(doc, 0.0) + score
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def _rank_numpy(self, terms, average_length, limit):
+        k1 = self.k1
+        base = k1 * (1 - self.b)
+        length_factor = k1 * self.b / average_length
+        lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)
+        matches = []
+        for (docs, frequencies), idf in terms:
+            docs = np.frombuffer(docs, dtype=np.uint32)
+            frequencies = np.frombuffer(frequencies, dtype=np.uint32).astype(np.float64)
+            matches.append((docs, idf * frequencies * (k1 + 1) / (frequencies + base + length_factor * lengths[docs])))
+        if len(matches) == 1:
+            docs, scores = matches[0]
+        elif sum(len(docs) for docs, _ in matches) * 8 < len(lengths):
+            # few postings: merge them sparsely instead of touching every document
+            docs, inverse = np.unique(np.concatenate([docs for docs, _ in matches]), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate([scores for _, scores in matches]))
+        else:
+            dense = np.zeros(len(lengths))
+            for term_docs, term_scores in matches:
+                # a document appears at most once per term, so plain fancy indexing is safe
+                dense[term_docs] += term_scores
+            docs = np.flatnonzero(dense)
+            scores = dense[docs]
+        alive = np.frombuffer(self._alive, dtype=np.uint8)[docs].astype(bool)
+        docs, scores = docs[alive], scores[alive]
+        limit = min(limit, len(docs))
+        if limit == 0:
+            return []
+        top = np.argpartition(scores, len(scores) - limit)[len(scores) - limit:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(docs[i]), float(scores[i])) for i in top]
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import bisect
+import hashlib
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Client, Listener
+from visitor import Visitor, normalize_email
+from ticket import VisitorInfoManagement
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping email addresses to shard names."""
+    def __init__(self, replicas=64):
+        """Initialize an empty ring with the given number of virtual nodes per shard."""
+        assert isinstance(replicas, int) and replicas > 0, "Replicas must be a positive integer"
+        self.replicas = replicas
+        self._points = []
+        self._owners = {}
+
+    def add_shard(self, name):
+        """Place a shard on the ring."""
+        assert isinstance(name, str) and name.strip(), "Shard name must be a non-empty string"
+        assert name not in self._owners.values(), "Shard already on the ring"
+        for i in range(self.replicas):
+            point = _hash(f"{name}#{i}")
+            self._owners[point] = name
+            bisect.insort(self._points, point)
+
+    def remove_shard(self, name):
+        """Take a shard off the ring."""
+        self._points = [point for point in self._points if self._owners[point] != name]
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != name}
+
+    def shard_for(self, email):
+        """Return the name of the shard that owns the given email."""
+        assert self._points, "The ring has no shards"
+        index = bisect.bisect(self._points, _hash(normalize_email(email)))
+        return self._owners[self._points[index % len(self._points)]]
+
+
+class LocalShard:
+    """Shard holding its visitors in the current process.
+
+    Emails are routed by their normalized form, so the shard also looks
+    them up that way: it keeps the exact addresses stored under each
+    normalized one.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.management = VisitorInfoManagement()
+        self._emails = {}  # normalized email -> {stored email: number of visitors}
+
+    def _track(self, email, change):
+        stored = self._emails.setdefault(normalize_email(email), {})
+        stored[email] = stored.get(email, 0) + change
+        if not stored[email]:
+            del stored[email]
+            if not stored:
+                del self._emails[normalize_email(email)]
+
+    def add_visitor(self, visitor):
+        self.management.add_visitor(visitor)
+        self._track(visitor.email, 1)
+
+    def remove_visitor(self, email):
+        for stored in list(self._emails.get(normalize_email(email), ())):
+            if self.management.remove_visitor(stored):
+                self._track(stored, -1)
+                return True
+        return False
+
+    def get_visitor_by_email(self, email):
+        for stored in self._emails.get(normalize_email(email), ()):
+            visitor = self.management.get_visitor_by_email(stored)
+            if visitor is not None:
+                return visitor
+        return None
+
+    def emails(self):
+        """Return the distinct email addresses stored on this shard."""
+        return [email for stored in self._emails.values() for email in stored]
+
+    def count(self):
+        return len(self.management.snapshot())
+
+    def add_visitors(self, visitors):
+        for visitor in visitors:
+            self.add_visitor(visitor)
+
+    def pop_visitors(self, emails):
+        """Remove and return every visitor whose email, normalized, is in the given collection."""
+        stored = [email for key in {normalize_email(email) for email in emails} for email in self._emails.get(key, ())]
+        removed = self.management.pop_visitors(stored)
+        for visitor in removed:
+            self._track(visitor.email, -1)
+        return removed
+
+    def close(self):
+        pass
+
+
+def _serve(conn, name):
+    """Answer shard requests arriving on a connection until it is closed."""
+    shard = LocalShard(name)
+    while True:
+        try:
+            method, args = conn.recv()
+        except EOFError:
+            break
+        if method == "close":
+            conn.send((True, None))
+            break
+        try:
+            conn.send((True, getattr(shard, method)(*args)))
+        except Exception as e:
+            # any failure goes back to the caller; the shard keeps serving
+            conn.send((False, str(e) if isinstance(e, AssertionError) else f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+def serve_shard(address, name, authkey):
+    """Run a shard on this node, serving one router connection at a time.
+
+    Parameters:
+    - address: A (host, port) tuple to listen on.
+    - name: The shard name used on the router's ring.
+    - authkey: Shared secret bytes the router must present.
+    """
+    with Listener(address, authkey=authkey) as listener:
+        while True:
+            with listener.accept() as conn:
+                _serve(conn, name)
+
+
+class RemoteShard:
+    """Proxy for a shard living in another process or on another node."""
+    def __init__(self, name, conn, process=None):
+        self.name = name
+        self._conn = conn
+        self._process = process
+
+    @classmethod
+    def spawn(cls, name):
+        """Start a local worker process for the shard and connect to it."""
+        parent_conn, child_conn = Pipe()
+        process = Process(target=_serve, args=(child_conn, name), daemon=True)
+        process.start()
+        child_conn.close()
+        return cls(name, parent_conn, process)
+
+    @classmethod
+    def connect(cls, name, address, authkey):
+        """Connect to a shard started with serve_shard on another node."""
+        return cls(name, Client(address, authkey=authkey))
+
+    def _call(self, method, *args):
+        self._conn.send((method, args))
+        ok, result = self._conn.recv()
+        assert ok, result
+        return result
+
+    def add_visitor(self, visitor):
+        self._call("add_visitor", visitor)
+
+    def remove_visitor(self, email):
+        return self._call("remove_visitor", email)
+
+    def get_visitor_by_email(self, email):
+        return self._call("get_visitor_by_email", email)
+
+    def emails(self):
+        return self._call("emails")
+
+    def count(self):
+        return self._call("count")
+
+    def add_visitors(self, visitors):
+        self._call("add_visitors", visitors)
+
+    def pop_visitors(self, emails):
+        return self._call("pop_visitors", emails)
+
+    def close(self):
+        self._call("close")
+        self._conn.close()
+        if self._process is not None:
+            self._process.join()
+
+
+class ShardedVisitorRegistry:
+    """Router spreading visitors over shards by a consistent hash of their email."""
+    def __init__(self, shards=(), replicas=64):
+        """Initialize the router with an optional list of shards."""
+        self.ring = HashRing(replicas)
+        self.shards = {}
+        for shard in shards:
+            self.add_shard(shard)
+
+    @classmethod
+    def with_workers(cls, num_shards, replicas=64):
+        """Create a registry backed by num_shards local worker processes."""
+        assert isinstance(num_shards, int) and num_shards > 0, "Number of shards must be a positive integer"
+        return cls([RemoteShard.spawn(f"shard-{i}") for i in range(num_shards)], replicas)
+
+    def _shard_for(self, email):
+        return self.shards[self.ring.shard_for(email)]
+
+    def add_visitor(self, visitor):
+        """Store a visitor on the shard owning its email."""
+        assert isinstance(visitor, Visitor), "Invalid visitor"
+        self._shard_for(visitor.email).add_visitor(visitor)
+
+    def remove_visitor(self, email):
+        """Remove a visitor by email. Returns True if a visitor was removed, False otherwise."""
+        assert isinstance(email, str) and email.strip(), "Email must be a non-empty string"
+        return self._shard_for(email).remove_visitor(email)
+
+    def get_visitor_by_email(self, email):
+        """Return the visitor with the given email, or None if not found."""
+        assert isinstance(email, str) and email.strip(), "Email must be a non-empty string"
+        return self._shard_for(email).get_visitor_by_email(email)
+
+    def count(self):
+        """Return the number of visitors across all shards."""
+        return sum(shard.count() for shard in self.shards.values())
+
+    def add_shard(self, shard):
+        """Add a shard and move over only the visitors whose owner changed.
+
+        Returns:
+        - The number of visitors moved to the new shard.
+        """
+        assert shard.name not in self.shards, "Shard already registered"
+        existing = list(self.shards.values())
+        self.ring.add_shard(shard.name)
+        self.shards[shard.name] = shard
+        moved = 0
+        for old in existing:
+            emails = [email for email in old.emails() if self.ring.shard_for(email) == shard.name]
+            if emails:
+                visitors = old.pop_visitors(emails)
+                shard.add_visitors(visitors)
+                moved += len(visitors)
+        return moved
+
+    def remove_shard(self, name):
+        """Remove a shard, handing its visitors to their new owners."""
+        assert name in self.shards, "Unknown shard"
+        assert len(self.shards) > 1, "Cannot remove the last shard"
+        shard = self.shards.pop(name)
+        self.ring.remove_shard(name)
+        visitors = shard.pop_visitors(shard.emails())
+        for visitor in visitors:
+            self._shard_for(visitor.email).add_visitor(visitor)
+        shard.close()
+        return len(visitors)
+
+    def close(self):
+        """Shut down every shard."""
+        for shard in self.shards.values():
+            shard.close()
+        self.shards = {}
@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import gc
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from event import Event, Exhibition, Tour, SpecialEvent, Location, EventManagement
+from artwork import Artwork, ArtworkManagement
+from visitor import Visitor, GroupVisitor
+from ticket import VisitorInfoManagement
+from recurrence import RecurrenceRule, EventSeries
+from exhibition_links import ExhibitionCatalogue
+
+SCHEMA_VERSION = 1
+MAGIC = b"MUSS"
+
+# A snapshot is a header followed by sections, one per registry. A section
+# stores its registry as columns. Number columns are typed arrays. String
+# columns are dictionary encoded when values repeat (artists, group ids), so
+# each distinct value is stored once, and plain otherwise (emails). Readers
+# skip sections and trailing columns they do not know, so later schema
+# versions can add both without breaking older readers.
+_HEADER = struct.Struct("<4sHI")  # magic, schema version, section count
+_SECTION = struct.Struct("<BQ")  # section id, payload length
+_COLUMN = struct.Struct("<cQ")  # array typecode, or "s" for strings, and byte length
+EVENTS, ARTWORKS, VISITORS, MEMBERSHIP, SERIES, CATALOGUE = 1, 2, 3, 4, 5, 6
+
+_JOINED, _SIZED = 0, 1  # string blocks: NUL separated, or with a length array when a value contains NUL
+_PLAIN, _DICTIONARY = 0, 1
+_EVENT_CLASSES = (Event, Exhibition, Tour, SpecialEvent)
+_LOCATIONS = list(Location)
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def _array_bytes(column):
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_array(typecode, data):
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+
+def _string_block(strings):
+    text = "\0".join(strings)
+    if text.count("\0") == max(len(strings) - 1, 0):
+        return bytes([_JOINED]) + struct.pack("<I", len(strings)) + text.encode("utf-8")
+    lengths = _array_bytes(array("I", map(len, strings)))
+    return bytes([_SIZED]) + struct.pack("<I", len(strings)) + lengths + "".join(strings).encode("utf-8")
+
+
+def _read_string_block(view):
+    (count,) = struct.unpack_from("<I", view, 1)
+    if count == 0:
+        return []
+    if view[0] == _JOINED:
+        return str(view[5:], "utf-8").split("\0")
+    lengths = _read_array("I", view[5:5 + 4 * count])
+    text = str(view[5 + 4 * count:], "utf-8")
+    offsets = list(accumulate(lengths, initial=0))
+    return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def _string_column(values):
+    """Encode a list of strings, where None is allowed, as a string column."""
+    distinct = {}
+    refs = [None if value is None else distinct.setdefault(value, len(distinct)) for value in values]
+    if len(distinct) > len(values) // 2 and None not in refs:
+        return bytes([_PLAIN]) + _string_block(values)
+    # None is kept out of the block and given the index just past its end
+    none_ref = len(distinct)
+    refs = array("I", [none_ref if ref is None else ref for ref in refs])
+    block = _string_block(list(distinct))
+    return bytes([_DICTIONARY]) + struct.pack("<Q", len(block)) + block + _array_bytes(refs)
+
+
+def _read_string_column(view):
+    if view[0] == _PLAIN:
+        return _read_string_block(view[1:])
+    (size,) = struct.unpack_from("<Q", view, 1)
+    table = _read_string_block(view[9:9 + size])
+    table.append(None)
+    return list(map(table.__getitem__, _read_array("I", view[9 + size:])))
+
+
+def _columns(*columns):
+    parts = [struct.pack("<I", len(columns))]
+    for column in columns:
+        if isinstance(column, array):
+            typecode, data = column.typecode, _array_bytes(column)
+        else:
+            typecode, data = "s", _string_column(column)
+        parts.append(_COLUMN.pack(typecode.encode("ascii"), len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def _read_columns(view):
+    (count,) = struct.unpack_from("<I", view)
+    offset = 4
+    columns = []
+    for _ in range(count):
+        typecode, size = _COLUMN.unpack_from(view, offset)
+        offset += _COLUMN.size
+        data = view[offset:offset + size]
+        if typecode == b"s":
+            columns.append(_read_string_column(data))
+        else:
+            columns.append(_read_array(typecode.decode("ascii"), data))
+        offset += size
+    return columns
+
+
+def _event_columns(events):
+    kinds, locations, capacities, prices = array("B"), array("B"), array("I"), array("d")
+    starts, ends, slot_minutes, slot_capacities = array("q"), array("q"), array("H"), array("I")
+    for event in events:
+        assert type(event) in _EVENT_CLASSES, "Invalid event"
+        kinds.append(_EVENT_CLASSES.index(type(event)))
+        locations.append(_LOCATIONS.index(event.location))
+        starts.append((event.start_time - _EPOCH) // _SECOND)
+        ends.append((event.end_time - _EPOCH) // _SECOND)
+        capacities.append(getattr(event, "max_capacity", 0))
+        prices.append(getattr(event, "ticket_price", 0.0))
+        timed_entry = getattr(event, "timed_entry", None)
+        if timed_entry is None:
+            slot_minutes.append(0)
+            slot_capacities.append(0)
+        else:
+            first_start, first_end = timed_entry.slots[0]
+            slot_minutes.append((first_end - first_start) // timedelta(minutes=1))
+            slot_capacities.append(timed_entry.slot_capacity)
+    return _columns([event.name for event in events], kinds, locations, starts, ends, capacities, prices, slot_minutes, slot_capacities)
+
+
+def _series_columns(series_list):
+    kinds, locations, start_dates, untils, durations = array("B"), array("B"), array("I"), array("I"), array("q")
+    weekdays, capacities, prices, cache_sizes = array("B"), array("I"), array("d"), array("I")
+    times, skip_dates = [], []
+    for series in series_list:
+        assert series.event_class in _EVENT_CLASSES, "Invalid event class"
+        assert set(series.event_kwargs) <= {"max_capacity", "ticket_price"}, "Unsupported event arguments"
+        rule = series.rule
+        kinds.append(_EVENT_CLASSES.index(series.event_class))
+        locations.append(_LOCATIONS.index(series.location))
+        start_dates.append(rule.start_date.toordinal())
+        untils.append(0 if rule.until is None else rule.until.toordinal())
+        durations.append(rule.duration // _SECOND)
+        # a weekday bit mask, with 0 for every day
+        weekdays.append(0 if rule.weekdays is None else sum(1 << day for day in rule.weekdays))
+        capacities.append(series.event_kwargs.get("max_capacity", 0))
+        prices.append(series.event_kwargs.get("ticket_price", 0.0))
+        cache_sizes.append(series.cache_size)
+        # variable-length lists are stored as comma separated numbers
+        times.append(",".join(str(t.hour * 3600 + t.minute * 60 + t.second) for t in rule.times))
+        skip_dates.append(",".join(str(day.toordinal()) for day in sorted(rule.skip_dates)))
+    return _columns([series.name for series in series_list], kinds, locations, start_dates, untils, durations,
+                    times, weekdays, skip_dates, capacities, prices, cache_sizes)
+
+
+def _catalogue_columns(catalogue, events, artworks):
+    # assignments refer to rows of the event and artwork sections; ones to unsaved events are dropped
+    event_rows = {id(event): row for row, event in enumerate(events)}
+    artwork_rows = {id(artwork): row for row, artwork in enumerate(artworks)}
+    exhibition_column, artwork_column = array("I"), array("I")
+    for exhibition, artwork in catalogue.pairs():
+        if id(exhibition) in event_rows and id(artwork) in artwork_rows:
+            exhibition_column.append(event_rows[id(exhibition)])
+            artwork_column.append(artwork_rows[id(artwork)])
+    return _columns(exhibition_column, artwork_column)
+
+
+def _artwork_columns(artworks):
+    return _columns([artwork.title for artwork in artworks],
+                    [artwork.artist for artwork in artworks],
+                    [artwork.date_of_creation for artwork in artworks],
+                    [artwork.historical_significance for artwork in artworks],
+                    array("B", [_LOCATIONS.index(artwork.exhibition_location) for artwork in artworks]))
+
+
+def _visitor_columns(visitors):
+    return _columns([visitor.name for visitor in visitors],
+                    [visitor.email for visitor in visitors],
+                    [getattr(visitor, "group_id", None) for visitor in visitors],
+                    array("H", [visitor.age for visitor in visitors]),
+                    array("B", [bool(visitor.is_student) for visitor in visitors]),
+                    array("B", [bool(visitor.is_teacher) for visitor in visitors]))
+
+
+def save_snapshot(path, event_management=None, artwork_management=None, visitor_management=None):
+    """Write the given registries to a snapshot file.
+
+    The snapshot is written to a temporary file in the same directory and
+    then moved over path, so a failed save leaves the previous one intact.
+    An ExhibitionCatalogue attached to both the event and artwork registries
+    is saved with them.
+
+    Parameters:
+    - path: File to write; it is replaced if it exists.
+    - event_management, artwork_management, visitor_management: Registries to save; None skips one.
+
+    Returns:
+    - The number of bytes written.
+    """
+    sections = []
+    if event_management is not None:
+        sections.append((EVENTS, _event_columns(event_management.snapshot())))
+        sections.append((SERIES, _series_columns(list(event_management.series))))
+    if artwork_management is not None:
+        sections.append((ARTWORKS, _artwork_columns(artwork_management.snapshot())))
+    if (event_management is not None and artwork_management is not None and event_management.catalogue is not None
+            and event_management.catalogue is artwork_management.catalogue):
+        sections.append((CATALOGUE, _catalogue_columns(event_management.catalogue, event_management.snapshot(), artwork_management.snapshot())))
+    if visitor_management is not None:
+        sections.append((VISITORS, _visitor_columns(visitor_management.snapshot())))
+        sections.append((MEMBERSHIP, visitor_management.membership_state()))
+    parts = [_HEADER.pack(MAGIC, SCHEMA_VERSION, len(sections))]
+    for section_id, payload in sections:
+        parts.append(_SECTION.pack(section_id, len(payload)))
+        parts.append(payload)
+    data = b"".join(parts)
+    descriptor, temporary_path = tempfile.mkstemp(prefix=".snapshot-", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return len(data)
+
+
+def _load_events(columns):
+    names, kinds, locations, starts, ends, capacities, prices, slot_minutes, slot_capacities = columns[:9]
+    events = []
+    for i, kind in enumerate(kinds):
+        args = (names[i], _LOCATIONS[locations[i]], _EPOCH + starts[i] * _SECOND, _EPOCH + ends[i] * _SECOND)
+        event_class = _EVENT_CLASSES[kind]
+        if event_class is Tour:
+            event = Tour(*args, capacities[i])
+        elif event_class is SpecialEvent:
+            event = SpecialEvent(*args, prices[i])
+        else:
+            event = event_class(*args)
+        if slot_minutes[i]:
+            event.enable_timed_entry(slot_minutes[i], slot_capacities[i])
+        events.append(event)
+    return events
+
+
+def _load_series(columns):
+    names, kinds, locations, start_dates, untils, durations, times, weekdays, skip_dates, capacities, prices, cache_sizes = columns[:12]
+    series_list = []
+    for i, kind in enumerate(kinds):
+        rule = RecurrenceRule(date.fromordinal(start_dates[i]),
+                              [time(seconds // 3600, seconds // 60 % 60, seconds % 60) for seconds in map(int, times[i].split(","))],
+                              durations[i] * _SECOND,
+                              until=date.fromordinal(untils[i]) if untils[i] else None,
+                              weekdays=[day for day in range(7) if weekdays[i] >> day & 1] if weekdays[i] else None,
+                              skip_dates=[date.fromordinal(int(ordinal)) for ordinal in skip_dates[i].split(",") if ordinal])
+        event_class = _EVENT_CLASSES[kind]
+        event_kwargs = {}
+        if event_class is Tour:
+            event_kwargs["max_capacity"] = capacities[i]
+        elif event_class is SpecialEvent:
+            event_kwargs["ticket_price"] = prices[i]
+        series_list.append(EventSeries(names[i], _LOCATIONS[locations[i]], rule, event_class, cache_sizes[i], **event_kwargs))
+    return series_list
+
+
+# Artworks and visitors are rebuilt without their constructors: every row was
+# validated when the object was first created, and skipping the checks halves
+# the load time of a large snapshot.
+def _load_artworks(columns):
+    titles, artists, dates, significances, locations = columns[:5]
+    artworks = []
+    new = object.__new__
+    for title, artist, date_of_creation, significance, location in zip(titles, artists, dates, significances, locations):
+        artwork = new(Artwork)
+        artwork.title = title
+        artwork.artist = artist
+        artwork.date_of_creation = date_of_creation
+        artwork.historical_significance = significance
+        artwork.exhibition_location = _LOCATIONS[location]
+        artworks.append(artwork)
+    return artworks
+
+
+def _load_visitors(columns):
+    names, emails, group_ids, ages, students, teachers = columns[:6]
+    visitors = []
+    new = object.__new__
+    for name, email, group_id, age, is_student, is_teacher in zip(names, emails, group_ids, ages, map(bool, students), map(bool, teachers)):
+        visitor = new(Visitor if group_id is None else GroupVisitor)
+        visitor.name = name
+        visitor.age = age
+        visitor.email = email
+        visitor.is_student = is_student
+        visitor.is_teacher = is_teacher
+        if group_id is not None:
+            visitor.group_id = group_id
+        visitors.append(visitor)
+    return visitors
+
+
+def load_snapshot(path):
+    """Read a snapshot file into fresh registries.
+
+    Returns:
+    - An (EventManagement, ArtworkManagement, VisitorInfoManagement) tuple; registries
+      missing from the snapshot come back empty. A saved ExhibitionCatalogue is attached
+      to the event and artwork registries.
+
+    Raises:
+    - AssertionError: If the file is not a snapshot or was written by a newer schema version.
+    """
+    with open(path, "rb") as file:
+        view = memoryview(file.read())
+    magic, version, num_sections = _HEADER.unpack_from(view)
+    assert magic == MAGIC, "Not a museum snapshot"
+    assert version <= SCHEMA_VERSION, f"Snapshot schema version {version} is newer than supported ({SCHEMA_VERSION})"
+    sections = {}
+    offset = _HEADER.size
+    for _ in range(num_sections):
+        section_id, size = _SECTION.unpack_from(view, offset)
+        offset += _SECTION.size
+        sections[section_id] = view[offset:offset + size]
+        offset += size
+
+    event_management, artwork_management, visitor_management = EventManagement(), ArtworkManagement(), VisitorInfoManagement()
+    # building millions of small objects triggers needless cyclic collections; none of them form cycles
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        if EVENTS in sections:
+            event_management.add_events(_load_events(_read_columns(sections[EVENTS])))
+        if SERIES in sections:
+            for series in _load_series(_read_columns(sections[SERIES])):
+                event_management.add_series(series)
+        if ARTWORKS in sections:
+            artwork_management.add_artworks(_load_artworks(_read_columns(sections[ARTWORKS])))
+        if VISITORS in sections:
+            membership = bytes(sections[MEMBERSHIP]) if MEMBERSHIP in sections else None
+            visitor_management.add_visitors(_load_visitors(_read_columns(sections[VISITORS])), membership)
+        if CATALOGUE in sections:
+            catalogue = event_management.catalogue = artwork_management.catalogue = ExhibitionCatalogue()
+            exhibition_rows, artwork_rows = _read_columns(sections[CATALOGUE])[:2]
+            events, artworks = event_management.snapshot(), artwork_management.snapshot()
+            shown = {}  # exhibition row -> artworks, so each exhibition is assigned once
+            for exhibition_row, artwork_row in zip(exhibition_rows, artwork_rows):
+                shown.setdefault(exhibition_row, []).append(artworks[artwork_row])
+            for exhibition_row, exhibition_artworks in shown.items():
+                catalogue.assign(events[exhibition_row], exhibition_artworks)
+    finally:
+        if collecting:
+            gc.enable()
+    return event_management, artwork_management, visitor_management
@@ -4,60 +4,413 @@
 # In[ ]:
 
 
+import threading
+import weakref
+from array import array
+from visitor import Visitor, GroupVisitor, normalize_email
+from event import Event, Exhibition, Tour, SpecialEvent
+from rwlock import RWLock
+from revenue import SalesAggregates
+from bloom import ScalableBloomFilter
+from value_codes import ValueDictionary, positions
+from time import perf_counter
+
 class Ticket:
-    def __init__(self, visitor, event):
+    """Class to represent a ticket for an event."""
+    def __init__(self, visitor, event, history=None):
+        """Initialize the Ticket object with visitor and event, priced with the loyalty discount from an optional PurchaseHistory."""
         assert isinstance(visitor, Visitor), "Invalid visitor"
         assert isinstance(event, Event), "Invalid event"
-        
+
         self.visitor = visitor
         self.event = event
-        self.price = self.calculate_ticket_price()
+        self.price = self.calculate_ticket_price(history)
+        self.entry_slot = None  # index into event.timed_entry.slots for timed-entry exhibitions
+        self.ticket_id = None
+        self.code = None  # signed code checked at the gate, see ticket_codes.py
+        self.refunded = False
 
-    def calculate_ticket_price(self):
+    def calculate_ticket_price(self, history=None):
+        """Calculate ticket price based on visitor and event details.
+
+        With a PurchaseHistory, paid tickets also get the visitor's loyalty
+        discount for the year of the event.
+        """
         base_price = 63  # AED
-        if self.visitor.is_student or self.visitor.is_teacher or self.visitor.age < 18 or self.visitor.age >= 60:
-            return 0  # Free ticket for students, teachers, children, and seniors
+        if self.visitor.is_student or self.visitor.is_teacher:
+            return 0  # Free ticket for students and teachers
+        elif self.visitor.age < 18 or self.visitor.age >= 60:
+            return 0  # Free ticket for children and seniors
+        elif isinstance(self.visitor, GroupVisitor):
+            price = (base_price / 2) * 1.05  # 50% discount for group visitors
+        elif isinstance(self.event, SpecialEvent):
+            price = (self.event.ticket_price) * 1.05
+        else:
+            price = base_price * 1.05  # Full price for adults with 5% VAT
+        if history is not None:
+            price *= 1 - history.discount(self.visitor.email, self.event.start_time.year, self.event)
+        return price
+
+    def pricing_category(self):
+        """Return which pricing rule calculate_ticket_price applies to this ticket."""
+        if self.visitor.is_student:
+            return "student"
+        elif self.visitor.is_teacher:
+            return "teacher"
+        elif self.visitor.age < 18:
+            return "child"
+        elif self.visitor.age >= 60:
+            return "senior"
         elif isinstance(self.visitor, GroupVisitor):
-            return (base_price / 2) * 1.05  # 50% discount for group visitors
+            return "group"
         elif isinstance(self.event, SpecialEvent):
-            return (self.event.ticket_price) * 1.05
+            return "special_event"
         else:
-            return base_price * 1.05  # Full price for adults with 5% VAT
+            return "full_adult"
+
+    def entry_window(self):
+        """Return the (start, end) of the assigned entry slot, or None if entry is not timed."""
+        if self.entry_slot is None:
+            return None
+        return self.event.timed_entry.slots[self.entry_slot]
 
     def display(self):
-        return f"Ticket Information:\nVisitor: {self.visitor.name}\nEvent: {self.event.name}\nLocation: {self.event.location.name}\nStart Time: {self.event.start_time.strftime('%Y-%m-%d %H:%M')}\nEnd Time: {self.event.end_time.strftime('%Y-%m-%d %H:%M')}\nTicket Price: {self.price} AED"
+        info = f"Ticket Information:\nVisitor: {self.visitor.name}\nEvent: {self.event.name}\nLocation: {self.event.location.name}\nStart Time: {self.event.start_time.strftime('%Y-%m-%d %H:%M')}\nEnd Time: {self.event.end_time.strftime('%Y-%m-%d %H:%M')}\nTicket Price: {self.price} AED"
+        window = self.entry_window()
+        if window is not None:
+            info += f"\nEntry: {window[0].strftime('%Y-%m-%d %H:%M')} - {window[1].strftime('%H:%M')}"
+        return info
 
     def display_receipt(self):
         return f"Payment Receipt:\nVisitor: {self.visitor.name}\nEvent: {self.event.name}\nLocation: {self.event.location.name}\nPrice: {self.price} AED"
 
-    
+
 class VisitorInfoManagement:
-    def __init__(self):
+    def __init__(self, capacity_counters=None, occupancy=None, filter_error_rate=0.001, ticket_signer=None, metrics=None, purchase_history=None):
+        """Initialize VisitorInfoManagement with an empty list to store visitors.
+
+        Parameters:
+        - capacity_counters: Optional SharedCapacityCounters used to enforce event capacity across processes;
+          without them, tour capacity is enforced for the tickets this registry sells.
+        - occupancy: Optional OccupancyEngine that counts every sold ticket per location and time slot.
+        - filter_error_rate: False-positive rate of the known-visitor and purchase membership filters.
+        - ticket_signer: Optional TicketSigner that gives every sold ticket a signed gate code.
+        - metrics: Optional MuseumMetrics that counts sales and refunds and times purchases.
+        - purchase_history: Optional PurchaseHistory that records every sale and refund per visitor
+          and gives returning visitors their loyalty discount.
+        """
         self.visitors = []
+        self.capacity_counters = capacity_counters
+        self.occupancy = occupancy
+        self.ticket_signer = ticket_signer
+        self.metrics = metrics
+        self.purchase_history = purchase_history
+        self.known_emails = ScalableBloomFilter(error_rate=filter_error_rate)
+        self.purchases = ScalableBloomFilter(error_rate=filter_error_rate)  # keyed on (email, event id)
+        self.sales = SalesAggregates()
+        # email domains and group ids repeat across many visitors; each distinct value is kept once
+        self.email_domains = ValueDictionary()
+        self.group_ids = ValueDictionary()
+        # email domain codes of the first len(_domain_codes) visitors, extended on the first domain query
+        self._domain_codes = array("I")
+        self._lock = RWLock()
+        self._refund_lock = threading.Lock()  # purchases skip the registry lock, so refunds claim tickets under their own
+        # tour places sold by this registry, counted here when no shared counters are attached
+        self._tour_places = weakref.WeakKeyDictionary()
+        self._tour_lock = threading.Lock()
+        self._snapshot = None
+
+    def _intern(self, visitor):
+        # a group id is swapped for the shared copy so the visitor's own can be freed
+        if isinstance(visitor, GroupVisitor):
+            visitor.group_id = self.group_ids.values[self.group_ids.encode(visitor.group_id)]
+
+    def _encode_domains(self):
+        if len(self._domain_codes) < len(self.visitors):
+            with self._lock.write_locked():
+                encode = self.email_domains.encode
+                self._domain_codes.extend(encode(normalize_email(visitor.email).rpartition("@")[2])
+                                          for visitor in self.visitors[len(self._domain_codes):])
 
     def add_visitor(self, visitor):
+        """Add a visitor to the list of visitors.
+
+        Parameters:
+        - visitor: A Visitor object to be added.
+
+        Raises:
+        - AssertionError: If the provided visitor is not an instance of the Visitor class.
+        """
         assert isinstance(visitor, Visitor), "Invalid visitor"
-        self.visitors.append(visitor)
+        with self._lock.write_locked():
+            self.visitors.append(visitor)
+            self._intern(visitor)
+            self.known_emails.add(normalize_email(visitor.email))
+            self._snapshot = None
+
+    def add_visitors(self, visitors, membership_state=None):
+        """Add several visitors under a single lock acquisition, e.g. when loading a snapshot.
+
+        Parameters:
+        - visitors: Visitor objects to be added.
+        - membership_state: Optional filters saved by membership_state; restoring them is much
+          faster than adding every email to the known-visitor filter again.
+        """
+        visitors = list(visitors)
+        assert all(isinstance(visitor, Visitor) for visitor in visitors), "Invalid visitor"
+        with self._lock.write_locked():
+            self.visitors.extend(visitors)
+            encode, shared = self.group_ids.encode, self.group_ids.values
+            for visitor in [visitor for visitor in visitors if isinstance(visitor, GroupVisitor)]:
+                visitor.group_id = shared[encode(visitor.group_id)]
+            if membership_state is not None:
+                self.restore_membership_state(membership_state)
+            else:
+                for visitor in visitors:
+                    self.known_emails.add(normalize_email(visitor.email))
+            self._snapshot = None
 
     def remove_visitor(self, email):
+        """Remove a visitor from the list of visitors based on their email address.
+
+        Parameters:
+        - email: A string representing the email address of the visitor to be removed.
+
+        Returns:
+        - True if the visitor is successfully removed, False otherwise.
+
+        Raises:
+        - AssertionError: If the provided email is not a non-empty string.
+        """
         assert isinstance(email, str) and email.strip(), "Email must be a non-empty string"
-        for visitor in self.visitors:
-            if visitor.email == email:
-                self.visitors.remove(visitor)
-                return True
+        with self._lock.write_locked():
+            for index, visitor in enumerate(self.visitors):
+                if visitor.email == email:
+                    del self.visitors[index]
+                    if index < len(self._domain_codes):
+                        del self._domain_codes[index]
+                    self._snapshot = None
+                    return True
         return False
 
+    def pop_visitors(self, emails):
+        """Remove every visitor whose email is in emails, in a single pass.
+
+        Returns:
+        - The list of removed Visitor objects.
+        """
+        emails = set(emails)
+        with self._lock.write_locked():
+            removed = [visitor for visitor in self.visitors if visitor.email in emails]
+            if removed:
+                kept = [visitor.email not in emails for visitor in self.visitors]
+                self.visitors = [visitor for visitor, keep in zip(self.visitors, kept) if keep]
+                # zip stops at the encoded prefix, which stays a prefix of the remaining visitors
+                self._domain_codes = array("I", [code for code, keep in zip(self._domain_codes, kept) if keep])
+                self._snapshot = None
+        return removed
+
+    def get_visitor_by_email(self, email):
+        """Retrieve a visitor based on their email address.
+
+        Parameters:
+        - email: A string representing the email address of the visitor to retrieve.
+
+        Returns:
+        - The Visitor object with the specified email if found, None otherwise.
+
+        Raises:
+        - AssertionError: If the provided email is not a non-empty string.
+        """
+        assert isinstance(email, str) and email.strip(), "Email must be a non-empty string"
+        with self._lock.read_locked():
+            for visitor in self.visitors:
+                if visitor.email == email:
+                    return visitor
+        return None
+
+    def visitors_with_domain(self, domain):
+        """Return the visitors whose email address is at the given domain, compared case-insensitively."""
+        self._encode_domains()
+        code = self.email_domains.code(domain.strip().lower())
+        if code is None:
+            return []
+        with self._lock.read_locked():
+            return [self.visitors[index] for index in positions(self._domain_codes, code)]
+
+    def may_know_visitor(self, email):
+        """Return False if no visitor or buyer with this email was ever recorded.
+
+        A False answer is certain and needs no scan of the visitors; True may
+        be a false positive (at filter_error_rate) or a visitor since removed.
+        """
+        return normalize_email(email) in self.known_emails
+
+    def may_have_purchased(self, email, event):
+        """Return False if this email has certainly not bought a ticket for the event; True may be a false positive."""
+        return f"{normalize_email(email)}|{event.event_id}" in self.purchases
+
+    def membership_state(self):
+        """Serialize the membership filters, to be saved alongside a registry snapshot."""
+        known = self.known_emails.to_bytes()
+        return len(known).to_bytes(8, "little") + known + self.purchases.to_bytes()
+
+    def restore_membership_state(self, data):
+        """Restore membership filters saved by membership_state."""
+        size = int.from_bytes(data[:8], "little")
+        self.known_emails = ScalableBloomFilter.from_bytes(data[8:8 + size])
+        self.purchases = ScalableBloomFilter.from_bytes(data[8 + size:])
+
+    def snapshot(self):
+        """Return a consistent, read-only view of the visitors.
+
+        The tuple is reused until the next change, so repeated refreshes do not copy.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock.read_locked():
+                snapshot = self._snapshot = tuple(self.visitors)
+        return snapshot
+
     def purchase_ticket(self, visitor, event):
+        """Create and return a ticket for a visitor to attend an event.
+
+        Parameters:
+        - visitor: A Visitor object representing the attendee.
+        - event: An Event object representing the event to attend.
+
+        Returns:
+        - A Ticket object for the visitor to attend the event.
+
+        Raises:
+        - AssertionError: If the provided visitor or event is not an instance of their respective classes,
+          or if the event is sold out.
+        """
         assert isinstance(visitor, Visitor), "Invalid visitor"
         assert isinstance(event, Event), "Invalid event"
-        
-        ticket = Ticket(visitor, event)
+
+        begin = perf_counter()
+        slots = self._reserve_places(event, 1)
+        ticket = Ticket(visitor, event, self.purchase_history)
+        if slots is not None:
+            ticket.entry_slot = slots[0]
+        self._record_sale(ticket)
+        if self.metrics is not None:
+            self.metrics.purchase_latency.observe(perf_counter() - begin)
         return ticket
 
     def purchase_group_tickets(self, visitors, event):
-        total_price = 0
-        for visitor in visitors:
-            ticket = Ticket(visitor, event)
-            total_price += ticket.price
-        return total_price
+        """Calculate the total price of purchasing tickets for a group of visitors to attend an event.
 
+        Parameters:
+        - visitors: A list of Visitor objects representing the attendees.
+        - event: An Event object representing the event to attend.
+
+        Returns:
+        - The total price of purchasing tickets for the group.
+
+        Raises:
+        - AssertionError: If any of the provided visitors or event is not an instance of their respective classes,
+          or if the event does not have enough places left for the whole group.
+        """
+        return sum(ticket.price for ticket in self.issue_group_tickets(visitors, event))
+
+    def issue_group_tickets(self, visitors, event):
+        """Create and return one ticket per group member, reserving all places at once.
+
+        Parameters:
+        - visitors: A list of Visitor objects representing the attendees.
+        - event: An Event object representing the event to attend.
+
+        Returns:
+        - A list of Ticket objects, in the order of visitors. For a timed-entry
+          exhibition the group fills the earliest slots with room.
+
+        Raises:
+        - AssertionError: If the event does not have enough places left for the whole group.
+        """
+        begin = perf_counter()
+        slots = self._reserve_places(event, len(visitors))
+        tickets = []
+        for i, visitor in enumerate(visitors):
+            ticket = Ticket(visitor, event, self.purchase_history)
+            if slots is not None:
+                ticket.entry_slot = slots[i]
+            self._record_sale(ticket)
+            tickets.append(ticket)
+        if self.metrics is not None:
+            self.metrics.purchase_latency.observe(perf_counter() - begin)
+        return tickets
+
+    def refund_ticket(self, ticket):
+        """Refund a purchased ticket, releasing its place and taking it out of the sales totals.
+
+        Parameters:
+        - ticket: A Ticket object returned by purchase_ticket.
+
+        Raises:
+        - AssertionError: If the provided ticket is not an instance of the Ticket class, or has already been refunded.
+        """
+        assert isinstance(ticket, Ticket), "Invalid ticket"
+        with self._refund_lock:
+            assert not ticket.refunded, "Ticket has already been refunded"
+            ticket.refunded = True
+        if ticket.entry_slot is not None:
+            ticket.event.timed_entry.release(ticket.entry_slot)
+        if self.capacity_counters is not None:
+            if self.capacity_counters.is_registered(ticket.event):
+                self.capacity_counters.refund(ticket.event)
+        elif isinstance(ticket.event, Tour):
+            with self._tour_lock:
+                if self._tour_places.get(ticket.event, 0) > 0:
+                    self._tour_places[ticket.event] -= 1
+        self.sales.record_refund(ticket)
+        if self.occupancy is not None:
+            self.occupancy.remove_ticket(ticket)
+        if self.metrics is not None:
+            self.metrics.record_refund(ticket)
+        if self.purchase_history is not None:
+            self.purchase_history.record_refund(ticket)
+        if self.ticket_signer is not None:
+            self.ticket_signer.revoke(ticket)
+
+    def _record_sale(self, ticket):
+        if self.ticket_signer is not None:
+            self.ticket_signer.issue(ticket)
+        email = normalize_email(ticket.visitor.email)
+        self.known_emails.add(email)
+        self.purchases.add(f"{email}|{ticket.event.event_id}")
+        self.sales.record_sale(ticket)
+        if self.occupancy is not None:
+            self.occupancy.add_ticket(ticket)
+        if self.metrics is not None:
+            self.metrics.record_sale(ticket)
+        if self.purchase_history is not None:
+            self.purchase_history.record_sale(ticket)
+
+    def _reserve_places(self, event, count):
+        # Returns the assigned entry slots for a timed-entry exhibition, otherwise None
+        if count == 0:
+            return None
+        slots = None
+        if isinstance(event, Exhibition) and event.timed_entry is not None:
+            slots = event.timed_entry.assign_batch(count) if count > 1 else [event.timed_entry.assign()]
+            assert slots is not None and slots[0] is not None, "Event is sold out"
+        # Capacity is enforced across processes when shared counters are attached, otherwise tours are counted here
+        if self.capacity_counters is not None:
+            if not self.capacity_counters.is_registered(event):
+                self.capacity_counters.register(event)
+            sold = self.capacity_counters.try_sell(event, count)
+        elif isinstance(event, Tour):
+            with self._tour_lock:
+                places = self._tour_places.get(event, 0)
+                sold = places + count <= event.max_capacity
+                if sold:
+                    self._tour_places[event] = places + count
+        else:
+            sold = True
+        if not sold:
+            for index in slots or ():
+                event.timed_entry.release(index)
+        assert sold, "Event is sold out"
+        return slots
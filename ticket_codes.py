@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import base64
+import binascii
+import hashlib
+import hmac
+import secrets
+import struct
+import threading
+from collections import deque
+from datetime import date, datetime
+
+CODE_VERSION = 2
+# version, ticket id, entry window start and end (minute ordinals), event hash
+_PAYLOAD = struct.Struct("<BQIII")
+_SIGNATURE_SIZE = 12
+CODE_SIZE = _PAYLOAD.size + _SIGNATURE_SIZE
+
+
+def event_hash(event_id):
+    """Return the 32-bit hash binding a ticket code to its event."""
+    return int.from_bytes(hashlib.blake2b(event_id.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def _minute_ordinal(moment):
+    # minutes since the start of day 1 of the proleptic calendar, well within 32 bits
+    return moment.toordinal() * 1440 + moment.hour * 60 + moment.minute
+
+
+def _end_minute_ordinal(moment):
+    # an entry window is open up to, not including, its end, so round a partial minute up
+    return _minute_ordinal(moment) + (moment.second > 0 or moment.microsecond > 0)
+
+
+class TicketSigner:
+    """Issues compact HMAC-signed ticket codes that gates can check offline.
+
+    The code is valid from the start to the end of the ticket's entry
+    window, or of its event, however many days that spans. Refunded tickets
+    are revoked; validators given the signer's revoked set turn them away.
+    """
+    def __init__(self, secret_key):
+        """Initialize the signer with the secret key shared with the gate validators."""
+        assert isinstance(secret_key, bytes) and len(secret_key) >= 16, "Secret key must be at least 16 bytes"
+        self._key = secret_key
+        self.revoked = set()  # ticket ids of refunded tickets
+
+    def issue(self, ticket):
+        """Give the ticket a random ticket_id and a signed code, and return the code."""
+        event = ticket.event
+        window = ticket.entry_window() or (event.start_time, event.end_time)
+        ticket.ticket_id = secrets.randbits(64)
+        payload = _PAYLOAD.pack(CODE_VERSION, ticket.ticket_id, _minute_ordinal(window[0]), _end_minute_ordinal(window[1]), event_hash(event.event_id))
+        signature = hmac.digest(self._key, payload, "sha256")[:_SIGNATURE_SIZE]
+        ticket.code = base64.urlsafe_b64encode(payload + signature).decode("ascii")
+        return ticket.code
+
+    def revoke(self, ticket):
+        """Revoke the code of a refunded ticket."""
+        if ticket.ticket_id is not None:
+            self.revoked.add(ticket.ticket_id)
+
+
+class GateValidator:
+    """Checks ticket codes at the gate without any registry lookup.
+
+    The signature proves the code was issued by the box office; a set of
+    admitted ticket ids, kept per last day of validity, catches a second
+    entry in O(1), and a set of revoked ids turns away refunded tickets.
+    """
+    def __init__(self, secret_key, event_ids=None, early_minutes=30, revoked=None, log_size=10000):
+        """Initialize the validator.
+
+        Parameters:
+        - secret_key: The key the TicketSigner uses.
+        - event_ids: Optional collection of event ids this gate admits; None admits any event.
+        - early_minutes: How long before the entry window opens a ticket is accepted.
+        - revoked: Optional set of revoked ticket ids, e.g. TicketSigner.revoked; it is shared, not copied.
+        - log_size: Number of most recent scans kept in the log.
+        """
+        assert isinstance(secret_key, bytes) and len(secret_key) >= 16, "Secret key must be at least 16 bytes"
+        self._key = secret_key
+        self._event_hashes = None
+        if event_ids is not None:
+            self._event_hashes = {event_hash(event_id) for event_id in event_ids}
+        self.early_minutes = early_minutes
+        self.revoked = set() if revoked is None else revoked
+        self._admitted = {}  # last day ordinal of the entry window -> set of ticket ids
+        self.log = deque(maxlen=log_size)  # (scan time, ticket id or None, result), most recent scans
+        self._lock = threading.Lock()
+
+    def revoke(self, ticket_id):
+        """Turn away a ticket id from now on, e.g. when told of a refund."""
+        with self._lock:
+            self.revoked.add(ticket_id)
+
+    def scan(self, code, now=None):
+        """Validate a scanned code and admit the holder if it is good.
+
+        Returns:
+        - A short result string: "ok", "invalid", "wrong event", "revoked",
+          "wrong day", "too early", "expired" or "already used".
+        """
+        if now is None:
+            now = datetime.now()
+        ticket_id = None
+        try:
+            raw = base64.urlsafe_b64decode(code)
+        except (binascii.Error, ValueError):
+            raw = b""
+        if len(raw) != CODE_SIZE:
+            result = "invalid"
+        else:
+            payload = raw[:_PAYLOAD.size]
+            expected = hmac.digest(self._key, payload, "sha256")[:_SIGNATURE_SIZE]
+            version, ticket_id, start, end, hashed_event = _PAYLOAD.unpack(payload)
+            minute = _minute_ordinal(now)
+            today = now.toordinal()
+            # the window opens early_minutes before the start, possibly the day before, and its last minute is end - 1
+            opens = start - self.early_minutes
+            last_day = (end - 1) // 1440
+            if version != CODE_VERSION or not hmac.compare_digest(expected, raw[_PAYLOAD.size:]):
+                ticket_id = None
+                result = "invalid"
+            elif self._event_hashes is not None and hashed_event not in self._event_hashes:
+                result = "wrong event"
+            elif ticket_id in self.revoked:
+                result = "revoked"
+            elif not opens // 1440 <= today <= last_day:
+                result = "wrong day"
+            elif minute < opens:
+                result = "too early"
+            elif minute >= end:
+                result = "expired"
+            else:
+                result = None
+        with self._lock:
+            if result is None:
+                admitted = self._admitted.get(last_day)
+                if admitted is None:
+                    admitted = self._admitted[last_day] = set()
+                if ticket_id in admitted:
+                    result = "already used"
+                else:
+                    admitted.add(ticket_id)
+                    result = "ok"
+            self.log.append((now, ticket_id, result))
+        return result
+
+    def forget_before(self, day):
+        """Drop the admitted sets of tickets whose entry windows ended before day, which can no longer be scanned."""
+        assert isinstance(day, date), "Invalid day"
+        with self._lock:
+            for ordinal in [ordinal for ordinal in self._admitted if ordinal < day.toordinal()]:
+                del self._admitted[ordinal]
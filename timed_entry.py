@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import heapq
+import threading
+from datetime import timedelta
+
+
+class TimedEntrySchedule:
+    """Splits an event window into entry slots and hands out the earliest free one.
+
+    Slots that still have room are kept in a min-heap of slot indexes, so
+    assigning a ticket costs O(log slots). A slot leaves the heap when it
+    fills up and returns to it when a place is released.
+    """
+    def __init__(self, start_time, end_time, slot_minutes, slot_capacity):
+        """Initialize the slots between start_time and end_time.
+
+        Parameters:
+        - start_time, end_time: The event window as datetimes.
+        - slot_minutes: Length of each entry slot in minutes; the last slot may be shorter.
+        - slot_capacity: Number of visitors admitted per slot.
+        """
+        assert start_time < end_time, "Start time must be before end time"
+        assert isinstance(slot_minutes, int) and slot_minutes > 0, "Slot length must be a positive integer"
+        assert isinstance(slot_capacity, int) and slot_capacity > 0, "Slot capacity must be a positive integer"
+        length = timedelta(minutes=slot_minutes)
+        self.slots = []
+        slot_start = start_time
+        while slot_start < end_time:
+            self.slots.append((slot_start, min(slot_start + length, end_time)))
+            slot_start += length
+        self.slot_capacity = slot_capacity
+        self._taken = [0] * len(self.slots)
+        self._free = len(self.slots) * slot_capacity
+        self._open = list(range(len(self.slots)))  # already a valid heap
+        self._lock = threading.Lock()
+
+    def remaining(self, index=None):
+        """Return the free places in one slot, or in all slots when index is None."""
+        if index is None:
+            return self._free
+        return self.slot_capacity - self._taken[index]
+
+    def assign(self):
+        """Take a place in the earliest slot with room. Returns the slot index, or None if every slot is full."""
+        with self._lock:
+            if not self._open:
+                return None
+            index = self._open[0]
+            self._taken[index] += 1
+            self._free -= 1
+            if self._taken[index] == self.slot_capacity:
+                heapq.heappop(self._open)
+            return index
+
+    def assign_batch(self, count):
+        """Take count places for a group, filling the earliest slots first.
+
+        Returns:
+        - A list of count slot indexes, or None (taking nothing) if there is not enough room.
+        """
+        assert isinstance(count, int) and count > 0, "Count must be a positive integer"
+        with self._lock:
+            if self._free < count:
+                return None
+            self._free -= count
+            assigned = []
+            while count:
+                index = self._open[0]
+                places = min(count, self.slot_capacity - self._taken[index])
+                self._taken[index] += places
+                if self._taken[index] == self.slot_capacity:
+                    heapq.heappop(self._open)
+                assigned.extend([index] * places)
+                count -= places
+            return assigned
+
+    def take(self, index):
+        """Take a place in slot index, e.g. for a ticket restored from storage. Returns False if the slot is full."""
+        with self._lock:
+            if self._taken[index] == self.slot_capacity:
+                return False
+            self._taken[index] += 1
+            self._free -= 1
+            if self._taken[index] == self.slot_capacity:
+                # the slot need not be the earliest open one, so rebuild the heap without it
+                self._open.remove(index)
+                heapq.heapify(self._open)
+            return True
+
+    def release(self, index):
+        """Give back a place in slot index."""
+        with self._lock:
+            assert self._taken[index] > 0, "Slot has no places taken"
+            if self._taken[index] == self.slot_capacity:
+                heapq.heappush(self._open, index)
+            self._taken[index] -= 1
+            self._free += 1
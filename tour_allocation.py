@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+from event import Tour
+from visitor import Visitor
+
+
+class _FirstFitTree:
+    """Max segment tree over remaining tour capacity.
+
+    Finds the first tour with at least n free places, or the tour with the
+    most free places, in O(log tours).
+    """
+    def __init__(self, remaining):
+        self.size = 1
+        while self.size < len(remaining):
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+        self.tree[self.size:self.size + len(remaining)] = remaining
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def largest(self):
+        return self.tree[1]
+
+    def first_at_least(self, places):
+        """Return the index of the first tour with at least places free, or None."""
+        if self.tree[1] < places:
+            return None
+        node = 1
+        while node < self.size:
+            node = 2 * node if self.tree[2 * node] >= places else 2 * node + 1
+        return node - self.size
+
+    def take(self, index, places):
+        node = index + self.size
+        self.tree[node] -= places
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+
+def allocate_groups(visitors, tours, booked=None):
+    """Assign visitors to tour departures, keeping each group together where it fits.
+
+    Groups (by GroupVisitor.group_id; other visitors travel alone) are placed
+    largest first into the earliest tour with room for the whole group
+    (first-fit decreasing). A group bigger than any remaining space is split:
+    it fills the emptiest tour and the rest is placed the same way, so large
+    school groups use as few departures as possible.
+
+    Parameters:
+    - visitors: Visitor or GroupVisitor objects to place.
+    - tours: Tour objects that can take them; earlier departures are filled first.
+    - booked: Optional {Tour: places already sold}.
+
+    Returns:
+    - A tuple (assignments, unplaced): assignments maps each Tour to the list
+      of visitors placed on it, unplaced lists visitors that did not fit.
+    """
+    assert all(isinstance(tour, Tour) for tour in tours), "Invalid tour"
+    booked = booked or {}
+    tours = sorted(tours, key=lambda tour: tour.start_time)
+    tree = _FirstFitTree([tour.max_capacity - booked.get(tour, 0) for tour in tours])
+
+    groups = {}
+    for visitor in visitors:
+        assert isinstance(visitor, Visitor), "Invalid visitor"
+        key = getattr(visitor, "group_id", None) or id(visitor)
+        groups.setdefault(key, []).append(visitor)
+
+    assignments = {tour: [] for tour in tours}
+    unplaced = []
+    for members in sorted(groups.values(), key=len, reverse=True):
+        while members:
+            index = tree.first_at_least(len(members))
+            if index is None:
+                places = tree.largest()
+                if places <= 0:
+                    unplaced.extend(members)
+                    break
+                index = tree.first_at_least(places)
+            else:
+                places = len(members)
+            assignments[tours[index]].extend(members[:places])
+            tree.take(index, places)
+            members = members[places:]
+    return assignments, unplaced
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+class ValueDictionary:
+    """Table of the distinct values of one low-cardinality field, each with a small integer code.
+
+    Registries keep one per repeated field (artists, creation dates,
+    locations, email domains). Records then share a single copy of each
+    value, and equality filters compare codes instead of strings.
+    """
+    def __init__(self):
+        self.values = []  # code -> value
+        self._codes = {}  # value -> code
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self._codes
+
+    def encode(self, value):
+        """Return the code of a value, adding it to the table if it is new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        """Return the code of a value, or None if it is not in the table."""
+        return self._codes.get(value)
+
+    def decode(self, code):
+        return self.values[code]
+
+
+def positions(codes, code):
+    """Return the indexes at which code occurs in an array of codes, in order.
+
+    array.index scans in C, which beats a Python loop over the codes when
+    matches are sparse, as they are for most values of a wide table.
+    """
+    found = []
+    index = -1
+    try:
+        while True:
+            index = codes.index(code, index + 1)
+            found.append(index)
+    except ValueError:
+        return found
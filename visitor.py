@@ -4,12 +4,18 @@
 # In[ ]:
 
 
+def normalize_email(email):
+    """Return the canonical form of an email address used for lookups and hashing."""
+    return email.strip().lower()
+
 class Visitor:
+    """Class to represent a visitor to the museum."""
     def __init__(self, name, age, email, is_student=False, is_teacher=False):
+        """Initialize the Visitor object with name, age, email, and optionally student/teacher status."""
         assert isinstance(name, str) and name.strip(), "Name must be a non-empty string"
         assert isinstance(age, int) and age > 0, "Age must be a positive integer"
         assert isinstance(email, str) and '@' in email, "Invalid email address"
-        
+
         self.name = name.strip()
         self.age = age
         self.email = email
@@ -17,8 +23,9 @@ class Visitor:
         self.is_teacher = is_teacher
 
 class GroupVisitor(Visitor):
-    def __init__(self, name, age, email, group_id):
-        super().__init__(name, age, email)
+    """Subclass of Visitor for group visitors."""
+    def __init__(self, name, age, email, group_id, is_student=False, is_teacher=False):
+        """Initialize the GroupVisitor object with group ID."""
+        super().__init__(name, age, email, is_student, is_teacher)
         assert isinstance(group_id, str) and group_id.strip(), "Group ID must be a non-empty string"
         self.group_id = group_id.strip()
-
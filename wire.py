@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from event import Event, Exhibition, Tour, SpecialEvent, Location
+from visitor import Visitor, GroupVisitor
+from ticket import Ticket
+
+WIRE_VERSION = 2
+MAGIC = b"MUSW"
+VISITORS, EVENTS, TICKETS = 1, 2, 3
+
+# magic, version, record kind, record count, string count, string data length
+_HEADER = struct.Struct("<4sBBIII")
+# name, email, group id, age, flags
+_VISITOR = struct.Struct("<IIIHB")
+# name, class, location, start, end (seconds since 1970), tour capacity, ticket price, entry slot minutes, slot capacity
+_EVENT = struct.Struct("<IBBqqIdHI")
+# ticket id, visitor email, event key, price, entry slot, gate code, flags
+_TICKET = struct.Struct("<QIIdiIB")
+_RECORDS = {VISITORS: _VISITOR, EVENTS: _EVENT, TICKETS: _TICKET}
+
+NO_STRING = 0xFFFFFFFF
+_STUDENT, _TEACHER, _GROUP = 1, 2, 4
+_REFUNDED = 1
+_EVENT_CLASSES = (Event, Exhibition, Tour, SpecialEvent)
+_LOCATIONS = list(Location)
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+class _StringTable:
+    """Collects the distinct strings of a batch; records refer to them by index."""
+    def __init__(self):
+        self.index = {}
+        self.encoded = []
+
+    def ref(self, text):
+        if text is None:
+            return NO_STRING
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.encoded)
+            self.encoded.append(text.encode("utf-8"))
+        return position
+
+    def to_bytes(self):
+        offsets = array("I", [0])
+        total = 0
+        for data in self.encoded:
+            total += len(data)
+            offsets.append(total)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        return offsets.tobytes(), b"".join(self.encoded)
+
+
+def _pack(kind, strings, rows):
+    record = _RECORDS[kind]
+    body = b"".join([record.pack(*row) for row in rows])
+    offsets, data = strings.to_bytes()
+    return _HEADER.pack(MAGIC, WIRE_VERSION, kind, len(rows), len(strings.encoded), len(data)) + offsets + data + body
+
+
+def _seconds(moment):
+    return (moment - _EPOCH) // _SECOND
+
+
+def event_key(event):
+    """Return the key ticket batches use for an event: its event id and location, as same-name events can run at once in different halls."""
+    return f"{event.event_id}@{event.location.name}"
+
+
+def encode_visitors(visitors):
+    """Encode visitors as one binary batch."""
+    strings = _StringTable()
+    rows = []
+    for visitor in visitors:
+        assert isinstance(visitor, Visitor), "Invalid visitor"
+        flags = (_STUDENT if visitor.is_student else 0) | (_TEACHER if visitor.is_teacher else 0)
+        group = None
+        if isinstance(visitor, GroupVisitor):
+            flags |= _GROUP
+            group = visitor.group_id
+        rows.append((strings.ref(visitor.name), strings.ref(visitor.email), strings.ref(group), visitor.age, flags))
+    return _pack(VISITORS, strings, rows)
+
+
+def encode_events(events):
+    """Encode events as one binary batch. Timed-entry settings travel with exhibitions, not slot usage."""
+    strings = _StringTable()
+    rows = []
+    for event in events:
+        assert type(event) in _EVENT_CLASSES, "Invalid event"
+        slot_minutes = slot_capacity = 0
+        if getattr(event, "timed_entry", None) is not None:
+            first_start, first_end = event.timed_entry.slots[0]
+            slot_minutes = (first_end - first_start) // timedelta(minutes=1)
+            slot_capacity = event.timed_entry.slot_capacity
+        rows.append((strings.ref(event.name), _EVENT_CLASSES.index(type(event)), _LOCATIONS.index(event.location),
+                     _seconds(event.start_time), _seconds(event.end_time), getattr(event, "max_capacity", 0),
+                     getattr(event, "ticket_price", 0.0), slot_minutes, slot_capacity))
+    return _pack(EVENTS, strings, rows)
+
+
+def encode_tickets(tickets):
+    """Encode tickets as one binary batch, referring to visitors by email and events by event_key."""
+    strings = _StringTable()
+    event_refs = {}  # id(event) -> string index, as the key is formatted on every access
+    rows = []
+    for ticket in tickets:
+        assert isinstance(ticket, Ticket), "Invalid ticket"
+        event_ref = event_refs.get(id(ticket.event))
+        if event_ref is None:
+            event_ref = event_refs[id(ticket.event)] = strings.ref(event_key(ticket.event))
+        rows.append((ticket.ticket_id or 0, strings.ref(ticket.visitor.email), event_ref,
+                     ticket.price, -1 if ticket.entry_slot is None else ticket.entry_slot, strings.ref(ticket.code),
+                     _REFUNDED if ticket.refunded else 0))
+    return _pack(TICKETS, strings, rows)
+
+
+class RecordBatch:
+    """Read-only view of an encoded batch.
+
+    Records are unpacked straight from the buffer they arrived in, and each
+    string is decoded at most once, on first use.
+    """
+    def __init__(self, data):
+        """Initialize the view over bytes, bytearray, memoryview or an mmap."""
+        view = memoryview(data)
+        assert len(view) >= _HEADER.size, "Truncated batch"
+        magic, version, kind, count, num_strings, data_size = _HEADER.unpack_from(view)
+        assert magic == MAGIC, "Not a museum record batch"
+        assert version == WIRE_VERSION, f"Unsupported wire format version {version}"
+        assert kind in _RECORDS, "Unknown record kind"
+        self.kind = kind
+        self._record = _RECORDS[kind]
+        offsets_end = _HEADER.size + 4 * (num_strings + 1)
+        self._data_start = offsets_end
+        self._records_start = offsets_end + data_size
+        assert len(view) >= self._records_start + count * self._record.size, "Truncated batch"
+        self._view = view
+        if sys.byteorder == "little":
+            self._offsets = view[_HEADER.size:offsets_end].cast("I")
+        else:
+            self._offsets = array("I", view[_HEADER.size:offsets_end])
+            self._offsets.byteswap()
+        self._strings = [None] * num_strings
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def string(self, index):
+        """Return the string with the given index, or None for NO_STRING."""
+        if index == NO_STRING:
+            return None
+        text = self._strings[index]
+        if text is None:
+            start = self._data_start + self._offsets[index]
+            end = self._data_start + self._offsets[index + 1]
+            text = self._strings[index] = str(self._view[start:end], "utf-8")
+        return text
+
+    def row(self, index):
+        """Return the raw field tuple of one record."""
+        assert 0 <= index < self._count, "Record index out of range"
+        return self._record.unpack_from(self._view, self._records_start + index * self._record.size)
+
+    def rows(self):
+        """Iterate over the raw field tuples of every record."""
+        return self._record.iter_unpack(self._view[self._records_start:self._records_start + self._count * self._record.size])
+
+
+def decode_visitors(data):
+    """Decode a visitor batch into Visitor and GroupVisitor objects."""
+    batch = RecordBatch(data)
+    assert batch.kind == VISITORS, "Not a visitor batch"
+    string = batch.string
+    visitors = []
+    for name, email, group, age, flags in batch.rows():
+        if flags & _GROUP:
+            visitor = GroupVisitor(string(name), age, string(email), string(group), bool(flags & _STUDENT), bool(flags & _TEACHER))
+        else:
+            visitor = Visitor(string(name), age, string(email), bool(flags & _STUDENT), bool(flags & _TEACHER))
+        visitors.append(visitor)
+    return visitors
+
+
+def decode_events(data):
+    """Decode an event batch into Event objects of their original classes."""
+    batch = RecordBatch(data)
+    assert batch.kind == EVENTS, "Not an event batch"
+    events = []
+    for name, kind, location, start, end, capacity, price, slot_minutes, slot_capacity in batch.rows():
+        args = (batch.string(name), _LOCATIONS[location], _EPOCH + start * _SECOND, _EPOCH + end * _SECOND)
+        event_class = _EVENT_CLASSES[kind]
+        if event_class is Tour:
+            event = Tour(*args, capacity)
+        elif event_class is SpecialEvent:
+            event = SpecialEvent(*args, price)
+        else:
+            event = event_class(*args)
+        if slot_minutes:
+            event.enable_timed_entry(slot_minutes, slot_capacity)
+        events.append(event)
+    return events
+
+
+def decode_tickets(data, visitors, events):
+    """Decode a ticket batch, resolving its references.
+
+    A live ticket with an entry slot takes its place again in the event's
+    timed-entry schedule, so it can be refunded like a ticket sold here;
+    pass events that do not already count these tickets, e.g. decoded ones.
+    Refunded tickets come back marked as refunded and take no place.
+
+    Parameters:
+    - data: The encoded batch.
+    - visitors: Mapping from email to Visitor, e.g. built from a decoded visitor batch.
+    - events: Mapping from event_key(event) to Event.
+
+    Raises:
+    - AssertionError: If a ticket refers to a visitor or event that is not in the mappings,
+      or to an entry slot the event does not have room in.
+    """
+    batch = RecordBatch(data)
+    assert batch.kind == TICKETS, "Not a ticket batch"
+    string = batch.string
+    tickets = []
+    for ticket_id, email, event_id, price, entry_slot, code, flags in batch.rows():
+        visitor = visitors.get(string(email))
+        event = events.get(string(event_id))
+        assert visitor is not None, f"Unknown visitor {string(email)}"
+        assert event is not None, f"Unknown event {string(event_id)}"
+        ticket = Ticket(visitor, event)
+        ticket.price = price
+        ticket.ticket_id = ticket_id or None
+        ticket.refunded = bool(flags & _REFUNDED)
+        if entry_slot >= 0 and ticket.refunded:
+            ticket.entry_slot = entry_slot
+        elif entry_slot >= 0:
+            assert getattr(event, "timed_entry", None) is not None and 0 <= entry_slot < len(event.timed_entry.slots), f"Invalid entry slot for {string(event_id)}"
+            assert event.timed_entry.take(entry_slot), f"Entry slot {entry_slot} of {string(event_id)} is full"
+            ticket.entry_slot = entry_slot
+        ticket.code = string(code)
+        tickets.append(ticket)
+    return tickets